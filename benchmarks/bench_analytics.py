@@ -0,0 +1,93 @@
+"""FillAnalytics throughput on a long fill history vs a per-fill dict loop.
+
+Dict chunks spend most of their time parsing numeric strings, as the loop
+does, so they are only about 1.5x faster. A FillArray (what
+``list_fills`` returns with ``models=True``) has parsed them already and
+loads about 4x faster. Building one from dicts is timed separately: it
+costs more than it saves, so plain dicts should be passed as they are.
+
+Run with ``python -m benchmarks.bench_analytics``.
+"""
+import random
+import time
+from collections import deque
+
+from coinlist.analytics import FillAnalytics, chunks
+from coinlist.models import FillArray
+
+FILLS = 1_000_000
+CHUNK = 100_000
+SYMBOLS = ["BTC-USD", "ETH-USD", "SOL-USD", "ICP-USD"]
+
+
+def _fills(rng):
+    return [
+        {
+            "symbol": SYMBOLS[i % len(SYMBOLS)],
+            "side": "buy" if rng.random() < 0.5 else "sell",
+            "price": "%.2f" % rng.uniform(90, 110),
+            "quantity": "%.4f" % rng.uniform(0.01, 2),
+            "fee": "%.6f" % rng.uniform(0, 0.1),
+            "fee_type": "maker",
+        }
+        for i in range(FILLS)
+    ]
+
+
+def _dict_loop(fills):
+    """The per-fill FIFO loop the analytics replace."""
+    lots, pnl, fees = {}, {}, {}
+    for f in fills:
+        symbol = f["symbol"]
+        queue = lots.setdefault(symbol, deque())
+        sign = 1 if f["side"] == "buy" else -1
+        qty, price = float(f["quantity"]), float(f["price"])
+        fees[symbol] = fees.get(symbol, 0.0) + float(f["fee"])
+        while qty > 1e-12 and queue and queue[0][0] != sign:
+            lot_sign, lot_qty, lot_price = queue[0]
+            closed = min(qty, lot_qty)
+            pnl[symbol] = pnl.get(symbol, 0.0) + closed * (price - lot_price) * -sign
+            qty -= closed
+            if lot_qty - closed > 1e-12:
+                queue[0] = (lot_sign, lot_qty - closed, lot_price)
+            else:
+                queue.popleft()
+        if qty > 1e-12:
+            queue.append((sign, qty, price))
+    return pnl, fees
+
+
+def main():
+    fills = _fills(random.Random(7))
+
+    t0 = time.perf_counter()
+    stats = FillAnalytics()
+    for chunk in chunks(fills, CHUNK):
+        stats.add(chunk)
+    summary = stats.summary()
+    elapsed = time.perf_counter() - t0
+    print(f"FillAnalytics (dicts)    {FILLS / elapsed:12,.0f} fills/s ({elapsed:.2f}s)")
+
+    t0 = time.perf_counter()
+    arrays = [FillArray(chunk) for chunk in chunks(fills, CHUNK)]
+    elapsed = time.perf_counter() - t0
+    print(f"FillArray from dicts     {FILLS / elapsed:12,.0f} fills/s ({elapsed:.2f}s)")
+
+    t0 = time.perf_counter()
+    columnar = FillAnalytics()
+    for array in arrays:
+        columnar.add(array)
+    elapsed = time.perf_counter() - t0
+    print(f"FillAnalytics (FillArray){FILLS / elapsed:12,.0f} fills/s ({elapsed:.2f}s)")
+
+    t0 = time.perf_counter()
+    pnl, _ = _dict_loop(fills)
+    elapsed = time.perf_counter() - t0
+    print(f"per-fill dict loop       {FILLS / elapsed:12,.0f} fills/s ({elapsed:.2f}s)")
+
+    for symbol, realized in zip(summary["symbol"], summary["realized_pnl"]):
+        assert abs(realized - pnl[symbol]) <= 1e-6 * max(1.0, abs(pnl[symbol]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""JSON decode cost of large book and fills payloads per codec configuration.
+
+Run with ``python -m benchmarks.bench_codec``.
+"""
+import json
+import random
+import timeit
+
+from coinlist.codec import JsonCodec, orjson
+
+LEVELS = 5000
+FILLS = 20000
+
+
+def book_payload(rng):
+    return {
+        "bids": [[f"{30000 - i * 0.5:.2f}", f"{rng.uniform(0.001, 3):.8f}"] for i in range(LEVELS)],
+        "asks": [[f"{30000.5 + i * 0.5:.2f}", f"{rng.uniform(0.001, 3):.8f}"] for i in range(LEVELS)],
+        "after_auction_code": "BTC-USD-2021-09-01T00:00:00.000Z",
+        "call_time": "2021-09-01T00:00:00.000Z",
+    }
+
+
+def fills_payload(rng):
+    return {
+        "fills": [
+            {
+                "order_id": f"{i:08x}-0000-0000-0000-000000000000",
+                "quantity": f"{rng.uniform(0.001, 3):.8f}",
+                "symbol": "BTC-USD",
+                "auction_code": "BTC-USD-2021-09-01T00:00:00.000Z",
+                "price": f"{rng.uniform(29000, 31000):.2f}",
+                "fee": f"{rng.uniform(0, 5):.8f}",
+                "fee_currency": "USD",
+                "logical_time": "2021-09-01T00:00:00.000Z",
+            }
+            for i in range(FILLS)
+        ]
+    }
+
+
+def main():
+    rng = random.Random(3)
+    payloads = {
+        "book": json.dumps(book_payload(rng)).encode(),
+        "fills": json.dumps(fills_payload(rng)).encode(),
+    }
+    codecs = [
+        ("r.json() equivalent", lambda raw: json.loads(raw.decode("utf-8"))),
+        ("json float", JsonCodec(backend="json").loads),
+        ("json decimal", JsonCodec(backend="json", numbers="decimal").loads),
+    ]
+    if orjson is not None:
+        codecs += [
+            ("orjson float", JsonCodec(backend="orjson").loads),
+            ("orjson decimal", JsonCodec(backend="orjson", numbers="decimal").loads),
+            ("orjson fixed(8)", JsonCodec(backend="orjson", numbers="fixed").loads),
+        ]
+    for name, raw in payloads.items():
+        print(f"{name}: {len(raw) / 1e6:.2f} MB")
+        for label, loads in codecs:
+            elapsed = min(timeit.repeat(lambda: loads(raw), number=5, repeat=3)) / 5
+            print(f"  {label:<20} {elapsed * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
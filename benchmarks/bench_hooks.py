@@ -0,0 +1,87 @@
+"""Cost of request instrumentation per ``_make_request`` call.
+
+Requests go to an in-memory transport, so only client-side work is timed:
+the bare request path, the same path with no hook installed (the shipped
+default) and with a ``MetricsCollector`` hook. The no-hook overhead must
+stay below MAX_NO_HOOK_OVERHEAD (relative to the bare path).
+
+Run with ``python -m benchmarks.bench_hooks``.
+"""
+import base64
+import time
+import timeit
+
+from coinlist import CoinlistApi, MetricsCollector
+from coinlist.ratelimit import RequestScheduler
+
+N = 10000
+ROUNDS = 15
+MAX_NO_HOOK_OVERHEAD = 0.05
+SECRET = base64.b64encode(b"0123456789abcdef0123456789abcdef").decode()
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+    content = b'{"quote":{"bid":"36231.88","ask":"36268.12"}}'
+
+
+class _MemoryTransport:
+    def request(self, method, url, headers=None, data=None, timeout=None):
+        return _Response
+
+    def close(self):
+        pass
+
+
+def _bare(client, method, path, data={}, params={}):
+    """The request path without the hook check."""
+    endpoint_class = client.scheduler.acquire(method, path)
+    url, headers, json_body = client._build_request(method, path, data, params)
+    sent = time.time()
+    r = client.transport.request(method, url, headers=headers, data=json_body)
+    client._observe_clock(sent, r.headers)
+    client.scheduler.record(endpoint_class, r.status_code, r.headers)
+    return client.codec.loads(r.content)
+
+
+def _us_per_call(*fns):
+    """Best time per call of each function, measured in interleaved rounds."""
+    best = [float("inf")] * len(fns)
+    for _ in range(ROUNDS):
+        for i, fn in enumerate(fns):
+            best[i] = min(best[i], timeit.timeit(fn, number=N))
+    return [t / N * 1e6 for t in best]
+
+
+def main():
+    client = CoinlistApi(
+        "key",
+        SECRET,
+        transport=_MemoryTransport(),
+        scheduler=RequestScheduler.unlimited(),
+        coalesce=False,
+    )
+    path = "/v1/symbols/BTC-USD/quote"
+    hooked = CoinlistApi(
+        "key",
+        SECRET,
+        transport=_MemoryTransport(),
+        scheduler=RequestScheduler.unlimited(),
+        hooks=[MetricsCollector()],
+        coalesce=False,
+    )
+    bare, no_hook, with_hook = _us_per_call(
+        lambda: _bare(client, "GET", path),
+        lambda: client._make_request("GET", path),
+        lambda: hooked._make_request("GET", path),
+    )
+
+    print(f"{'bare request path':<24} {bare:8.2f} us/call")
+    print(f"{'no hook':<24} {no_hook:8.2f} us/call ({no_hook - bare:+.2f})")
+    print(f"{'MetricsCollector hook':<24} {with_hook:8.2f} us/call ({with_hook - bare:+.2f})")
+    assert no_hook - bare < bare * MAX_NO_HOOK_OVERHEAD, "no-hook overhead above bound"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""LocalOrderBook update throughput on deep books vs refetch-and-sort.
+
+Run with ``python -m benchmarks.bench_orderbook``.
+"""
+import random
+import time
+
+from coinlist.orderbook import LocalOrderBook
+
+LEVELS = 5000
+UPDATES = 200000
+
+
+def _snapshot(rng):
+    bids = [[f"{100 - i * 0.01:.2f}", f"{rng.uniform(0.1, 5):.4f}"] for i in range(LEVELS)]
+    asks = [[f"{100.01 + i * 0.01:.2f}", f"{rng.uniform(0.1, 5):.4f}"] for i in range(LEVELS)]
+    return {"bids": bids, "asks": asks, "sequence": 0}
+
+
+def _deltas(rng):
+    deltas = []
+    for seq in range(1, UPDATES + 1):
+        side = "bids" if rng.random() < 0.5 else "asks"
+        offset = rng.randint(0, LEVELS + 50) * 0.01
+        price = 100 - offset if side == "bids" else 100.01 + offset
+        size = 0 if rng.random() < 0.3 else rng.uniform(0.1, 5)
+        deltas.append({"sequence": seq, side: [[price, size]]})
+    return deltas
+
+
+def main():
+    rng = random.Random(7)
+    snapshot = _snapshot(rng)
+    deltas = _deltas(rng)
+
+    book = LocalOrderBook("BENCH-USD")
+    book.load_snapshot(snapshot)
+    t0 = time.perf_counter()
+    for delta in deltas:
+        book.apply(delta)
+        book.best_bid, book.best_ask
+    elapsed = time.perf_counter() - t0
+    print(f"apply+top-of-book  {UPDATES / elapsed:,.0f} updates/s ({LEVELS} levels/side)")
+
+    t0 = time.perf_counter()
+    for _ in range(2000):
+        book.depth(20)
+        book.cumulative_size("buy", n=50)
+    elapsed = time.perf_counter() - t0
+    print(f"depth(20)+cum(50)  {2000 / elapsed:,.0f} queries/s")
+
+    t0 = time.perf_counter()
+    for _ in range(50):
+        b = sorted(((float(p), float(s)) for p, s in snapshot["bids"]), reverse=True)
+        a = sorted((float(p), float(s)) for p, s in snapshot["asks"])
+        b[0], a[0]
+    elapsed = time.perf_counter() - t0
+    print(f"snapshot re-sort   {50 / elapsed:,.0f} refreshes/s")
+
+
+if __name__ == "__main__":
+    main()
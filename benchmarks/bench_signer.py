@@ -0,0 +1,69 @@
+"""Signing and request-building microbenchmarks: legacy path vs RequestSigner.
+
+Run with ``python -m benchmarks.bench_signer``.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import timeit
+
+import requests
+
+from coinlist.signer import RequestSigner
+
+KEY = "bench-key"
+SECRET = base64.b64encode(b"0123456789abcdef0123456789abcdef").decode()
+ENDPOINT = "https://trade-api.coinlist.co"
+ORDER = {"symbol": "BTC-USD", "type": "limit", "side": "buy", "size": "0.01", "price": "30000", "origin": "api"}
+PARAMS = {"symbol": "BTC-USD", "count": 200, "descending": "true"}
+TIMESTAMP = "1700000000"
+N = 50000
+
+
+def legacy_sign(message: str):
+    secret = base64.b64decode(SECRET).strip()
+    h = hmac.new(secret, message.encode("utf-8"), digestmod=hashlib.sha256)
+    return base64.b64encode(h.digest()).decode("utf-8")
+
+
+def legacy_build(method, path, data, params):
+    path_with_params = requests.Request(method, ENDPOINT + path, params=params).prepare().path_url
+    json_body = json.dumps((data), separators=(",", ":")).strip()
+    message = TIMESTAMP + method + path_with_params + ("" if not data else json_body)
+    signature = legacy_sign(message)
+    headers = {
+        "Content-Type": "application/json",
+        "CL-ACCESS-KEY": KEY,
+        "CL-ACCESS-SIG": signature,
+        "CL-ACCESS-TIMESTAMP": TIMESTAMP,
+    }
+    return ENDPOINT + path_with_params, headers, json_body
+
+
+def main():
+    signer = RequestSigner(KEY, SECRET)
+    message = TIMESTAMP + "POST/v1/orders" + json.dumps(ORDER, separators=(",", ":"))
+
+    assert legacy_sign(message) == signer.sign(message)
+    for method, path, data, params in (("POST", "/v1/orders", ORDER, {}), ("GET", "/v1/fills", {}, PARAMS)):
+        legacy = legacy_build(method, path, data, params)
+        path_with_params, headers, body = signer.build(method, path, data, params, TIMESTAMP)
+        assert legacy[0] == ENDPOINT + path_with_params and legacy[1] == headers
+        assert legacy[2].encode() == body
+
+    cases = (
+        ("sign legacy", lambda: legacy_sign(message)),
+        ("sign RequestSigner", lambda: signer.sign(message)),
+        ("build POST legacy", lambda: legacy_build("POST", "/v1/orders", ORDER, {})),
+        ("build POST RequestSigner", lambda: signer.build("POST", "/v1/orders", ORDER, {}, TIMESTAMP)),
+        ("build GET legacy", lambda: legacy_build("GET", "/v1/fills", {}, PARAMS)),
+        ("build GET RequestSigner", lambda: signer.build("GET", "/v1/fills", {}, PARAMS, TIMESTAMP)),
+    )
+    for name, fn in cases:
+        elapsed = min(timeit.repeat(fn, number=N, repeat=3))
+        print(f"{name:<26} {N / elapsed:>12,.0f} ops/s {elapsed / N * 1e6:8.2f} us/op")
+
+
+if __name__ == "__main__":
+    main()
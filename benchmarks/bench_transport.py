@@ -0,0 +1,64 @@
+"""Per-request latency: module-level ``requests.request`` vs pooled transport.
+
+Run with ``python -m benchmarks.bench_transport``.
+"""
+import statistics
+import time
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from coinlist import CoinlistApi
+from coinlist.ratelimit import RequestScheduler
+
+N = 1000
+SECRET = "c2VjcmV0"
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return (
+        samples[len(samples) // 2] * 1e3,
+        samples[int(len(samples) * 0.99)] * 1e3,
+        statistics.mean(samples) * 1e3,
+    )
+
+
+def _run(client):
+    samples = []
+    for _ in range(N):
+        t0 = time.perf_counter()
+        client._make_request("GET", "/v1/accounts")
+        samples.append(time.perf_counter() - t0)
+    return _percentiles(samples)
+
+
+class _UnpooledTransport:
+    """The pre-transport behaviour: a fresh connection per call."""
+
+    def request(self, method, url, headers=None, data=None, timeout=None):
+        return requests.request(method, url, headers=headers, data=data)
+
+    def close(self):
+        pass
+
+
+def main():
+    with StubServer() as server:
+        before = CoinlistApi(
+            "key",
+            SECRET,
+            transport=_UnpooledTransport(),
+            scheduler=RequestScheduler.unlimited(),
+        )
+        before.endpoint_url = server.url
+        with CoinlistApi("key", SECRET, scheduler=RequestScheduler.unlimited()) as after:
+            after.endpoint_url = server.url
+            _run(after)  # warm the pool
+            for name, client in (("requests.request", before), ("HttpTransport", after)):
+                p50, p99, mean = _run(client)
+                print(f"{name:<18} p50={p50:.3f}ms p99={p99:.3f}ms mean={mean:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
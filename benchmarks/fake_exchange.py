@@ -0,0 +1,911 @@
+"""Local stand-in for the CoinList REST and WebSocket APIs.
+
+``FakeExchange`` serves recorded-shape payloads (``benchmarks.payloads``) for
+every endpoint ``CoinlistApi`` calls, verifies the ``CL-ACCESS-*`` signature
+headers, keeps order state between calls and pages listings by time window
+like the live API. Latency and errors can be injected, globally or for the
+next matching requests. The WebSocket side authenticates, tracks
+subscriptions and pushes whatever is ``publish``-ed, plus an order event on
+the ``user`` channel for every order change made over REST.
+
+Usage:
+    with FakeExchange(latency=0.002) as exchange:
+        client = CoinlistApi(KEY, SECRET)
+        client.endpoint_url = exchange.url
+        client.wss_url = exchange.ws_url
+
+Only the standard library is used, so the benchmarks and tests need no
+server dependency.
+"""
+import base64
+import bisect
+import csv
+import hashlib
+import hmac
+import io
+import json
+import random
+import re
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks import payloads
+
+KEY = "fake-key"
+SECRET = base64.b64encode(b"fake-exchange-secret").decode("ascii")
+TIMESTAMP_TOLERANCE = 30
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 500
+
+# listing -> time field
+_LISTINGS = {
+    "fills": "logical_time",
+    "orders": "created_at",
+    "transactions": "created_at",
+    "transfers": "created_at",
+    "auctions": "logical_time",
+    "reports": "created_at",
+}
+# report type -> listing in its CSV
+_REPORT_LISTINGS = {"fills": "fills", "account": "transactions"}
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _Listing:
+    """Items of one listing kept sorted by time, with a parallel epoch index."""
+
+    def __init__(self, items: list, time_field: str):
+        self.time_field = time_field
+        self.items = list(items)
+        self.times = [_epoch(item[time_field]) for item in items]
+
+    def add(self, item: dict):
+        t = _epoch(item[self.time_field])
+        i = bisect.bisect_right(self.times, t)
+        self.times.insert(i, t)
+        self.items.insert(i, item)
+
+    def page(self, query: dict, predicate=None):
+        start, end = query.get("start_time"), query.get("end_time")
+        lo, hi = 0, len(self.items)
+        if start:
+            lo = bisect.bisect_left(self.times, _epoch(start))
+        if end:
+            hi = bisect.bisect_right(self.times, _epoch(end))
+        count = min(int(query.get("count") or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        descending = query.get("descending") == "true"
+        indices = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        page = []
+        for i in indices:
+            item = self.items[i]
+            if predicate is None or predicate(item):
+                page.append(item)
+                if len(page) == count:
+                    break
+        return page
+
+
+def _epoch(value: str) -> float:
+    return payloads.parse_time(value).timestamp()
+
+
+class FakeExchange:
+    """In-process fake CoinList server (HTTP + WebSocket) on 127.0.0.1.
+
+    Args:
+        key (str, optional): Accepted API key. Defaults to KEY.
+        secret (str, optional): Base64 secret signatures are checked with.
+            Defaults to SECRET.
+        latency (float, optional): Seconds added to every HTTP response. Defaults to 0.
+        jitter (float, optional): Extra uniform random latency, in seconds. Defaults to 0.
+        error_rate (float, optional): Fraction of HTTP requests answered with
+            ``error_status``. Defaults to 0.
+        error_status (int, optional): Status of injected errors. Defaults to 503.
+        history (int, optional): Items in each generated listing. Defaults to 2000.
+        book_depth (int, optional): Levels per side of order book snapshots. Defaults to 50.
+        clock_offset (float, optional): Seconds the server clock is ahead of the
+            local one; applied to the ``Date`` header and timestamp checks. Defaults to 0.
+        verify (bool, optional): Reject requests with bad signatures. Defaults to True.
+        seed (int, optional): Seed of the generated data and injected errors. Defaults to 0.
+        report_delay (float, optional): Seconds before a requested report is ready.
+            Defaults to 0.05.
+    """
+
+    def __init__(
+        self,
+        key: str = KEY,
+        secret: str = SECRET,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        history: int = 2000,
+        book_depth: int = 50,
+        clock_offset: float = 0.0,
+        verify: bool = True,
+        seed: int = 0,
+        report_delay: float = 0.05,
+    ):
+        self.key = key
+        self.secret = secret
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.book_depth = book_depth
+        self.clock_offset = clock_offset
+        self.verify = verify
+        self.report_delay = report_delay
+        self.hits = Counter()
+        self.rejected = Counter()
+        self._hmac = hmac.new(base64.b64decode(secret), digestmod=hashlib.sha256)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._failures = []
+        self._slow = []
+        generated = payloads.history(history, seed=seed)
+        generated["reports"] = []
+        self.listings = {
+            name: _Listing(generated[name], field) for name, field in _LISTINGS.items()
+        }
+        self.orders = {}
+        self.client_ids = {}
+        self.reports = {}
+        self.ws_connections = []
+        self._ws_lock = threading.Lock()
+
+        handler = type("Handler", (_HttpHandler,), {"exchange": self})
+        self.httpd = _ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        ws_handler = type("WsHandler", (_WsHandler,), {"exchange": self})
+        self.wsd = _ThreadingTCPServer(("127.0.0.1", 0), ws_handler)
+        self.url = "http://127.0.0.1:%d" % self.httpd.server_address[1]
+        self.ws_url = "ws://127.0.0.1:%d" % self.wsd.server_address[1]
+        self._threads = [
+            threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+            for server in (self.httpd, self.wsd)
+        ]
+
+    # LIFECYCLE
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        for server in (self.httpd, self.wsd):
+            server.shutdown()
+            server.server_close()
+        with self._ws_lock:
+            connections, self.ws_connections = self.ws_connections, []
+        for conn in connections:
+            conn.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # INJECTION
+    def fail_next(
+        self,
+        count: int = 1,
+        status: int = None,
+        method: str = None,
+        path: str = None,
+        after: bool = False,
+    ):
+        """Answer the next ``count`` matching requests with an error.
+
+        Args:
+            count (int, optional): Requests to fail. Defaults to 1.
+            status (int, optional): Error status. Defaults to ``error_status``.
+            method (str, optional): Only requests with this HTTP method.
+            path (str, optional): Only paths matching this regular expression.
+            after (bool, optional): Process the request and only then answer with
+                the error, like a response lost on the way back. Defaults to False.
+        """
+        with self._lock:
+            self._failures.append(
+                [count, status or self.error_status, method, re.compile(path or ""), after]
+            )
+
+    def slow_next(self, count: int, seconds: float, method: str = None, path: str = None):
+        """Delay the next ``count`` matching requests by an extra ``seconds``."""
+        with self._lock:
+            self._slow.append([count, seconds, method, re.compile(path or "")])
+
+    def fill_order(self, order_id: str, size=None, price=None, publish: bool = True):
+        """Execute (part of) a resting order, as if it traded in an auction.
+
+        Args:
+            order_id (str): Order to fill.
+            size (float, optional): Quantity filled. Defaults to the unfilled rest.
+            price (float, optional): Fill price. Defaults to the order price.
+            publish (bool, optional): Push the fill and order events on the ``user``
+                channel; False simulates messages lost while disconnected.
+
+        Returns:
+            dict: The fill.
+        """
+        with self._lock:
+            order = self.orders[order_id]
+            filled = float(order["size_filled"])
+            size = float(order["size"]) - filled if size is None else float(size)
+            price = float(order["price"] if price is None else price)
+            fee = price * size * 0.0045
+            at = self._timestamp()
+            fill = {
+                "fill_id": str(uuid.uuid4()),
+                "order_id": order_id,
+                "symbol": order["symbol"],
+                "auction_code": f"{order['symbol']}-{at}",
+                "side": order["side"],
+                "price": "%.2f" % price,
+                "quantity": "%.8g" % size,
+                "fee": "%.6f" % fee,
+                "fee_type": "maker",
+                "fee_currency": "USD",
+                "logical_time": at,
+            }
+            average = float(order["average_fill_price"] or 0)
+            order["average_fill_price"] = "%.2f" % (
+                (average * filled + price * size) / (filled + size)
+            )
+            order["size_filled"] = "%.8g" % (filled + size)
+            order["fill_fees"] = "%.6f" % (float(order["fill_fees"]) + fee)
+            if filled + size >= float(order["size"]) - 1e-12:
+                order["status"] = "done"
+            order["updated_at"] = at
+            self.listings["fills"].add(fill)
+        if publish:
+            self.publish("user", {"type": "fill", "fill": dict(fill)})
+            self.publish("user", {"type": "order", "event": "filled", "order": dict(order)})
+        return fill
+
+    def _injected_error(self, method: str, path: str):
+        """(status, after) of the error to inject, or None."""
+        with self._lock:
+            for failure in self._failures:
+                _, status, fail_method, pattern, after = failure
+                if (fail_method is None or fail_method == method) and pattern.search(path):
+                    failure[0] -= 1
+                    if failure[0] <= 0:
+                        self._failures.remove(failure)
+                    return status, after
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status, False
+        return None
+
+    def _delay(self, method: str, path: str):
+        delay = self.latency
+        with self._lock:
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            for slow in self._slow:
+                _, seconds, slow_method, pattern = slow
+                if (slow_method is None or slow_method == method) and pattern.search(path):
+                    delay += seconds
+                    slow[0] -= 1
+                    if slow[0] <= 0:
+                        self._slow.remove(slow)
+                    break
+        if delay > 0:
+            time.sleep(delay)
+
+    # AUTH
+    def now(self):
+        return time.time() + self.clock_offset
+
+    def signature(self, message: bytes) -> str:
+        h = self._hmac.copy()
+        h.update(message)
+        return base64.b64encode(h.digest()).decode("ascii")
+
+    def check_signature(self, headers, method: str, path: str, body: bytes):
+        if headers.get("CL-ACCESS-KEY") != self.key:
+            raise HttpError(401, "Invalid API key")
+        timestamp = headers.get("CL-ACCESS-TIMESTAMP") or ""
+        try:
+            skew = abs(self.now() - int(timestamp))
+        except ValueError:
+            raise HttpError(401, "Invalid timestamp")
+        if skew > TIMESTAMP_TOLERANCE:
+            raise HttpError(401, "Timestamp out of range")
+        prefix = (timestamp + method + path).encode("utf-8")
+        candidates = [prefix + body]
+        if body.strip() in (b"", b"{}", b"[]", b"null"):
+            candidates.append(prefix)
+        signature = headers.get("CL-ACCESS-SIG") or ""
+        if not any(hmac.compare_digest(signature, self.signature(c)) for c in candidates):
+            raise HttpError(401, "Invalid signature")
+
+    # WEBSOCKET
+    def publish(self, channel: str, message: dict, symbol: str = None):
+        """Push ``message`` to every connection subscribed to ``channel`` (and ``symbol``).
+
+        Returns:
+            int: Connections the message was sent to.
+        """
+        data = json.dumps(message).encode("utf-8")
+        sent = 0
+        with self._ws_lock:
+            connections = list(self.ws_connections)
+        for conn in connections:
+            if conn.subscribed(channel, symbol):
+                try:
+                    conn.send_text(data)
+                    sent += 1
+                except OSError:
+                    pass
+        return sent
+
+    def wait_subscribed(self, channel: str, symbol: str = None, timeout: float = 5):
+        """Wait until some connection subscribed to ``channel`` (and ``symbol``)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._ws_lock:
+                if any(c.subscribed(channel, symbol) for c in self.ws_connections):
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def drop_connections(self):
+        """Close every WebSocket connection, e.g. to exercise reconnects."""
+        with self._ws_lock:
+            connections, self.ws_connections = self.ws_connections, []
+        for conn in connections:
+            conn.close()
+
+    # ROUTES
+    def handle(self, method: str, path: str, query: dict, body):
+        for route_method, pattern, name in _ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match:
+                self.hits[f"{method} {pattern.pattern}"] += 1
+                return getattr(self, name)(query, body, *match.groups())
+        raise HttpError(404, f"No route for {method} {path}")
+
+    def _timestamp(self):
+        return payloads.isoformat(datetime.fromtimestamp(self.now(), timezone.utc))
+
+    def _account(self, trader_id):
+        if trader_id != payloads.TRADER_ID:
+            raise HttpError(404, "Account not found")
+
+    def get_accounts(self, query, body):
+        return payloads.accounts()
+
+    def get_account(self, query, body, trader_id):
+        self._account(trader_id)
+        return payloads.account_summary()
+
+    def get_ledger(self, query, body, trader_id):
+        self._account(trader_id)
+        return {"transactions": self.listings["transactions"].page(query)}
+
+    def get_wallets(self, query, body, trader_id):
+        self._account(trader_id)
+        return payloads.wallets()
+
+    def get_ledger_summary(self, query, body, trader_id):
+        self._account(trader_id)
+        return payloads.ledger_summary()
+
+    def get_balances(self, query, body):
+        return payloads.balances()
+
+    def get_fees(self, query, body):
+        return payloads.fees()
+
+    def get_api_keys(self, query, body):
+        return payloads.api_keys()
+
+    def get_time(self, query, body):
+        now = self.now()
+        iso = payloads.isoformat(datetime.fromtimestamp(now, timezone.utc))
+        return {"epoch": now, "iso": iso}
+
+    def get_fills(self, query, body):
+        symbol = query.get("symbol")
+        predicate = (lambda f: f["symbol"] == symbol) if symbol else None
+        return {"fills": self.listings["fills"].page(query, predicate)}
+
+    def list_orders(self, query, body):
+        symbol, status = query.get("symbol"), query.get("status")
+
+        def predicate(order):
+            return (symbol is None or order["symbol"] == symbol) and (
+                status is None or order["status"] == status
+            )
+
+        return {"orders": self.listings["orders"].page(query, predicate)}
+
+    def _new_order(self, spec: dict):
+        if not isinstance(spec, dict) or spec.get("side") not in ("buy", "sell"):
+            raise HttpError(400, "Invalid order")
+        if spec.get("symbol") not in payloads.SYMBOLS:
+            raise HttpError(400, "Unknown symbol")
+        try:
+            float(spec.get("size"))
+        except (TypeError, ValueError):
+            raise HttpError(400, "Invalid size")
+        client_id = spec.get("client_id")
+        with self._lock:
+            if client_id and client_id in self.client_ids:
+                raise HttpError(400, "Duplicate client_id")
+            order = payloads.order(str(uuid.uuid4()), spec, self._timestamp())
+            self.orders[order["order_id"]] = order
+            if client_id:
+                self.client_ids[client_id] = order["order_id"]
+            self.listings["orders"].add(order)
+        self.publish("user", {"type": "order", "event": "accepted", "order": dict(order)})
+        return order
+
+    def create_order(self, query, body):
+        return {"message": "New order request received.", "order": self._new_order(body)}
+
+    def create_orders(self, query, body):
+        if not isinstance(body, list):
+            raise HttpError(400, "Expected a list of orders")
+        results = []
+        for spec in body:
+            try:
+                results.append(self._new_order(spec))
+            except HttpError as e:
+                results.append({"client_id": spec.get("client_id"), "message": e.message})
+        return {"orders": results}
+
+    def _live_order(self, order_id):
+        order = self.orders.get(order_id)
+        if order is None:
+            raise HttpError(404, "Order not found")
+        return order
+
+    def get_order(self, query, body, order_id):
+        return {"order": self._live_order(order_id)}
+
+    def modify_order(self, query, body, order_id):
+        order = self._live_order(order_id)
+        if order["status"] in ("done", "canceled"):
+            raise HttpError(400, "Order is not open")
+        changes = body if isinstance(body, dict) else {}
+        for field in ("type", "stop_trigger"):
+            if changes.get(field) is not None:
+                order[field] = changes[field]
+        for field in ("size", "price", "stop_price"):
+            if changes.get(field) is not None:
+                order[field] = str(changes[field])
+        order["updated_at"] = self._timestamp()
+        self.publish("user", {"type": "order", "event": "modified", "order": dict(order)})
+        return {"message": "Order modify request received.", "order": order}
+
+    def _cancel(self, order):
+        if order["status"] in ("done", "canceled"):
+            return False
+        order["status"] = "canceled"
+        order["updated_at"] = self._timestamp()
+        self.publish("user", {"type": "order", "event": "canceled", "order": dict(order)})
+        return True
+
+    def cancel_order(self, query, body, order_id):
+        if not self._cancel(self._live_order(order_id)):
+            raise HttpError(400, "Order is not open")
+        return {"message": "Cancel order request received.", "order_id": order_id}
+
+    def cancel_orders(self, query, body):
+        if isinstance(body, list):
+            targets = [self.orders[i] for i in body if i in self.orders]
+        else:
+            symbols = (body or {}).get("symbol") or (body or {}).get("symbols")
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            targets = [
+                order
+                for order in list(self.orders.values())
+                if not symbols or order["symbol"] in symbols
+            ]
+        canceled = [o["order_id"] for o in targets if self._cancel(o)]
+        return {"message": "Cancel order request received.", "order_ids": canceled}
+
+    def get_reports(self, query, body):
+        now = self.now()
+        with self._lock:
+            for report, ready_at in self.reports.values():
+                if report["status"] == "pending" and now >= ready_at:
+                    report["status"] = "complete"
+                    report["url"] = f"{self.url}/downloads/{report['report_id']}.csv"
+        return {"reports": self.listings["reports"].page(query)}
+
+    def create_report(self, query, body):
+        body = body if isinstance(body, dict) else {}
+        kind = body.get("type", "fills")
+        if kind not in _REPORT_LISTINGS:
+            raise HttpError(400, "Unknown report type")
+        report = {
+            "report_id": str(uuid.uuid4()),
+            "type": kind,
+            "status": "pending",
+            "start_time": body.get("start_time"),
+            "end_time": body.get("end_time"),
+            "url": None,
+            "created_at": self._timestamp(),
+        }
+        with self._lock:
+            self.reports[report["report_id"]] = (report, self.now() + self.report_delay)
+            self.listings["reports"].add(report)
+        return {"message": "Report request received.", "report_id": report["report_id"]}
+
+    def report_rows(self, report_id: str):
+        """CSV lines (bytes) of a requested report, header first."""
+        report, _ = self.reports[report_id]
+        listing = self.listings[_REPORT_LISTINGS[report["type"]]]
+        start, end = report["start_time"], report["end_time"]
+        lo = bisect.bisect_left(listing.times, _epoch(start)) if start else 0
+        hi = bisect.bisect_right(listing.times, _epoch(end)) if end else len(listing.items)
+        items = listing.items[lo:hi]
+        if not items:
+            return
+        fields = list(items[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(fields)
+        for item in items:
+            writer.writerow([item.get(field) for field in fields])
+            if buffer.tell() >= 1 << 15:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+
+    def get_transfers(self, query, body):
+        return {"transfers": self.listings["transfers"].page(query)}
+
+    def transfer(self, query, body, kind):
+        return {"transfer_id": str(uuid.uuid4())}
+
+    def get_symbols(self, query, body):
+        return payloads.symbols()
+
+    def get_symbol_summary(self, query, body):
+        return payloads.symbol_summary()
+
+    def _symbol(self, symbol):
+        if symbol not in payloads.SYMBOLS:
+            raise HttpError(404, "Symbol not found")
+
+    def get_symbol(self, query, body, symbol):
+        self._symbol(symbol)
+        entries = payloads.symbols()["symbols"]
+        return {"symbol": next(s for s in entries if s["symbol"] == symbol)}
+
+    def get_candles(self, query, body, symbol):
+        self._symbol(symbol)
+        step = {"1m": 60, "5m": 300, "30m": 1800}.get(query.get("granularity", "1m"))
+        if step is None:
+            raise HttpError(400, "Invalid granularity")
+        if "end_time" in query:
+            end = payloads.parse_time(query["end_time"])
+        else:
+            end = datetime.fromtimestamp(self.now() // step * step, timezone.utc)
+        if "start_time" in query:
+            start = payloads.parse_time(query["start_time"])
+        else:
+            start = datetime.fromtimestamp(end.timestamp() - 999 * step, timezone.utc)
+        end = min(end, start.fromtimestamp(start.timestamp() + 999 * step, timezone.utc))
+        return payloads.candles(start, end, step, seed=hash(symbol) & 0xFFFF)
+
+    def get_auctions(self, query, body, symbol):
+        self._symbol(symbol)
+        auctions = self.listings["auctions"].page(query, lambda a: a["symbol"] == symbol)
+        return {"auctions": auctions}
+
+    def get_auction(self, query, body, symbol, auction_code):
+        for auction in self.listings["auctions"].items:
+            if auction["auction_code"] == auction_code:
+                return auction
+        raise HttpError(404, "Auction not found")
+
+    def get_book(self, query, body, symbol):
+        self._symbol(symbol)
+        return payloads.book(symbol, self.book_depth, self._timestamp())
+
+    def get_quote(self, query, body, symbol):
+        self._symbol(symbol)
+        return {"quote": payloads.quote(symbol, self._timestamp())}
+
+
+_ROUTES = [
+    (method, re.compile(pattern), name)
+    for method, pattern, name in (
+        ("GET", r"/v1/accounts", "get_accounts"),
+        ("GET", r"/v1/accounts/([^/]+)", "get_account"),
+        ("GET", r"/v1/accounts/([^/]+)/ledger", "get_ledger"),
+        ("GET", r"/v1/accounts/([^/]+)/wallets", "get_wallets"),
+        ("GET", r"/v1/accounts/([^/]+)/ledger-summary", "get_ledger_summary"),
+        ("GET", r"/v1/balances", "get_balances"),
+        ("GET", r"/v1/fees", "get_fees"),
+        ("GET", r"/v1/keys", "get_api_keys"),
+        ("GET", r"/v1/time", "get_time"),
+        ("GET", r"/v1/fills", "get_fills"),
+        ("GET", r"/v1/orders", "list_orders"),
+        ("POST", r"/v1/orders", "create_order"),
+        ("POST", r"/v1/orders/bulk", "create_orders"),
+        ("DELETE", r"/v1/orders", "cancel_orders"),
+        ("GET", r"/v1/orders/([^/]+)", "get_order"),
+        ("PATCH", r"/v1/orders/([^/]+)", "modify_order"),
+        ("DELETE", r"/v1/orders/([^/]+)", "cancel_order"),
+        ("GET", r"/v1/reports", "get_reports"),
+        ("POST", r"/v1/reports", "create_report"),
+        ("GET", r"/v1/transfers", "get_transfers"),
+        ("POST", r"/v1/transfers/(to-wallet|from-wallet|internal-transfer)", "transfer"),
+        ("GET", r"/v1/symbols", "get_symbols"),
+        ("GET", r"/v1/symbols/summary", "get_symbol_summary"),
+        ("GET", r"/v1/symbols/([^/]+)", "get_symbol"),
+        ("GET", r"/v1/symbols/([^/]+)/candles", "get_candles"),
+        ("GET", r"/v1/symbols/([^/]+)/auctions", "get_auctions"),
+        ("GET", r"/v1/symbols/([^/]+)/auctions/([^/]+)", "get_auction"),
+        ("GET", r"/v1/symbols/([^/]+)/book", "get_book"),
+        ("GET", r"/v1/symbols/([^/]+)/quote", "get_quote"),
+    )
+]
+
+
+class _HttpHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    exchange = None
+
+    def _handle(self):
+        exchange = self.exchange
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+        if self.command == "GET" and url.path.startswith("/downloads/"):
+            # Like a pre-signed storage URL: no signature, chunked CSV.
+            return self._download(url.path[len("/downloads/") : -len(".csv")])
+        try:
+            exchange._delay(self.command, url.path)
+            if exchange.verify:
+                exchange.check_signature(self.headers, self.command, self.path, body)
+            injected = exchange._injected_error(self.command, url.path)
+            if injected is not None and not injected[1]:
+                raise HttpError(injected[0], "Injected error")
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            data = json.loads(body) if body.strip() else None
+            status, payload = 200, exchange.handle(self.command, url.path, query, data)
+            if injected is not None:
+                raise HttpError(injected[0], "Injected error")
+        except HttpError as e:
+            if e.status == 401:
+                exchange.rejected[e.message] += 1
+            status, payload = e.status, {"status": e.status, "message": e.message}
+        except (KeyError, ValueError) as e:
+            status, payload = 400, {"status": 400, "message": f"Bad request: {e}"}
+        self._reply(status, payload)
+
+    def _reply(self, status: int, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status in (429, 503):
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _download(self, report_id: str):
+        exchange = self.exchange
+        report = exchange.reports.get(report_id)
+        if report is None or report[0]["status"] != "complete":
+            return self._reply(404, {"status": 404, "message": "Report not found"})
+        exchange.hits["GET /downloads"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in exchange.report_rows(report_id):
+            if chunk:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    do_GET = do_POST = do_DELETE = do_PATCH = _handle
+
+    def date_time_string(self, timestamp=None):
+        if timestamp is None:
+            timestamp = self.exchange.now()
+        return super().date_time_string(timestamp)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connection bursts from concurrent clients.
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (cancelled hedges, closed pools) are expected.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+
+class _WsHandler(socketserver.StreamRequestHandler):
+    """Minimal RFC 6455 server side: text frames, ping/pong and close."""
+
+    exchange = None
+
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send_lock = threading.Lock()
+        self.channels = {}
+        self.authenticated = False
+        self.closed = False
+
+    def handle(self):
+        if not self._handshake():
+            return
+        exchange = self.exchange
+        with exchange._ws_lock:
+            exchange.ws_connections.append(self)
+        try:
+            while not self.closed:
+                frame = self._read_frame()
+                if frame is None:
+                    break
+                opcode, data = frame
+                if opcode == 0x8:
+                    self._send_frame(0x8, data[:2])
+                    break
+                if opcode == 0x9:
+                    self._send_frame(0xA, data)
+                elif opcode in (0x1, 0x2):
+                    self._on_message(json.loads(data))
+        except (OSError, ValueError):
+            pass
+        finally:
+            with exchange._ws_lock:
+                if self in exchange.ws_connections:
+                    exchange.ws_connections.remove(self)
+
+    def _handshake(self):
+        headers = {}
+        self.rfile.readline()
+        while True:
+            line = self.rfile.readline().decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if not key:
+            self.wfile.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return False
+        accept = base64.b64encode(hashlib.sha1(key.encode("ascii") + _WS_GUID).digest())
+        self.wfile.write(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+        return True
+
+    def _read_exact(self, n: int):
+        data = self.rfile.read(n)
+        if len(data) < n:
+            raise OSError("Connection closed")
+        return data
+
+    def _read_frame(self):
+        message, message_opcode = b"", None
+        while True:
+            try:
+                b0, b1 = self._read_exact(2)
+            except OSError:
+                return None
+            opcode, length = b0 & 0x0F, b1 & 0x7F
+            if length == 126:
+                (length,) = struct.unpack("!H", self._read_exact(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", self._read_exact(8))
+            mask = self._read_exact(4) if b1 & 0x80 else None
+            data = self._read_exact(length)
+            if mask:
+                data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+            if opcode >= 0x8:
+                return opcode, data
+            if opcode:
+                message_opcode = opcode
+            message += data
+            if b0 & 0x80:
+                return message_opcode, message
+
+    def _send_frame(self, opcode: int, data: bytes):
+        n = len(data)
+        if n < 126:
+            header = struct.pack("!BB", 0x80 | opcode, n)
+        elif n < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+        with self.send_lock:
+            self.wfile.write(header + data)
+
+    def send_text(self, data: bytes):
+        self._send_frame(0x1, data)
+
+    def send_json(self, message: dict):
+        self.send_text(json.dumps(message).encode("utf-8"))
+
+    def close(self):
+        self.closed = True
+        try:
+            self.request.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def subscribed(self, channel: str, symbol: str = None):
+        symbols = self.channels.get(channel)
+        if symbols is None:
+            return False
+        if channel == "user" and not self.authenticated:
+            return False
+        return symbol is None or not symbols or symbol in symbols
+
+    def _on_message(self, message: dict):
+        kind = message.get("type")
+        if kind == "auth":
+            exchange = self.exchange
+            timestamp = str(message.get("timestamp", ""))
+            expected = exchange.signature((timestamp + "GET/v1/websocket").encode("utf-8"))
+            if message.get("key") == exchange.key and hmac.compare_digest(
+                str(message.get("signature", "")), expected
+            ):
+                self.authenticated = True
+                self.send_json({"type": "auth", "status": "ok"})
+            else:
+                exchange.rejected["Invalid websocket signature"] += 1
+                self.send_json({"type": "error", "message": "Invalid signature"})
+        elif kind in ("subscribe", "unsubscribe"):
+            for channel in message.get("channels") or []:
+                name, symbols = channel.get("name"), channel.get("symbols") or []
+                if kind == "subscribe":
+                    self.channels.setdefault(name, set()).update(symbols)
+                elif name in self.channels:
+                    self.channels[name].difference_update(symbols)
+                    if not symbols or not self.channels[name]:
+                        del self.channels[name]
+            self.send_json(
+                {
+                    "type": "subscriptions",
+                    "channels": [
+                        {"name": name, "symbols": sorted(symbols)}
+                        for name, symbols in self.channels.items()
+                    ],
+                }
+            )
@@ -0,0 +1,310 @@
+"""Recorded-shape CoinList payloads served by the fake exchange.
+
+Static responses follow the field names and string-encoded numbers of the
+live API. Listings (fills, orders, ledger, transfers, auctions) are
+generated deterministically from a seed, one item per ``step`` seconds
+starting at ``EPOCH``.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(2021, 6, 1, tzinfo=timezone.utc)
+TRADER_ID = "9c5f6b5e-bc2c-4c4b-8c56-1a2b3c4d5e6f"
+
+SYMBOLS = {
+    "BTC-USD": {"price": 36250.0, "tick": "0.01", "lot": "0.0001"},
+    "ETH-USD": {"price": 2550.0, "tick": "0.01", "lot": "0.001"},
+    "SOL-USD": {"price": 34.5, "tick": "0.001", "lot": "0.01"},
+    "ICP-USD": {"price": 61.2, "tick": "0.001", "lot": "0.01"},
+}
+
+
+def isoformat(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + "%03dZ" % (dt.microsecond // 1000)
+
+
+def parse_time(value: str):
+    """Parse the date-time formats accepted by list endpoints."""
+    value = value.strip().replace("Z", "+00:00").replace(" ", "T")
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def symbols():
+    return {
+        "symbols": [
+            {
+                "symbol": symbol,
+                "base_currency": symbol.split("-")[0],
+                "quote_currency": "USD",
+                "is_trading": True,
+                "type": "spot",
+                "minimum_price_increment": spec["tick"],
+                "minimum_size_increment": spec["lot"],
+                "list_time": "2021-01-01T00:00:00.000Z",
+                "auction_duration_ms": 250,
+                "fair_price": "%.2f" % spec["price"],
+                "index_price": "%.2f" % spec["price"],
+            }
+            for symbol, spec in SYMBOLS.items()
+        ]
+    }
+
+
+def symbol_summary():
+    return {
+        symbol: {
+            "type": "spot",
+            "last_price": "%.2f" % spec["price"],
+            "lowest_ask": "%.2f" % (spec["price"] * 1.0005),
+            "highest_bid": "%.2f" % (spec["price"] * 0.9995),
+            "last_trade": {
+                "price": "%.2f" % spec["price"],
+                "volume": "0.5",
+                "imbalance": "0",
+                "logicalTime": "2021-06-01T00:00:00.000Z",
+                "auctionCode": f"{symbol}-2021-06-01T00:00:00.000Z",
+            },
+            "volume_base_24h": "1234.5",
+            "volume_quote_24h": "%.2f" % (1234.5 * spec["price"]),
+            "price_change_percent_24h": "1.25",
+            "highest_price_24h": "%.2f" % (spec["price"] * 1.02),
+            "lowest_price_24h": "%.2f" % (spec["price"] * 0.98),
+        }
+        for symbol, spec in SYMBOLS.items()
+    }
+
+
+def quote(symbol: str, logical_time: str):
+    price = SYMBOLS.get(symbol, {"price": 100.0})["price"]
+    return {
+        "ask": "%.2f" % (price * 1.0005),
+        "ask_size": "1.2500",
+        "bid": "%.2f" % (price * 0.9995),
+        "bid_size": "0.7500",
+        "last": "%.2f" % price,
+        "last_size": "0.0100",
+        "auction_code": f"{symbol}-{logical_time}",
+        "logical_time": logical_time,
+        "call_time": logical_time,
+    }
+
+
+def book(symbol: str, depth: int, logical_time: str):
+    price = SYMBOLS.get(symbol, {"price": 100.0})["price"]
+    tick = price * 0.0001
+    return {
+        "bids": [
+            ["%.2f" % (price - (i + 1) * tick), "%.4f" % (0.1 + i * 0.05), 1 + i % 3]
+            for i in range(depth)
+        ],
+        "asks": [
+            ["%.2f" % (price + (i + 1) * tick), "%.4f" % (0.1 + i * 0.05), 1 + i % 3]
+            for i in range(depth)
+        ],
+        "auction_code": f"{symbol}-{logical_time}",
+        "call_time": logical_time,
+        "logical_time": logical_time,
+    }
+
+
+def candles(start: datetime, end: datetime, step: int, seed: int = 0):
+    rng = random.Random(seed)
+    start_epoch = int(start.timestamp()) // step * step
+    rows = []
+    price = 100.0
+    for t in range(start_epoch, int(end.timestamp()) + 1, step):
+        move = rng.uniform(-0.5, 0.5)
+        open_, close = price, price + move
+        rows.append(
+            [
+                isoformat(datetime.fromtimestamp(t, timezone.utc)),
+                "%.2f" % open_,
+                "%.2f" % (max(open_, close) + 0.1),
+                "%.2f" % (min(open_, close) - 0.1),
+                "%.2f" % close,
+                "%.4f" % rng.uniform(0, 5),
+                "%.2f" % close,
+            ]
+        )
+        price = close
+    return {"candles": rows}
+
+
+def accounts():
+    return {"accounts": [{"trader_id": TRADER_ID, "name": "Main"}]}
+
+
+def account_summary():
+    return {
+        "asset_balances": {"BTC": "1.25000000", "USD": "50000.0000", "ETH": "10.000"},
+        "asset_holds": {"BTC": "0.10000000", "USD": "1500.0000"},
+        "net_liquidation_value_usd": "120812.5000",
+    }
+
+
+def balances():
+    summary = account_summary()
+    return {
+        "asset_balances": summary["asset_balances"],
+        "asset_holds": summary["asset_holds"],
+    }
+
+
+def wallets():
+    return {
+        "wallets": [
+            {"asset": "BTC", "balance": "0.50000000"},
+            {"asset": "USD", "balance": "1000.0000"},
+        ]
+    }
+
+
+def ledger_summary():
+    return {
+        "ledger_summary": [
+            {"date": "2021-06-01", "asset": "BTC", "amount": "0.05", "count": 4},
+            {"date": "2021-06-01", "asset": "USD", "amount": "-1812.50", "count": 4},
+        ]
+    }
+
+
+def fees():
+    return {
+        "fees_by_symbols": {
+            symbol: {
+                "base": {
+                    "fees": {"maker": "0.0045", "taker": "0.005", "liquidation": "0.005"},
+                    "floors": {"maker": None, "taker": None},
+                },
+                "volume_tier_1": {
+                    "fees": {"maker": "0.0035", "taker": "0.0045"},
+                    "floors": {"maker": None, "taker": None},
+                },
+            }
+            for symbol in SYMBOLS
+        }
+    }
+
+
+def api_keys():
+    return {
+        "keys": [
+            {
+                "key": "key",
+                "permissions": ["read", "trade"],
+                "created_at": "2021-05-01T00:00:00.000Z",
+            }
+        ]
+    }
+
+
+def order(order_id: str, spec: dict, created_at: str, status: str = "accepted"):
+    return {
+        "order_id": order_id,
+        "client_id": spec.get("client_id"),
+        "symbol": spec.get("symbol"),
+        "type": spec.get("type", "limit"),
+        "side": spec.get("side"),
+        "size": _str(spec.get("size")),
+        "price": _str(spec.get("price")),
+        "stop_price": _str(spec.get("stop_price")),
+        "stop_trigger": spec.get("stop_trigger"),
+        "size_filled": "0",
+        "fill_fees": "0",
+        "average_fill_price": None,
+        "status": status,
+        "post_only": bool(spec.get("post_only", False)),
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def history(n: int, step: float = 1.0, seed: int = 0):
+    """Generated listings: fills, orders, transactions, transfers and auctions.
+
+    Every listing holds ``n`` items sorted ascending by its time field; every
+    fourth item shares the timestamp of the previous one, so clients must
+    handle ties at page boundaries.
+    """
+    rng = random.Random(seed)
+    names = list(SYMBOLS)
+    fills, orders, transactions, transfers, auctions = [], [], [], [], []
+    for i in range(n):
+        at = isoformat(EPOCH + timedelta(seconds=step * (i - (i % 4 == 3))))
+        symbol = names[i % len(names)]
+        price = SYMBOLS[symbol]["price"] * (1 + rng.uniform(-0.01, 0.01))
+        size = round(rng.uniform(0.01, 2), 4)
+        side = "buy" if rng.random() < 0.5 else "sell"
+        order_id = "%08x-0000-4000-8000-%012x" % (seed, i)
+        fee = price * size * 0.0045
+        fills.append(
+            {
+                "fill_id": "fill-%d" % i,
+                "order_id": order_id,
+                "symbol": symbol,
+                "auction_code": f"{symbol}-{at}",
+                "side": side,
+                "price": "%.2f" % price,
+                "quantity": "%.4f" % size,
+                "fee": "%.6f" % fee,
+                "fee_type": "maker" if i % 3 else "taker",
+                "fee_currency": "USD",
+                "logical_time": at,
+            }
+        )
+        filled = order(
+            order_id,
+            {"symbol": symbol, "side": side, "size": size, "price": "%.2f" % price},
+            at,
+            status="done",
+        )
+        filled.update(
+            size_filled="%.4f" % size,
+            fill_fees="%.6f" % fee,
+            average_fill_price="%.2f" % price,
+        )
+        orders.append(filled)
+        transactions.append(
+            {
+                "transaction_id": "txn-%d" % i,
+                "transaction_type": "trade",
+                "type": "trade",
+                "asset": "USD",
+                "amount": "%.4f" % (price * size * (1 if side == "sell" else -1)),
+                "created_at": at,
+            }
+        )
+        transfers.append(
+            {
+                "transfer_id": "transfer-%d" % i,
+                "created_at": at,
+                "confirmed_at": at,
+                "asset": "BTC" if i % 2 else "USD",
+                "amount": "%.4f" % size,
+                "status": "confirmed",
+            }
+        )
+        auctions.append(
+            {
+                "auction_code": f"{symbol}-{at}-{i}",
+                "symbol": symbol,
+                "logical_time": at,
+                "price": "%.2f" % price,
+                "volume": "%.4f" % size,
+                "imbalance": "0",
+            }
+        )
+    return {
+        "fills": fills,
+        "orders": orders,
+        "transactions": transactions,
+        "transfers": transfers,
+        "auctions": auctions,
+    }
+
+
+def _str(value):
+    return None if value is None else str(value)
@@ -0,0 +1,46 @@
+"""Minimal keep-alive HTTP stub used by the benchmarks."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    payload = b'{"accounts":[{"trader_id":"bench"}]}'
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+
+    do_GET = do_POST = do_DELETE = do_PATCH = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer:
+    """Serve a fixed JSON payload on 127.0.0.1 in a background thread."""
+
+    def __init__(self, payload=None):
+        handler = type("Handler", (_Handler,), {})
+        if payload is not None:
+            handler.payload = json.dumps(payload).encode("utf-8")
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.url = "http://127.0.0.1:%d" % self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
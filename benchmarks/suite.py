@@ -0,0 +1,202 @@
+"""End-to-end benchmark suite against the local fake exchange.
+
+Covers order-entry throughput, market-data fetch latency and paging speed
+through the real client stack (signing, rate limiter, transport, codec).
+Results are written as JSON to ``benchmarks/results/<label>.json``; pass
+``--compare`` with an earlier result file to print the change of every
+metric and fail on regressions.
+
+Run with ``python -m benchmarks.suite [--label v0.2.0] [--compare results.json]``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fake_exchange import KEY, SECRET, FakeExchange
+from coinlist import AsyncCoinlistApi, CoinlistApi
+from coinlist.async_client import aiohttp
+from coinlist.ratelimit import RequestScheduler
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": samples[len(samples) // 2] * 1e3,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e3,
+        "mean_ms": statistics.mean(samples) * 1e3,
+    }
+
+
+def _timed(fn, n):
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def _client(exchange):
+    client = CoinlistApi(KEY, SECRET, scheduler=RequestScheduler.unlimited())
+    client.endpoint_url = exchange.url
+    client.wss_url = exchange.ws_url
+    return client
+
+
+def bench_order_entry(exchange, n):
+    results = {}
+    with _client(exchange) as client:
+        client.get_symbols()  # warm the connection pool
+        t0 = time.perf_counter()
+        for i in range(n):
+            client.create_order(36000 + i % 10, "0.001", "BTC-USD", "buy")
+        results["create_order_per_s"] = n / (time.perf_counter() - t0)
+
+        orders = [
+            {"symbol": "BTC-USD", "side": "buy", "size": "0.001", "price": 36000}
+        ] * n
+        t0 = time.perf_counter()
+        created = client.create_orders(orders)
+        results["create_orders_bulk_per_s"] = n / (time.perf_counter() - t0)
+        assert all(r["order_id"] for r in created), "bulk orders failed"
+    return results
+
+
+def bench_market_data(exchange, n):
+    results = {}
+    with _client(exchange) as client:
+        client.get_quote("BTC-USD")
+        for name, fn in (
+            ("get_quote", lambda: client.get_quote("BTC-USD")),
+            ("get_order_book", lambda: client.get_order_book("BTC-USD")),
+        ):
+            for key, value in _percentiles(_timed(fn, n)).items():
+                results[f"{name}_{key}"] = value
+    if aiohttp is not None:
+        results["async_get_quote_per_s"] = asyncio.run(_async_quotes(exchange, n))
+    return results
+
+
+async def _async_quotes(exchange, n):
+    # Identical concurrent reads would be coalesced into one request.
+    async with AsyncCoinlistApi(
+        KEY, SECRET, scheduler=RequestScheduler.unlimited(), coalesce=False
+    ) as client:
+        client.endpoint_url = exchange.url
+        await client.get_quote("BTC-USD")
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client.get_quote("BTC-USD") for _ in range(n)))
+        return n / (time.perf_counter() - t0)
+
+
+def bench_paging(exchange, count):
+    results = {}
+    with _client(exchange) as client:
+        for prefetch in (False, True):
+            t0 = time.perf_counter()
+            items = sum(1 for _ in client.iter_fills(count=count, prefetch=prefetch))
+            name = "prefetch" if prefetch else "sequential"
+            results[f"iter_fills_{name}_items_per_s"] = items / (time.perf_counter() - t0)
+    return results
+
+
+def run(latency: float = 0.001, n: int = 500, history: int = 10000, page: int = 500):
+    """Run every benchmark and return the result document."""
+    metrics = {}
+    with FakeExchange(latency=latency, history=history) as exchange:
+        metrics.update(bench_order_entry(exchange, n))
+        metrics.update(bench_market_data(exchange, n))
+        metrics.update(bench_paging(exchange, page))
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"latency": latency, "n": n, "history": history, "page": page},
+        "metrics": {name: round(value, 3) for name, value in metrics.items()},
+    }
+
+
+def compare(current: dict, previous: dict, threshold: float):
+    """Relative change of every metric; negative is worse.
+
+    Returns:
+        Tuple: (rows of (name, previous, current, change), regressed names)
+    """
+    rows, regressions = [], []
+    for name, value in current["metrics"].items():
+        before = previous.get("metrics", {}).get(name)
+        if not before:
+            continue
+        change = (value - before) / before
+        if not _higher_is_better(name):
+            change = -change
+        rows.append((name, before, value, change))
+        if change < -threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def _higher_is_better(name: str):
+    if name.endswith("_per_s"):
+        return True
+    return not name.endswith("_ms")
+
+
+def _default_label():
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        rev = "local"
+    return rev
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--label", default=None, help="Result name (default: git revision)")
+    parser.add_argument("--compare", default=None, help="Earlier result file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown")
+    parser.add_argument("--latency", type=float, default=0.001, help="Server latency (s)")
+    parser.add_argument("-n", type=int, default=500, help="Requests per benchmark")
+    parser.add_argument("--history", type=int, default=10000, help="Items to page over")
+    args = parser.parse_args(argv)
+
+    result = run(latency=args.latency, n=args.n, history=args.history)
+    result["label"] = args.label or _default_label()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, result["label"] + ".json")
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+
+    for name, value in sorted(result["metrics"].items()):
+        print(f"{name:<42} {value:>12.3f}")
+    print(f"saved {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        rows, regressions = compare(result, previous, args.threshold)
+        print(f"\nvs {previous.get('label', args.compare)}:")
+        for name, before, value, change in rows:
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:<42} {before:>12.3f} -> {value:>12.3f} {change:+7.1%}{flag}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
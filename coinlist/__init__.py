@@ -1 +1,18 @@
 from coinlist.client import CoinlistApi
+from coinlist.async_client import AsyncCoinlistApi
+from coinlist.streams import CoinlistStream
+from coinlist.orderbook import LocalOrderBook, OrderBooks
+from coinlist.ratelimit import RequestScheduler
+from coinlist.candles import CandleDownloader
+from coinlist.symbols import OrderValidationError, SymbolRegistry
+from coinlist.codec import JsonCodec
+from coinlist.instrumentation import MetricsCollector, PrometheusExporter
+from coinlist.orders import OrderTracker
+from coinlist.pool import ClientPool, FanOutResult
+from coinlist.snapshot import MarketSnapshot
+from coinlist.analytics import FeeSchedule, FillAnalytics
+from coinlist.reports import ReportDownloader
+from coinlist.clock import ClockSync
+from coinlist.ladder import LadderReconciler
+from coinlist.warehouse import Warehouse
+from coinlist.models import ApiError
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from coinlist.models import is_error
+
+
+class AccountContext:
+    """Cached trader accounts resolved from ``/v1/accounts``.
+
+    Args:
+        ttl (float, optional): Seconds before the cached accounts are considered
+            stale. ``None`` keeps them until ``invalidate`` is called.
+        trader_id (str, optional): Account to select once accounts are loaded.
+            Defaults to the first account returned by the exchange.
+    """
+
+    def __init__(self, ttl: float = None, trader_id: str = None):
+        self.ttl = ttl
+        self._selected = trader_id
+        self._accounts = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def fresh(self):
+        if self._accounts is None:
+            return False
+        return self.ttl is None or time.monotonic() - self._loaded_at < self.ttl
+
+    @property
+    def accounts(self):
+        """List of cached account dicts (empty if never loaded)."""
+        return list(self._accounts or [])
+
+    @property
+    def trader_ids(self):
+        return [a["trader_id"] for a in self._accounts or []]
+
+    @property
+    def trader_id(self):
+        """Currently selected trader ID, or None if accounts are not loaded."""
+        with self._lock:
+            if not self._accounts:
+                return self._selected
+            if self._selected is None:
+                return self._accounts[0]["trader_id"]
+            return self._selected
+
+    def update(self, response: dict):
+        """Store the accounts from a ``/v1/accounts`` response.
+
+        Error responses are not cached; accounts loaded before are kept.
+
+        Args:
+            response (dict): Response of ``list_accounts``.
+        """
+        if is_error(response):
+            return
+        accounts = response["accounts"]
+        with self._lock:
+            self._accounts = accounts
+            self._loaded_at = time.monotonic()
+
+    def select(self, trader_id: str):
+        """Select the account used by account endpoints.
+
+        Args:
+            trader_id (str): One of ``trader_ids``.
+        """
+        with self._lock:
+            if self._accounts is not None:
+                ids = [a["trader_id"] for a in self._accounts]
+                if trader_id not in ids:
+                    raise ValueError(f"Unknown trader_id {trader_id!r}, expected one of {ids}")
+            self._selected = trader_id
+
+    def invalidate(self):
+        """Drop cached accounts; the next account call reloads them."""
+        with self._lock:
+            self._accounts = None
+            self._loaded_at = 0.0
@@ -0,0 +1,432 @@
+"""Vectorized fill and ledger analytics: positions, realized PnL, VWAP and fees."""
+import itertools
+import threading
+import time
+
+from coinlist.transport import require_sync
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+FIFO = "fifo"
+AVERAGE = "average"
+
+MAKER = "maker"
+TAKER = "taker"
+
+
+def _require_numpy(name: str):
+    if np is None:
+        raise ImportError(f"{name} requires numpy: pip install coinlist-python[numpy]")
+
+
+class FeeSchedule:
+    """Cached ``/v1/fees`` schedule.
+
+    Refreshed through ``client.list_fees`` when older than ``ttl``.
+
+    Args:
+        client (CoinlistApi, optional): Client used to load and refresh the schedule.
+        ttl (float, optional): Seconds before the schedule is refreshed. Defaults to 3600.
+        tier (str, optional): Fee tier used for rates. Defaults to "base".
+    """
+
+    def __init__(self, client=None, ttl: float = 3600, tier: str = "base"):
+        require_sync(client, "FeeSchedule")
+        self.client = client
+        self.ttl = ttl
+        self.tier = tier
+        self.loaded_at = None
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self):
+        return self.loaded_at is None or time.time() - self.loaded_at >= self.ttl
+
+    def load(self, response: dict):
+        """Index a ``/v1/fees`` response (``{"fees_by_symbols": {...}}``)."""
+        rates = {}
+        for symbol, tiers in (response.get("fees_by_symbols") or {}).items():
+            fees = ((tiers or {}).get(self.tier) or {}).get("fees") or {}
+            rates[symbol] = {
+                kind: float(rate) for kind, rate in fees.items() if rate is not None
+            }
+        with self._lock:
+            self._rates = rates
+            self.loaded_at = time.time()
+
+    def _refresh(self):
+        if self.client is not None and self.stale:
+            self.load(self.client.list_fees())
+
+    def rate(self, symbol: str, fee_type: str = TAKER):
+        """Fee rate of ``symbol`` for "maker" or "taker" fills, or NaN if unknown."""
+        self._refresh()
+        return self._rates.get(symbol, {}).get(fee_type, float("nan"))
+
+
+def fill_columns(fills, codes: dict):
+    """Columns of a chunk of fills as NumPy arrays.
+
+    A ``FillArray`` (``list_fills`` with ``models=True``) is the fast path:
+    its float columns are already parsed, so loading it is a copy. Dicts pay for parsing every numeric string,
+    which bounds them at roughly the speed of a plain per-fill loop.
+
+    Args:
+        fills (list or FillArray): Fill dicts or ``models.Fill`` objects, in time order.
+        codes (dict): Symbol to integer code; new symbols are added.
+
+    Returns:
+        Dict: ``code`` (int64), ``side`` (+1 buy, -1 sell), ``quantity``,
+        ``price`` and ``fee`` (float64, NaN when missing) and ``maker`` (bool).
+    """
+    if hasattr(fills, "column"):
+        symbols = fills.column("symbol")
+        sides = fills.column("side")
+        fee_types = fills.column("fee_type")
+        quantity = np.array(fills.column("quantity"), dtype=float)
+        price = np.array(fills.column("price"), dtype=float)
+        fee = np.array(fills.column("fee"), dtype=float)
+    else:
+        rows = fills if isinstance(fills, list) else list(fills)
+        if rows and not isinstance(rows[0], dict):
+            rows = [f.to_dict() for f in rows]
+        symbols = [r.get("symbol") for r in rows]
+        sides = [r.get("side") for r in rows]
+        fee_types = [r.get("fee_type") for r in rows]
+        quantity = _float_column(rows, "quantity")
+        price = _float_column(rows, "price")
+        fee = _float_column(rows, "fee")
+    for symbol in dict.fromkeys(symbols):
+        codes.setdefault(symbol, len(codes))
+    code = _lookup(symbols, codes, np.int64)
+    side = _lookup(sides, {s: _SIDES.get(s, 0) for s in set(sides)}, np.int64)
+    # Without a side field the sign of the quantity tells buys from sells.
+    side = np.where(side == 0, np.where(quantity < 0, -1, 1), side)
+    maker = _lookup(fee_types, {t: t == MAKER for t in set(fee_types)}, bool)
+    return {
+        "code": code,
+        "side": side,
+        "quantity": np.abs(quantity),
+        "price": price,
+        "fee": fee,
+        "maker": maker,
+    }
+
+
+_SIDES = {"buy": 1, "sell": -1}
+
+
+def _lookup(values, table: dict, dtype):
+    """``table[v]`` for every value; the few distinct values are mapped once."""
+    return np.fromiter(map(table.__getitem__, values), dtype, len(values))
+
+
+def _float_column(rows: list, name: str):
+    """``rows[i][name]`` as float64; numeric strings are parsed by NumPy."""
+    try:
+        return np.fromiter((r[name] for r in rows), float, len(rows))
+    except (KeyError, TypeError, ValueError):
+        return np.array([_float(r.get(name)) for r in rows], dtype=float)
+
+
+def _float(value):
+    return float("nan") if value is None or value == "" else float(value)
+
+
+def _value_of_first(cum_qty, cum_value, price, q: float):
+    """Notional of the first ``q`` units of lots with cumulative qty/value."""
+    if q <= 0 or not len(cum_qty):
+        return 0.0
+    i = int(np.searchsorted(cum_qty, q, side="left"))
+    if i >= len(cum_qty):
+        return float(cum_value[-1])
+    before_qty = cum_qty[i - 1] if i else 0.0
+    before_value = cum_value[i - 1] if i else 0.0
+    return float(before_value + (q - before_qty) * price[i])
+
+
+def _rest_after(qty, price, cum_qty, q: float):
+    """Lots left after the first ``q`` units are consumed."""
+    i = int(np.searchsorted(cum_qty, q, side="right"))
+    if i >= len(qty):
+        return qty[:0], price[:0]
+    rest_qty = qty[i:].copy()
+    rest_qty[0] = cum_qty[i] - q
+    return rest_qty, price[i:].copy()
+
+
+class FillAnalytics:
+    """Per-symbol trading statistics accumulated from chunks of fills.
+
+    Each ``add`` turns a chunk into NumPy columns and updates the per-symbol
+    totals with ``bincount`` passes. FIFO realized PnL is also vectorized:
+    under FIFO the k-th unit bought is always closed against the k-th unit
+    sold, so the realized PnL is the sold notional minus the bought notional
+    of the first ``min(bought, sold)`` units, read off cumulative sums. Only
+    the unmatched lots are carried to the next chunk. Average-cost PnL needs
+    one sequential pass per chunk over plain floats.
+
+    Fills must arrive in time order per symbol, as ``iter_fills`` yields
+    them. Fees are in the quote currency; a fill without a fee is charged at
+    the ``fees`` schedule rate for its maker/taker type. Requires the
+    optional ``numpy`` dependency.
+
+    Usage:
+        stats = FillAnalytics(fees=FeeSchedule(client))
+        for chunk in chunks(client.iter_fills(), 100_000):
+            stats.add(chunk)
+        stats.summary()["realized_pnl"]
+
+    Args:
+        fees (FeeSchedule, optional): Rates for fills without a fee and for
+            ``expected_fees``.
+        method (str, optional): "fifo" or "average" cost basis. Defaults to "fifo".
+    """
+
+    _TOTALS = (
+        "count",
+        "buy_qty",
+        "sell_qty",
+        "buy_notional",
+        "sell_notional",
+        "fees",
+        "expected_fees",
+        "realized_pnl",
+    )
+
+    def __init__(self, fees: FeeSchedule = None, method: str = FIFO):
+        _require_numpy("FillAnalytics")
+        if method not in (FIFO, AVERAGE):
+            raise ValueError(f"Unknown cost basis method {method!r}")
+        self.fees = fees
+        self.method = method
+        self.codes = {}
+        self.totals = {name: np.zeros(0) for name in self._TOTALS}
+        # FIFO: code -> (side of the open lots, quantities, prices).
+        self._lots = {}
+        # Average cost: code -> [signed position, average price].
+        self._average = {}
+
+    @property
+    def symbols(self):
+        return list(self.codes)
+
+    def _grow(self, n: int):
+        for name, values in self.totals.items():
+            if len(values) < n:
+                self.totals[name] = np.concatenate([values, np.zeros(n - len(values))])
+
+    def _rates(self, code, maker):
+        """Schedule rate of every fill, NaN without a schedule."""
+        if self.fees is None:
+            return np.full(len(code), np.nan)
+        symbols = self.symbols
+        maker_rates = np.array([self.fees.rate(s, MAKER) for s in symbols])
+        taker_rates = np.array([self.fees.rate(s, TAKER) for s in symbols])
+        return np.where(maker, maker_rates[code], taker_rates[code])
+
+    def add(self, fills):
+        """Add a chunk of fills (list of dicts, models or a ``FillArray``).
+
+        Returns:
+            FillAnalytics: self.
+        """
+        columns = fill_columns(fills, self.codes)
+        code, side = columns["code"], columns["side"]
+        if not len(code):
+            return self
+        n = len(self.codes)
+        self._grow(n)
+        qty, price = columns["quantity"], columns["price"]
+        notional = qty * price
+        expected = notional * self._rates(code, columns["maker"])
+        fee = np.where(np.isnan(columns["fee"]), expected, columns["fee"])
+        buy = side > 0
+        totals = self.totals
+
+        def add_total(name, weights):
+            totals[name] += np.bincount(code, weights=weights, minlength=n)
+
+        add_total("count", None)
+        add_total("buy_qty", np.where(buy, qty, 0.0))
+        add_total("sell_qty", np.where(buy, 0.0, qty))
+        add_total("buy_notional", np.where(buy, notional, 0.0))
+        add_total("sell_notional", np.where(buy, 0.0, notional))
+        add_total("fees", np.nan_to_num(fee))
+        add_total("expected_fees", np.nan_to_num(expected))
+
+        # Stable sort keeps the time order of fills within each symbol.
+        order = np.argsort(code, kind="stable")
+        sorted_codes = code[order]
+        starts = np.searchsorted(sorted_codes, np.arange(n), side="left")
+        ends = np.searchsorted(sorted_codes, np.arange(n), side="right")
+        realize = self._realize_fifo if self.method == FIFO else self._realize_average
+        for c in np.flatnonzero(ends > starts):
+            rows = order[starts[c] : ends[c]]
+            totals["realized_pnl"][c] += realize(int(c), side[rows], qty[rows], price[rows])
+        return self
+
+    def _realize_fifo(self, code: int, side, qty, price):
+        buy = side > 0
+        buy_qty, buy_price = qty[buy], price[buy]
+        sell_qty, sell_price = qty[~buy], price[~buy]
+        lots = self._lots.get(code)
+        if lots is not None:
+            lot_side, lot_qty, lot_price = lots
+            if lot_side > 0:
+                buy_qty = np.concatenate([lot_qty, buy_qty])
+                buy_price = np.concatenate([lot_price, buy_price])
+            else:
+                sell_qty = np.concatenate([lot_qty, sell_qty])
+                sell_price = np.concatenate([lot_price, sell_price])
+        cum_buy, cum_sell = np.cumsum(buy_qty), np.cumsum(sell_qty)
+        total_buy = float(cum_buy[-1]) if len(cum_buy) else 0.0
+        total_sell = float(cum_sell[-1]) if len(cum_sell) else 0.0
+        matched = min(total_buy, total_sell)
+        realized = _value_of_first(
+            cum_sell, np.cumsum(sell_qty * sell_price), sell_price, matched
+        ) - _value_of_first(cum_buy, np.cumsum(buy_qty * buy_price), buy_price, matched)
+        scale = max(total_buy, total_sell, 1.0)
+        if abs(total_buy - total_sell) <= 1e-12 * scale:
+            self._lots.pop(code, None)
+        elif total_buy > total_sell:
+            self._lots[code] = (1, *_rest_after(buy_qty, buy_price, cum_buy, matched))
+        else:
+            self._lots[code] = (-1, *_rest_after(sell_qty, sell_price, cum_sell, matched))
+        return realized
+
+    def _realize_average(self, code: int, side, qty, price):
+        state = self._average.setdefault(code, [0.0, 0.0])
+        position, average = state
+        realized = 0.0
+        for s, q, p in zip(side.tolist(), qty.tolist(), price.tolist()):
+            if position == 0 or (position > 0) == (s > 0):
+                total = abs(position) + q
+                average = (average * abs(position) + p * q) / total
+                position += s * q
+                continue
+            closed = min(q, abs(position))
+            realized += closed * (p - average) * (1 if position > 0 else -1)
+            position += s * q
+            if abs(position) <= 1e-12 * max(q, 1.0):
+                position, average = 0.0, 0.0
+            elif (position > 0) == (s > 0):
+                # Flipped: the rest of the fill opens a position at its price.
+                average = p
+        state[0], state[1] = position, average
+        return realized
+
+    def _open_cost(self):
+        """Signed position and average entry price of the open position per symbol."""
+        n = len(self.codes)
+        position, entry = np.zeros(n), np.full(n, np.nan)
+        if self.method == FIFO:
+            for code, (side, qty, price) in self._lots.items():
+                size = float(qty.sum())
+                if size > 0:
+                    position[code] = side * size
+                    entry[code] = float((qty * price).sum()) / size
+        else:
+            for code, (pos, average) in self._average.items():
+                position[code] = pos
+                if pos:
+                    entry[code] = average
+        return position, entry
+
+    def summary(self):
+        """Per-symbol statistics as arrays aligned with ``symbols``.
+
+        Returns:
+            Dict: ``symbol`` (list) and arrays ``count``, ``position``,
+            ``entry_price``, ``buy_qty``, ``sell_qty``, ``buy_notional``,
+            ``sell_notional``, ``vwap_buy``, ``vwap_sell``, ``vwap``,
+            ``turnover``, ``fees``, ``expected_fees``, ``realized_pnl`` and
+            ``net_pnl`` (realized minus fees).
+        """
+        totals = {name: values.copy() for name, values in self.totals.items()}
+        position, entry = self._open_cost()
+        turnover = totals["buy_notional"] + totals["sell_notional"]
+        volume = totals["buy_qty"] + totals["sell_qty"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap_buy = totals["buy_notional"] / totals["buy_qty"]
+            vwap_sell = totals["sell_notional"] / totals["sell_qty"]
+            vwap = turnover / volume
+        return dict(
+            symbol=self.symbols,
+            position=position,
+            entry_price=entry,
+            vwap_buy=vwap_buy,
+            vwap_sell=vwap_sell,
+            vwap=vwap,
+            turnover=turnover,
+            net_pnl=totals["realized_pnl"] - totals["fees"],
+            **totals,
+        )
+
+    def unrealized_pnl(self, prices: dict):
+        """Mark-to-market PnL of the open positions at ``{symbol: price}``."""
+        position, entry = self._open_cost()
+        marks = np.array([prices.get(s, np.nan) for s in self.symbols], dtype=float)
+        return np.where(position != 0, position * (marks - entry), 0.0)
+
+
+def chunks(items, size: int = 100_000):
+    """Split any iterable (e.g. ``client.iter_fills()``) into lists of ``size``."""
+    if size < 1:
+        raise ValueError("Chunk size must be positive")
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def analyze_fills(
+    fills, chunk_size: int = 100_000, fees: FeeSchedule = None, method: str = FIFO
+):
+    """``FillAnalytics`` over an iterable of fills, consumed chunk by chunk."""
+    stats = FillAnalytics(fees=fees, method=method)
+    for chunk in chunks(fills, chunk_size):
+        stats.add(chunk)
+    return stats
+
+
+def ledger_totals(entries, chunk_size: int = 100_000):
+    """Sum of ledger ``amount`` per asset and transaction type.
+
+    Args:
+        entries (iterable): Ledger entries (dicts or models), e.g.
+            ``client.iter_account_history()``.
+        chunk_size (int, optional): Entries converted to arrays at a time.
+
+    Returns:
+        Dict: ``{asset: {transaction_type: total}}``.
+    """
+    _require_numpy("ledger_totals")
+    keys = {}
+    totals = np.zeros(0)
+    for chunk in chunks(entries, chunk_size):
+        rows = [e if isinstance(e, dict) else e.to_dict() for e in chunk]
+        code = np.fromiter(
+            (
+                keys.setdefault(
+                    (r.get("asset"), r.get("transaction_type") or r.get("type")), len(keys)
+                )
+                for r in rows
+            ),
+            np.int64,
+            len(rows),
+        )
+        amount = np.array([_float(r.get("amount")) for r in rows], dtype=float)
+        if len(totals) < len(keys):
+            totals = np.concatenate([totals, np.zeros(len(keys) - len(totals))])
+        totals += np.bincount(code, weights=np.nan_to_num(amount), minlength=len(keys))
+    result = {}
+    for (asset, kind), i in keys.items():
+        result.setdefault(asset, {})[kind] = float(totals[i])
+    return result
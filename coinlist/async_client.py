@@ -0,0 +1,513 @@
+import asyncio
+import functools
+import inspect
+import logging
+import time
+
+try:
+    import aiohttp
+    from yarl import URL
+
+    TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from coinlist import models, snapshot
+from coinlist.bulk import (
+    BULK_ORDER_LIMIT,
+    chunked,
+    failed_results,
+    match_results,
+    prepare_orders,
+)
+from coinlist.client import CoinlistApi, _list_params
+from coinlist.instrumentation import RequestEvent
+from coinlist.paging import LIST_ENDPOINTS, MAX_PAGE_SIZE, PageCursor, aiterate
+from coinlist.retry import duplicate_orders, is_order_post, restore_orders
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCoinlistApi(CoinlistApi):
+    """Asyncio Coinlist REST client.
+
+    Mirrors every endpoint of ``CoinlistApi`` as a coroutine, and the
+    ``iter_*`` listings as async generators. Signing and
+    request building are inherited from the sync client; only the transport
+    differs. Requires the optional ``aiohttp`` dependency.
+
+    Usage:
+        async with AsyncCoinlistApi(key, secret) as client:
+            quotes = await asyncio.gather(*(client.get_quote(s) for s in symbols))
+
+    Args:
+        access_key (str, optional): API key.
+        access_secret (str, optional): Base64-encoded API secret.
+        limit (int, optional): Total connections kept in the pool. In-flight
+            requests above the limit wait for a free connection. Defaults to 100.
+        limit_per_host (int, optional): Connections per host, 0 for no extra limit. Defaults to 0.
+        timeout (float, optional): Total timeout per request in seconds. Defaults to 10.
+        session (aiohttp.ClientSession, optional): Shared session. When omitted the
+            client creates and owns one on first use.
+        account_ttl (float, optional): Seconds to cache the account list.
+        trader_id (str, optional): Account used by account endpoints.
+        scheduler (RequestScheduler, optional): Rate limiter every request passes through.
+        symbols (SymbolRegistry, optional): Symbol metadata cache used to serve
+            ``get_symbols`` and to validate orders locally.
+        codec (JsonCodec, optional): JSON encoder/decoder.
+        models (bool, optional): Return typed models instead of dicts. Defaults to False.
+        hooks (list of callable, optional): Called with a ``RequestEvent`` after every request.
+        retry (RetryPolicy, optional): Retry idempotent requests. Defaults to no retries.
+        hedge (HedgePolicy, optional): Hedge slow quote, book and order reads.
+        clock (bool or ClockSync, optional): Sign with the exchange clock estimated
+            from response ``Date`` headers. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        access_key: str = None,
+        access_secret: str = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        timeout: float = 10,
+        session=None,
+        account_ttl: float = None,
+        trader_id: str = None,
+        scheduler=None,
+        symbols=None,
+        codec=None,
+        models: bool = False,
+        hooks: list = None,
+        retry=None,
+        hedge=None,
+        coalesce=False,
+        clock=True,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncCoinlistApi requires aiohttp: pip install coinlist-python[async]"
+            )
+        super().__init__(
+            access_key,
+            access_secret,
+            transport=_NoTransport(),
+            account_ttl=account_ttl,
+            trader_id=trader_id,
+            scheduler=scheduler,
+            symbols=symbols,
+            codec=codec,
+            models=models,
+            hooks=hooks,
+            retry=retry,
+            hedge=hedge,
+            coalesce=coalesce,
+            clock=clock,
+        )
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._session = session
+        self._owns_session = session is None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Close the pooled session owned by this client."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with AsyncCoinlistApi")
+
+    def __exit__(self, *exc):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _make_request(self, method: str, path: str, data: dict = {}, params: dict = {}):
+        """Make a request.
+
+        Args:
+            method (str): The HTTP method should be UPPER CASE.
+            path (str): Specific path.
+            data (dict, optional): Defaults to {}.
+            params (dict, optional): Defaults to {}.
+
+        Returns:
+            Dict: JSON
+        """
+        if method == "GET" and self.single_flight is not None:
+            return await self.single_flight.ado(
+                self._flight_key(path, data, params),
+                functools.partial(self._send, method, path, data, params),
+            )
+        return await self._send(method, path, data, params)
+
+    async def _send(self, method, path, data, params):
+        if self.hedge is not None and self.hedge.applies(method, path):
+            return await self._hedged_request(method, path, data, params)
+        if self.retry is not None and self.retry.allows(method, path, data):
+            return await self._retried_request(method, path, data, params)
+        return (await self._attempt(method, path, data, params))[2]
+
+    async def _attempt(self, method, path, data, params, retries=0):
+        offset = self.clock.offset if self.clock is not None else None
+        result = await self._attempt_once(method, path, data, params, retries)
+        if self._clock_rejected(result[0], offset):
+            logger.info("Re-signing %s %s with the corrected clock", method, path)
+            result = await self._attempt_once(method, path, data, params, retries)
+        return result
+
+    async def _attempt_once(self, method, path, data, params, retries):
+        if self.hooks:
+            return await self._attempt_instrumented(method, path, data, params, retries)
+        endpoint_class = await self.scheduler.acquire_async(method, path)
+        url, headers, json_body = self._build_request(method, path, data, params)
+        session = self._get_session()
+        # The query is already encoded and signed; stop yarl from re-quoting it.
+        url = URL(url, encoded=True)
+        sent = time.time()
+        async with session.request(method, url, headers=headers, data=json_body) as r:
+            self._observe_clock(sent, r.headers)
+            self.scheduler.record(endpoint_class, r.status, r.headers)
+            return r.status, r.headers, self.codec.loads(await r.read())
+
+    async def _retried_request(self, method, path, data, params):
+        policy = self.retry
+        attempt = 0
+        while True:
+            last = attempt + 1 >= policy.max_attempts
+            try:
+                status, headers, response = await self._attempt(
+                    method, path, data, params, attempt
+                )
+            except TRANSIENT_ERRORS:
+                if last:
+                    raise
+                delay = policy.delay(attempt)
+            else:
+                if last or status not in policy.statuses:
+                    if attempt and is_order_post(method, path):
+                        response = await self._restore_orders(data, response)
+                    return response
+                delay = policy.delay(attempt, headers)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _restore_orders(self, data, response):
+        rejected = duplicate_orders(data, response)
+        if not rejected:
+            return response
+        found = {spec["client_id"]: await self._find_order(spec) for spec in rejected}
+        return restore_orders(data, response, found)
+
+    async def _find_order(self, spec: dict):
+        symbol = spec.get("symbol")
+        params = _list_params(None, None, True, MAX_PAGE_SIZE, symbol=symbol)
+        response = await self._make_request("GET", "/v1/orders", params=params)
+        orders = response.get("orders") if isinstance(response, dict) else None
+        for order in orders or ():
+            if order.get("client_id") == spec["client_id"]:
+                return order
+        return None
+
+    async def _timed_request(self, method, path, data, params):
+        start = time.perf_counter()
+        if self.retry is not None:
+            response = await self._retried_request(method, path, data, params)
+        else:
+            response = (await self._attempt(method, path, data, params))[2]
+        self.hedge.observe(path, time.perf_counter() - start)
+        return response
+
+    async def _hedged_request(self, method, path, data, params):
+        delay = self.hedge.delay(path)
+        first = asyncio.ensure_future(self._timed_request(method, path, data, params))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        self.hedge.fired()
+        second = asyncio.ensure_future(self._timed_request(method, path, data, params))
+        pending = {first, second}
+        try:
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                succeeded = [t for t in done if t.exception() is None]
+                if succeeded or not pending:
+                    return (succeeded or list(done))[0].result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt_instrumented(self, method, path, data, params, retries):
+        event = RequestEvent(method, path, retries=retries)
+        t0 = time.perf_counter()
+        endpoint_class = await self.scheduler.acquire_async(method, path)
+        t1 = time.perf_counter()
+        url, headers, json_body = self._build_request(method, path, data, params)
+        t2 = time.perf_counter()
+        event.queue_time, event.sign_time = t1 - t0, t2 - t1
+        event.request_bytes = len(json_body)
+        session = self._get_session()
+        try:
+            sent = time.time()
+            async with session.request(
+                method, URL(url, encoded=True), headers=headers, data=json_body
+            ) as r:
+                self._observe_clock(sent, r.headers)
+                content = await r.read()
+            t3 = time.perf_counter()
+            event.network_time, event.status = t3 - t2, r.status
+            event.response_bytes = len(content)
+            self.scheduler.record(endpoint_class, r.status, r.headers)
+            response = self.codec.loads(content)
+            event.decode_time = time.perf_counter() - t3
+        except Exception as e:
+            if event.status is None:
+                event.network_time = time.perf_counter() - t2
+            event.error = e
+            self._emit(event)
+            raise
+        self._emit(event)
+        return r.status, r.headers, response
+
+    def _wrap(self, kind: str, response):
+        if not self.models:
+            return response
+        if inspect.isawaitable(response):
+            return _wrap_later(kind, response)
+        return models.wrap(kind, response)
+
+    # ACCOUNTS
+    async def get_traider_id(self, refresh: bool = False):
+        if refresh or not self.account_context.fresh:
+            self._check_accounts(await self.list_accounts())
+        return self.account_context.trader_id
+
+    async def select_account(self, trader_id: str):
+        if not self.account_context.fresh:
+            await self.list_accounts()
+        self.account_context.select(trader_id)
+
+    async def list_accounts(self):
+        response = await self._make_request("GET", "/v1/accounts")
+        self.account_context.update(response)
+        return response
+
+    async def get_account_summary(self):
+        trader_id = await self.get_traider_id()
+        return await self._make_request("GET", f"/v1/accounts/{trader_id}")
+
+    async def get_account_history(
+        self,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = None,
+        count: int = None,
+    ):
+        trader_id = await self.get_traider_id()
+        params = _list_params(start_time, end_time, descending, count)
+        response = await self._make_request(
+            "GET", f"/v1/accounts/{trader_id}/ledger", params=params
+        )
+        return self._wrap("ledger", response)
+
+    async def get_coinlist_wallets(self):
+        trader_id = await self.get_traider_id()
+        return await self._make_request("GET", f"/v1/accounts/{trader_id}/wallets")
+
+    async def get_daily_account_summary(self):
+        trader_id = await self.get_traider_id()
+        return await self._make_request(
+            "GET", f"/v1/accounts/{trader_id}/ledger-summary"
+        )
+
+    async def get_list_apikeys(self):
+        await self.get_traider_id()
+        return await self._make_request("GET", "/v1/balances")
+
+    # SYMBOLS
+    async def show_symbols(self):
+        r = await self._make_request("GET", "/v1/symbols")
+        symbols = [i["symbol"] for i in r.get("symbols")]
+        await asyncio.get_running_loop().run_in_executor(None, _write_symbols, symbols)
+
+    async def get_symbols(self):
+        if self.symbols is not None:
+            return (await self._symbol_rules()).response
+        return await self._make_request("GET", "/v1/symbols")
+
+    async def get_symbol(self, symbol: str):
+        if self.symbols is not None:
+            rules = await self._symbol_rules()
+            if symbol in rules:
+                return {"symbol": rules.get(symbol).data}
+        return await self._make_request("GET", f"/v1/symbols/{symbol}")
+
+    async def get_specific_symbol(self, symbol: str):
+        return await self.get_symbol(symbol)
+
+    async def _symbol_rules(self):
+        if self.symbols.stale:
+            self._refresh_symbols(await self._make_request("GET", "/v1/symbols"))
+        return self.symbols
+
+    # ORDERS
+    async def create_order(
+        self,
+        price: float,
+        size: int,
+        symbol: str,
+        side: str = "sell",
+        order_type: str = "limit",
+        client_id: str = None,
+    ):
+        if self.symbols is not None:
+            price, size = (await self._symbol_rules()).normalize(
+                symbol, price, size, side, order_type
+            )
+        data = {
+            "symbol": symbol,
+            "type": order_type,
+            "side": side,
+            "size": size,
+            "price": price,
+            "origin": "api",
+            "client_id": client_id or self._uuid(),
+        }
+        response = await self._make_request(method="POST", path="/v1/orders", data=data)
+        try:
+            return response["order"]["order_id"]
+        except (KeyError, TypeError):
+            logger.error("Order was not accepted: %s", response)
+            return None
+
+    async def create_orders(
+        self, orders: list, batch_size: int = BULK_ORDER_LIMIT, max_workers: int = 4
+    ):
+        chunks = chunked(prepare_orders(orders, self._uuid), batch_size)
+        semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+        async def submit(chunk):
+            async with semaphore:
+                try:
+                    response = await self._make_request(
+                        "POST", "/v1/orders/bulk", data=chunk
+                    )
+                except Exception as e:
+                    return failed_results(chunk, e)
+            return match_results(chunk, response)
+
+        batches = await asyncio.gather(*(submit(chunk) for chunk in chunks))
+        return [result for batch in batches for result in batch]
+
+    async def modify_order(
+        self,
+        order_id: str,
+        price: float,
+        size: int,
+        symbol: str,
+        side: str = "sell",
+        order_type: str = "limit",
+    ):
+        if self.symbols is not None:
+            price, size = (await self._symbol_rules()).normalize(
+                symbol, price, size, side, order_type
+            )
+        data = {
+            "symbol": symbol,
+            "type": order_type,
+            "side": side,
+            "size": size,
+            "price": price,
+        }
+        return await self._make_request("PATCH", f"/v1/orders/{order_id}", data=data)
+
+    async def get_orders(self, order_id: str):
+        return await self._make_request("GET", f"/v1/symbols/{order_id}", data={})
+
+    async def exchange_time(self):
+        sent = time.time()
+        response = (await self._attempt("GET", "/v1/time", {}, {}))[2]
+        return self._exchange_time(sent, response)
+
+    async def get_snapshot(
+        self,
+        symbols: list,
+        kinds=(snapshot.SUMMARY,),
+        max_workers: int = 8,
+        depth: int = 10,
+    ):
+        kinds = snapshot.check_kinds(kinds)
+        result = snapshot.MarketSnapshot(symbols)
+        plan = snapshot.requests_for(result.symbols, kinds)
+        fetch = {
+            snapshot.SUMMARY: self.get_symbol_summaries,
+            snapshot.QUOTE: self.get_quote,
+            snapshot.BOOK: self.get_order_book,
+        }
+        semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+        async def run(request):
+            kind, symbol = request
+            async with semaphore:
+                try:
+                    return await fetch[kind](symbol)
+                except Exception as e:
+                    return e
+
+        responses = await asyncio.gather(*(run(request) for request in plan))
+        for (kind, symbol), response in zip(plan, responses):
+            if isinstance(response, Exception):
+                result.fail(kind, symbol, response)
+            else:
+                result.add(kind, symbol, response, depth)
+        return result
+
+    # PAGINATION
+    def _iter_list(
+        self, method, prefetch, start_time, end_time, descending, count, **kwargs
+    ):
+        items_key, time_field, id_field = LIST_ENDPOINTS[method]
+        cursor = PageCursor(
+            items_key, time_field, id_field, start_time, end_time, descending, count
+        )
+        fetch = functools.partial(getattr(self, method), **kwargs)
+        return aiterate(fetch, cursor, prefetch=prefetch)
+
+
+class _NoTransport:
+    """Placeholder so the inherited sync transport is never opened."""
+
+    def request(self, *args, **kwargs):
+        raise RuntimeError("AsyncCoinlistApi does not use the sync transport")
+
+    def close(self):
+        pass
+
+
+async def _wrap_later(kind, response):
+    return models.wrap(kind, await response)
+
+
+def _write_symbols(symbols):
+    with open("symbols.txt", "w") as f:
+        for symbol in symbols:
+            f.write(symbol + "\n")
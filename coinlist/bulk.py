@@ -0,0 +1,89 @@
+"""Helpers shared by the sync and async bulk order submission."""
+
+# Assumed, not documented: the Coinlist API does not publish a maximum for
+# /v1/orders/bulk. 25 is a conservative guess; pass ``batch_size`` to
+# ``create_orders`` to use another value.
+BULK_ORDER_LIMIT = 25
+
+
+def prepare_orders(orders: list, new_client_id):
+    """Normalize order specs and attach client order IDs.
+
+    Args:
+        orders (list of dict): Specs with symbol, side, size, price and type
+            (``order_type`` is accepted as an alias of ``type``).
+        new_client_id (callable): Returns a fresh client order ID.
+
+    Returns:
+        List of dict: Order bodies ready for ``/v1/orders/bulk``.
+    """
+    prepared = []
+    for spec in orders:
+        order = dict(spec)
+        if "order_type" in order:
+            order["type"] = order.pop("order_type")
+        order.setdefault("type", "limit")
+        order.setdefault("origin", "api")
+        if not order.get("client_id"):
+            order["client_id"] = new_client_id()
+        prepared.append(order)
+    return prepared
+
+
+def chunked(items: list, size: int):
+    """Split ``items`` into lists of at most ``size`` elements."""
+    if size < 1:
+        raise ValueError("Batch size must be positive")
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def match_results(chunk: list, response):
+    """Match a bulk response to the orders that were sent.
+
+    Results are matched by ``client_id`` when the exchange echoes it, and by
+    position otherwise.
+
+    Args:
+        chunk (list of dict): Orders sent in one request.
+        response (dict or list): Decoded response.
+
+    Returns:
+        List of dict: One ``{"client_id", "order_id", "error", "order"}`` per order.
+    """
+    items = response.get("orders") if isinstance(response, dict) else response
+    if not isinstance(items, list):
+        return failed_results(chunk, response)
+    by_client_id = {
+        item.get("client_id"): item
+        for item in items
+        if isinstance(item, dict) and item.get("client_id")
+    }
+    results = []
+    for i, order in enumerate(chunk):
+        item = by_client_id.get(order["client_id"])
+        if item is None and not by_client_id and i < len(items):
+            item = items[i]
+        if not isinstance(item, dict):
+            results.append(_result(order, error="Missing from bulk response"))
+            continue
+        item = item.get("order", item)
+        order_id = item.get("order_id")
+        error = item.get("error") or item.get("message")
+        if order_id is None and error is None:
+            error = item
+        results.append(_result(order, order_id=order_id, error=error if order_id is None else None))
+    return results
+
+
+def failed_results(chunk: list, error):
+    """Mark every order of a chunk as failed with ``error``."""
+    return [_result(order, error=error) for order in chunk]
+
+
+def _result(order: dict, order_id: str = None, error=None):
+    return {
+        "client_id": order["client_id"],
+        "order_id": order_id,
+        "error": error,
+        "order": order,
+    }
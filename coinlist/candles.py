@@ -0,0 +1,234 @@
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from coinlist.models import parse_time, raise_for_error
+from coinlist.transport import require_sync
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+GRANULARITY_SECONDS = {"1m": 60, "5m": 300, "30m": 1800}
+# Assumed, not documented: the Coinlist API does not publish a maximum
+# number of candles per request. Pass ``window`` to ``CandleDownloader`` to
+# use another value.
+MAX_CANDLES_PER_REQUEST = 1000
+
+CANDLE_FIELDS = ("time", "open", "high", "low", "close", "volume", "index_close")
+
+
+def candle_dtype():
+    """Structured dtype of a candle row: int64 epoch seconds and float64 values."""
+    return np.dtype([("time", "<i8")] + [(name, "<f8") for name in CANDLE_FIELDS[1:]])
+
+
+class CandleDownloader:
+    """Parallel, cached historical candle downloader.
+
+    A long range is split into windows of at most ``window`` candles that
+    are fetched concurrently. Results are NumPy structured arrays, so each
+    column (``candles["close"]``) is a contiguous-typed array. With a
+    ``cache_dir``, closed candles are stored per (symbol, field_name,
+    granularity) as ``.npy`` files read back through memory mapping, and
+    later calls only fetch what is missing before or after the cached span.
+    Requires the optional ``numpy`` dependency.
+
+    Args:
+        client (CoinlistApi): Client used for ``get_candles``.
+        cache_dir (str, optional): Directory of the on-disk cache. Defaults to no cache.
+        max_workers (int, optional): Windows fetched at the same time. Defaults to 4.
+        window (int, optional): Candles per request. Defaults to MAX_CANDLES_PER_REQUEST.
+    """
+
+    def __init__(
+        self,
+        client,
+        cache_dir: str = None,
+        max_workers: int = 4,
+        window: int = MAX_CANDLES_PER_REQUEST,
+    ):
+        if np is None:
+            raise ImportError(
+                "CandleDownloader requires numpy: pip install coinlist-python[numpy]"
+            )
+        require_sync(client, "CandleDownloader")
+        self.client = client
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.window = window
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def download(
+        self,
+        symbol: str,
+        start_time,
+        end_time=None,
+        granularity: str = "1m",
+        field_name: str = "price",
+    ):
+        """Candles for ``[start_time, end_time]``.
+
+        Args:
+            symbol (str): The symbol.
+            start_time (str, datetime or int): Range start (ISO date-time, datetime or epoch seconds).
+            end_time (str, datetime or int, optional): Range end. Defaults to now.
+            granularity (str, optional): 1m, 5m or 30m. Defaults to "1m".
+            field_name (str, optional): price, fair_price, best_ask or best_bid. Defaults to "price".
+
+        Returns:
+            numpy.ndarray: Structured array with CANDLE_FIELDS columns, sorted by time.
+
+        Raises:
+            ApiError: A window was answered with an error; nothing is cached.
+        """
+        step = GRANULARITY_SECONDS[granularity]
+        start = _epoch(start_time) // step * step
+        end = _epoch(end_time if end_time is not None else datetime.now(timezone.utc))
+        if end < start:
+            raise ValueError("end_time is before start_time")
+
+        cached = self._load(symbol, field_name, granularity)
+        missing = [(start, end)]
+        if cached is not None and len(cached):
+            first, last = int(cached["time"][0]), int(cached["time"][-1])
+            missing = []
+            # Fetch up to the cache, even past the requested range, so it stays contiguous.
+            if start < first:
+                missing.append((start, first - step))
+            if end > last:
+                missing.append((last + step, end))
+
+        fetched = self._fetch_ranges(symbol, field_name, granularity, step, missing)
+        if fetched is not None and self.cache_dir:
+            now = int(datetime.now(timezone.utc).timestamp())
+            closed = fetched[fetched["time"] + step <= now]
+            if len(closed):
+                cached = self._store(symbol, field_name, granularity, cached, closed)
+
+        parts = [
+            _between(part, start, end)
+            for part in (cached, fetched)
+            if part is not None and len(part)
+        ]
+        if not parts:
+            return np.empty(0, dtype=candle_dtype())
+        if len(parts) == 1:
+            return parts[0]
+        return _merge(parts)
+
+    def _fetch_ranges(self, symbol, field_name, granularity, step, ranges):
+        span = self.window * step
+        windows = [
+            (lo, min(lo + span - step, hi))
+            for range_start, hi in ranges
+            for lo in range(range_start, hi + 1, span)
+        ]
+        if not windows:
+            return None
+
+        def fetch(window):
+            lo, hi = window
+            response = self.client.get_candles(
+                symbol,
+                field_name=field_name,
+                start_time=_isoformat(lo),
+                end_time=_isoformat(hi),
+                granularity=granularity,
+            )
+            return parse_candles(response)
+
+        if len(windows) == 1 or self.max_workers <= 1:
+            arrays = [fetch(w) for w in windows]
+        else:
+            workers = min(self.max_workers, len(windows))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                arrays = list(pool.map(fetch, windows))
+        return _merge(arrays)
+
+    # CACHE
+    def cache_path(self, symbol: str, field_name: str, granularity: str):
+        parts = (symbol, field_name, granularity)
+        name = "_".join(re.sub(r"[^A-Za-z0-9.-]", "_", part) for part in parts)
+        return os.path.join(self.cache_dir, name + ".npy")
+
+    def _load(self, symbol, field_name, granularity):
+        if not self.cache_dir:
+            return None
+        path = self.cache_path(symbol, field_name, granularity)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def _store(self, symbol, field_name, granularity, cached, new):
+        merged = new if cached is None else _merge([np.asarray(cached), new])
+        path = self.cache_path(symbol, field_name, granularity)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".npy")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, merged)
+        os.replace(tmp, path)
+        return np.load(path, mmap_mode="r")
+
+
+def parse_candles(response):
+    """Convert a ``get_candles`` response into a structured array.
+
+    Args:
+        response (dict or list): ``{"candles": [[time, open, high, low, close,
+            volume, index_close], ...]}``.
+
+    Returns:
+        numpy.ndarray: Structured array sorted by time.
+
+    Raises:
+        ApiError: ``response`` is an error response.
+    """
+    raise_for_error(response)
+    rows = response.get("candles", []) if isinstance(response, dict) else response
+    out = np.empty(len(rows), dtype=candle_dtype())
+    if not len(rows):
+        return out
+    out["time"] = [_epoch(row[0]) for row in rows]
+    for i, name in enumerate(CANDLE_FIELDS[1:], start=1):
+        out[name] = [_float(row[i]) if i < len(row) else np.nan for row in rows]
+    return np.sort(out, order="time")
+
+
+def _between(candles, start: int, end: int):
+    lo, hi = np.searchsorted(candles["time"], [start, end + 1])
+    return candles[lo:hi]
+
+
+def _merge(arrays):
+    arrays = [a for a in arrays if len(a)]
+    if not arrays:
+        return np.empty(0, dtype=candle_dtype())
+    merged = np.concatenate(arrays)
+    # Later arrays win for duplicate timestamps.
+    order = np.argsort(merged["time"], kind="stable")
+    merged = merged[order]
+    keep = np.ones(len(merged), dtype=bool)
+    keep[:-1] = merged["time"][1:] != merged["time"][:-1]
+    return merged[keep]
+
+
+def _float(value):
+    return np.nan if value is None else float(value)
+
+
+def _epoch(value):
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = parse_time(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _isoformat(epoch: int):
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
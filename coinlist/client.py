@@ -1,15 +1,38 @@
-import base64
-import hashlib
-import hmac
-import json
 # import os
 # import threading
+import functools
+import logging
 import time
 import uuid
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-import requests
 # import websocket
+
+from coinlist.accounts import AccountContext
+from coinlist.bulk import (
+    BULK_ORDER_LIMIT,
+    chunked,
+    failed_results,
+    match_results,
+    prepare_orders,
+)
+from coinlist import models, snapshot
+from coinlist.clock import ClockSync
+from coinlist.codec import JsonCodec
+from coinlist.coalesce import SingleFlight
+from coinlist.instrumentation import RequestEvent
+from coinlist.paging import LIST_ENDPOINTS, MAX_PAGE_SIZE, PageCursor, iterate
+from coinlist.ratelimit import RequestScheduler
+from coinlist.retry import (
+    HedgePolicy,
+    RetryPolicy,
+    duplicate_orders,
+    is_order_post,
+    restore_orders,
+)
+from coinlist.signer import RequestSigner, encode_path
+from coinlist.symbols import SymbolRegistry
+from coinlist.transport import DEFAULT_TIMEOUT, TRANSIENT_ERRORS, HttpTransport
 # from dotenv import load_dotenv
 # from requests import Request, Session
 
@@ -17,23 +40,145 @@ import requests
 # ACCESS_KEY = os.getenv('ACCESS_KEY')
 # ACCESS_SECRET = os.getenv('ACCESS_SECRET')
 
+logger = logging.getLogger(__name__)
+
+# Seconds the clock estimate must move for a 401 to be re-signed.
+_CLOCK_CORRECTION = 0.5
+
 
 class CoinlistApi:
-    def __init__(self, access_key: str = None, access_secret: str = None):
+    def __init__(
+        self,
+        access_key: str = None,
+        access_secret: str = None,
+        transport: HttpTransport = None,
+        pool_maxsize: int = 10,
+        timeout=DEFAULT_TIMEOUT,
+        account_ttl: float = None,
+        trader_id: str = None,
+        scheduler: RequestScheduler = None,
+        symbols: SymbolRegistry = None,
+        codec: JsonCodec = None,
+        models: bool = False,
+        hooks: list = None,
+        retry: RetryPolicy = None,
+        hedge: HedgePolicy = None,
+        coalesce=False,
+        clock=True,
+    ):
+        """Coinlist REST client.
+
+        Args:
+            access_key (str, optional): API key.
+            access_secret (str, optional): Base64-encoded API secret.
+            transport (HttpTransport, optional): Shared transport. When omitted the
+                client creates and owns its own pooled transport.
+            pool_maxsize (int, optional): Keep-alive connections per host for the
+                owned transport. Defaults to 10.
+            timeout (float or tuple, optional): ``(connect, read)`` timeout for the
+                owned transport. Defaults to (3.05, 10).
+            account_ttl (float, optional): Seconds to cache the account list used by
+                account endpoints. Defaults to None (cache until invalidated).
+            trader_id (str, optional): Account used by account endpoints. Defaults
+                to the first account returned by ``/v1/accounts``.
+            scheduler (RequestScheduler, optional): Rate limiter every request passes
+                through. Defaults to one with DEFAULT_LIMITS; share one instance
+                between clients using the same key.
+            symbols (SymbolRegistry, optional): Symbol metadata cache. When set,
+                ``get_symbols`` is served from it and ``create_order``/``modify_order``
+                round price and size to the tick/lot size and validate them locally.
+            codec (JsonCodec, optional): JSON encoder/decoder. Defaults to orjson when
+                installed; pass ``JsonCodec(numbers="decimal")`` for exact prices.
+            models (bool, optional): Return typed models (``coinlist.models``) from
+                order, fill, quote, book, balance, transfer, auction and ledger
+                endpoints instead of dicts. Defaults to False.
+            hooks (list of callable, optional): Called with a ``RequestEvent`` after
+                every request, e.g. ``instrumentation.MetricsCollector()``.
+            retry (RetryPolicy, optional): Retry idempotent requests on connection
+                errors, timeouts and 429/5xx responses. Defaults to no retries.
+            hedge (HedgePolicy, optional): Send a second copy of slow quote, book and
+                order reads and use whichever answers first. Defaults to no hedging.
+            coalesce (bool or SingleFlight, optional): Share one request between
+                identical concurrent GETs (same host, key, path and params); pass
+                ``SingleFlight(window=...)`` to also reuse a result for a short
+                time. Every caller then gets the same response object, so only
+                enable it when responses are not mutated. Defaults to False.
+            clock (bool or ClockSync, optional): Estimate the exchange clock offset
+                from response ``Date`` headers and sign requests with exchange time,
+                so a drifting host is not rejected; call ``clock.start(client)`` to
+                also re-sync from ``/v1/time`` in the background. False signs with
+                the local clock. Defaults to True.
+        """
         self.ACCESS_KEY = access_key
         self.ACCESS_SECRET = access_secret
         self.endpoint_url = "https://trade-api.coinlist.co"
         self.wss_url = "wss://trade-api.coinlist.co"
-
-    def get_traider_id(self):
+        self._owns_transport = transport is None
+        self.transport = transport or HttpTransport(
+            pool_maxsize=pool_maxsize, timeout=timeout
+        )
+        self.account_context = AccountContext(ttl=account_ttl, trader_id=trader_id)
+        self._signer = None
+        self.scheduler = scheduler or RequestScheduler()
+        self.symbols = symbols
+        self.codec = codec or JsonCodec()
+        self.models = models
+        self.hooks = list(hooks or [])
+        self.retry = retry
+        self.hedge = hedge
+        self._hedge_pool = None
+        self.single_flight = SingleFlight() if coalesce is True else coalesce or None
+        self.clock = ClockSync() if clock is True else clock or None
+
+    def close(self):
+        """Release pooled connections owned by this client."""
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+            self._hedge_pool = None
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_traider_id(self, refresh: bool = False):
         """Get traider ID.
 
+        The account list is fetched once and cached in ``account_context``.
+
+        Args:
+            refresh (bool, optional): Reload accounts even if the cache is fresh.
+
         Returns:
             String: Traider ID.
+
+        Raises:
+            ApiError: The accounts could not be loaded and no account is known.
         """
-        response = self._make_request("GET", "/v1/accounts")
-        traider_id = response["accounts"][0]["trader_id"]
-        return traider_id
+        if refresh or not self.account_context.fresh:
+            self._check_accounts(self.list_accounts())
+        return self.account_context.trader_id
+
+    def _check_accounts(self, response):
+        if models.is_error(response) and self.account_context.trader_id is None:
+            raise models.ApiError(response)
+
+    def select_account(self, trader_id: str):
+        """Select the account used by account endpoints.
+
+        Args:
+            trader_id (str): One of the trader IDs returned by ``list_accounts``.
+        """
+        if not self.account_context.fresh:
+            self.list_accounts()
+        self.account_context.select(trader_id)
+
+    def invalidate_accounts(self):
+        """Drop the cached account list."""
+        self.account_context.invalidate()
 
     def get_account_summary(self):
         traider_id = self.get_traider_id()
@@ -43,17 +188,49 @@ class CoinlistApi:
         net_liquidation_value_usd = response.json()["net_liquidation_value_usd"]
         return asset_balances, asset_holds, net_liquidation_value_usd
 
+    @property
+    def signer(self):
+        """Request signer for the current credentials, rebuilt if they change."""
+        signer = self._signer
+        if (
+            signer is None
+            or signer.access_key != self.ACCESS_KEY
+            or signer.access_secret != self.ACCESS_SECRET
+        ):
+            signer = self._signer = RequestSigner(
+                self.ACCESS_KEY, self.ACCESS_SECRET, dumps=self.codec.dumps
+            )
+        return signer
+
     def _sign(self, message: str, secret: str):
         """Signing a message.
 
         Returns:
             String: base64-encode the signature (the output of the sha256 HMAC)
         """
-        secret = base64.b64decode(self.ACCESS_SECRET).strip()
-        message = message.encode("utf-8")
-        h = hmac.new(secret, message, digestmod=hashlib.sha256)
-        signature = base64.b64encode(h.digest())
-        return signature.decode("utf-8")
+        return self.signer.sign(message)
+
+    def _build_request(self, method: str, path: str, data: dict = {}, params: dict = {}):
+        """Build the signed URL, headers and body of a request.
+
+        Shared by the sync and async clients.
+
+        Args:
+            method (str): The HTTP method should be UPPER CASE.
+            path (str): Specific path.
+            data (dict, optional): Defaults to {}.
+            params (dict, optional): Defaults to {}.
+
+        Returns:
+            Tuple: (url, headers, json_body)
+        """
+        clock = self.clock
+        timestamp = clock.timestamp() if clock is not None else str(int(time.time()))
+        path_with_params, headers, json_body = self.signer.build(
+            method, path, data, params, timestamp
+        )
+        url = self.endpoint_url + path_with_params
+        return url, headers, json_body
 
     def _make_request(self, method: str, path: str, data: dict = {}, params: dict = {}):
         """Make a request.
@@ -67,79 +244,243 @@ class CoinlistApi:
         Returns:
             Dict: JSON
         """
-        path_with_params = (
-            requests.Request(method, self.endpoint_url + path, params=params)
-            .prepare()
-            .path_url
+        if method == "GET" and self.single_flight is not None:
+            return self.single_flight.do(
+                self._flight_key(path, data, params),
+                functools.partial(self._send, method, path, data, params),
+            )
+        return self._send(method, path, data, params)
+
+    def _flight_key(self, path, data, params):
+        # A SingleFlight may be shared by clients of other hosts and accounts.
+        key = (self.endpoint_url, self.ACCESS_KEY, encode_path(path, params))
+        return key + (self.codec.dumps(data),) if data else key
+
+    def _send(self, method, path, data, params):
+        if self.hedge is not None and self.hedge.applies(method, path):
+            return self._hedged_request(method, path, data, params)
+        if self.retry is not None and self.retry.allows(method, path, data):
+            return self._retried_request(method, path, data, params)
+        return self._attempt(method, path, data, params)[2]
+
+    def _attempt(self, method, path, data, params, retries=0):
+        """Send one signed request.
+
+        A 401 whose ``Date`` header moved the clock estimate was most likely a
+        rejected timestamp, so it is re-signed and sent once more.
+
+        Returns:
+            Tuple: (status, headers, decoded response)
+        """
+        offset = self.clock.offset if self.clock is not None else None
+        result = self._attempt_once(method, path, data, params, retries)
+        if self._clock_rejected(result[0], offset):
+            logger.info("Re-signing %s %s with the corrected clock", method, path)
+            result = self._attempt_once(method, path, data, params, retries)
+        return result
+
+    def _clock_rejected(self, status: int, offset) -> bool:
+        """Whether a 401 answered a request signed with a since-corrected clock."""
+        return (
+            status == 401
+            and offset is not None
+            and abs(self.clock.offset - offset) >= _CLOCK_CORRECTION
         )
-        timestamp = str(int(time.time()))
-        json_body = json.dumps((data), separators=(",", ":")).strip()
-        message = (
-            timestamp + method + path_with_params + ("" if not data else json_body)
+
+    def _attempt_once(self, method, path, data, params, retries):
+        if self.hooks:
+            return self._attempt_instrumented(method, path, data, params, retries)
+        endpoint_class = self.scheduler.acquire(method, path)
+        url, headers, json_body = self._build_request(method, path, data, params)
+        sent = time.time()
+        r = self.transport.request(method, url, headers=headers, data=json_body)
+        self._observe_clock(sent, r.headers)
+        self.scheduler.record(endpoint_class, r.status_code, r.headers)
+        return r.status_code, r.headers, self.codec.loads(r.content)
+
+    def _retried_request(self, method, path, data, params):
+        policy = self.retry
+        attempt = 0
+        while True:
+            last = attempt + 1 >= policy.max_attempts
+            try:
+                status, headers, response = self._attempt(
+                    method, path, data, params, attempt
+                )
+            except TRANSIENT_ERRORS as e:
+                if last:
+                    raise
+                logger.info("Retrying %s %s after %r", method, path, e)
+                delay = policy.delay(attempt)
+            else:
+                if last or status not in policy.statuses:
+                    if attempt and is_order_post(method, path):
+                        response = self._restore_orders(data, response)
+                    return response
+                logger.info("Retrying %s %s after status %s", method, path, status)
+                delay = policy.delay(attempt, headers)
+            attempt += 1
+            time.sleep(delay)
+
+    def _restore_orders(self, data, response):
+        """Replace duplicate ``client_id`` rejections of a retried order POST."""
+        rejected = duplicate_orders(data, response)
+        if not rejected:
+            return response
+        found = {spec["client_id"]: self._find_order(spec) for spec in rejected}
+        logger.info(
+            "Recovered %d of %d order(s) placed by a lost attempt",
+            sum(order is not None for order in found.values()),
+            len(found),
         )
-        signature = self._sign(message, self.ACCESS_SECRET)
-        headers = {
-            "Content-Type": "application/json",
-            "CL-ACCESS-KEY": self.ACCESS_KEY,
-            "CL-ACCESS-SIG": signature,
-            "CL-ACCESS-TIMESTAMP": timestamp,
-        }
-        url = self.endpoint_url + path_with_params
-        r = requests.request(method, url, headers=headers, data=json_body)
-        return r.json()
+        return restore_orders(data, response, found)
+
+    def _find_order(self, spec: dict):
+        """The newest order of the spec's symbol with its ``client_id``, or None."""
+        symbol = spec.get("symbol")
+        params = _list_params(None, None, True, MAX_PAGE_SIZE, symbol=symbol)
+        response = self._make_request("GET", "/v1/orders", params=params)
+        orders = response.get("orders") if isinstance(response, dict) else None
+        for order in orders or ():
+            if order.get("client_id") == spec["client_id"]:
+                return order
+        return None
+
+    def _timed_request(self, method, path, data, params):
+        """Request with retries, feeding its latency to the hedge policy."""
+        start = time.perf_counter()
+        if self.retry is not None:
+            response = self._retried_request(method, path, data, params)
+        else:
+            response = self._attempt(method, path, data, params)[2]
+        self.hedge.observe(path, time.perf_counter() - start)
+        return response
+
+    def _hedged_request(self, method, path, data, params):
+        """Send a second copy if the first is slower than the hedge delay.
+
+        The first copy to succeed wins; the other one is left to finish in
+        the background and its result is discarded.
+        """
+        delay = self.hedge.delay(path)
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(thread_name_prefix="coinlist-hedge")
+        submit = functools.partial(
+            self._hedge_pool.submit, self._timed_request, method, path, data, params
+        )
+        first = submit()
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        self.hedge.fired()
+        pending = {first, submit()}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [f for f in done if f.exception() is None]
+            if succeeded or not pending:
+                return (succeeded or list(done))[0].result()
+
+    def _attempt_instrumented(self, method, path, data, params, retries):
+        """``_attempt`` timing every phase and reporting it to the hooks."""
+        event = RequestEvent(method, path, retries=retries)
+        t0 = time.perf_counter()
+        endpoint_class = self.scheduler.acquire(method, path)
+        t1 = time.perf_counter()
+        url, headers, json_body = self._build_request(method, path, data, params)
+        t2 = time.perf_counter()
+        event.queue_time, event.sign_time = t1 - t0, t2 - t1
+        event.request_bytes = len(json_body)
+        try:
+            sent = time.time()
+            r = self.transport.request(method, url, headers=headers, data=json_body)
+            t3 = time.perf_counter()
+            self._observe_clock(sent, r.headers)
+            event.network_time, event.status = t3 - t2, r.status_code
+            event.response_bytes = len(r.content)
+            self.scheduler.record(endpoint_class, r.status_code, r.headers)
+            response = self.codec.loads(r.content)
+            event.decode_time = time.perf_counter() - t3
+        except Exception as e:
+            if event.status is None:
+                event.network_time = time.perf_counter() - t2
+            event.error = e
+            self._emit(event)
+            raise
+        self._emit(event)
+        return r.status_code, r.headers, response
+
+    def _observe_clock(self, sent: float, headers):
+        """Feed the ``Date`` header of a response to the clock estimate."""
+        if self.clock is not None:
+            date = headers.get("Date")
+            if date:
+                self.clock.observe_date(sent, time.time(), date)
+
+    def add_hook(self, hook):
+        """Call ``hook`` with a ``RequestEvent`` after every request."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def _emit(self, event: RequestEvent):
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception("Coinlist request hook failed")
+
+    def _wrap(self, kind: str, response):
+        """Typed view of ``response`` when ``models`` is enabled."""
+        if not self.models:
+            return response
+        return models.wrap(kind, response)
 
     def show_symbols(self):
         r = self._make_request("GET", "/v1/symbols")
-        response = r.json().get("symbols")
+        response = r.get("symbols")
         symbols = []
         with open("symbols.txt", "w") as f:
             for i in response:
                 symbols.append(i["symbol"])
                 f.write(i["symbol"] + "\n")
 
-    def create_order(
-        self,
-        price: float,
-        size: int,
-        symbol: str = "ICP-USD",
-        side: str = "sell",
-        order_type: str = "limit",
+    def create_orders(
+        self, orders: list, batch_size: int = BULK_ORDER_LIMIT, max_workers: int = 4
     ):
-        """Create New Order.
+        """Create New Orders in bulk.
+
+        Orders are split into batches of ``batch_size`` and the batches are
+        posted to ``/v1/orders/bulk`` concurrently. Every order gets a
+        ``client_id`` (generated with ``_uuid`` unless given), so failed orders
+        can be resubmitted as ``[r["order"] for r in results if r["error"]]``
+        without risking duplicates.
 
         Args:
-            price (float): A client-specified order id.
-            size (int): The quantity to buy or sell.
-            symbol (str, optional): The symbol for which the order is placed. Defaults to 'ICP-USD'.
-            side (str, optional): Can be buy or sell. Defaults to 'sell'.
-            order_type (str, optional): The type of order, which controls how the order will be executed. Defaults to 'limit'.
+            orders (list of dict): Specs with symbol, side, size, price and
+                optionally type/order_type (default 'limit') and client_id.
+            batch_size (int, optional): Orders per request. Defaults to BULK_ORDER_LIMIT
+                (25, an assumed limit; the API does not document one).
+            max_workers (int, optional): Batches sent at the same time. Defaults to 4.
 
         Returns:
-            [type]: [description]
+            List of dict: ``{"client_id", "order_id", "error", "order"}`` per input order, in order.
         """
-        data = {
-            "symbol": symbol,
-            "type": order_type,
-            "side": side,
-            "size": size,
-            "price": price,
-            "origin": "api",
-        }
-        response = self._make_request(method="POST", path="/v1/orders", data=data)
-        try:
-            returned = response.json()["order"]["order_id"]
-        except Exception:
-            print("Ошибка при размещении ордера: ")
-        return returned
-
-    def create_orders(self, symbol: str):
-        """Cancel all orders.
-
-        Args:
-            symbol (str): Symbol.
-        """
-        response = self._make_request("POST", "/v1/orders/bulk")
-        print(response.status_code)
+        chunks = chunked(prepare_orders(orders, self._uuid), batch_size)
+
+        def submit(chunk):
+            try:
+                response = self._make_request("POST", "/v1/orders/bulk", data=chunk)
+            except Exception as e:
+                return failed_results(chunk, e)
+            return match_results(chunk, response)
+
+        if len(chunks) <= 1 or max_workers <= 1:
+            batches = [submit(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                batches = list(pool.map(submit, chunks))
+        return [result for batch in batches for result in batch]
 
     def cancel_order(self, order_id: str):
         """Cancel order.
@@ -195,15 +536,41 @@ class CoinlistApi:
     def get_symbol(self, symbol: str):
         """Get symbol.
 
+        Served from the symbol registry when one is attached and knows ``symbol``.
+
         Args:
-            symbol (str, optional):
+            symbol (str): The symbol.
+
+        Returns:
+            Dict: ``{"symbol": {...}}`` with the symbol metadata.
         """
-        data = {}
-        response = self._make_request("GET", f"/v1/symbols/{symbol}", data=data)
+        if self.symbols is not None:
+            rules = self._symbol_rules()
+            if symbol in rules:
+                return {"symbol": rules.get(symbol).data}
+        response = self._make_request("GET", f"/v1/symbols/{symbol}")
         return response
 
     def exchange_time(self):
-        return None
+        """Get exchange time.
+
+        The round trip is also a precise sample for ``clock``.
+
+        Returns:
+            Float: Exchange time as Unix seconds, or None on an error response.
+        """
+        sent = time.time()
+        response = self._attempt("GET", "/v1/time", {}, {})[2]
+        return self._exchange_time(sent, response)
+
+    def _exchange_time(self, sent: float, response):
+        epoch = response.get("epoch") if isinstance(response, dict) else None
+        if epoch is None:
+            return None
+        epoch = float(epoch)
+        if self.clock is not None:
+            self.clock.observe(sent, time.time(), epoch, 0.001)
+        return epoch
 
     def fills(self):
         return None
@@ -233,6 +600,7 @@ class CoinlistApi:
             dict: An object containing an array of trading accounts
         """
         response = self._make_request("GET", "/v1/accounts")
+        self.account_context.update(response)
         return response
 
     def get_account_summary(self):
@@ -245,15 +613,30 @@ class CoinlistApi:
         response = self._make_request("GET", f"/v1/accounts/{trader_id}")
         return response
 
-    def get_account_history(self):
+    def get_account_history(
+        self,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = None,
+        count: int = None,
+    ):
         """Get Account History.
 
+        Args:
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, sort newest results first.
+            count (int, optional): Maximum item count per page (default 200; max 500).
+
         Returns:
             dict: An object containing an array of transactions
         """
         trader_id = self.get_traider_id()
-        response = self._make_request("GET", f"/v1/accounts/{trader_id}/ledger")
-        return response
+        params = _list_params(start_time, end_time, descending, count)
+        response = self._make_request(
+            "GET", f"/v1/accounts/{trader_id}/ledger", params=params
+        )
+        return self._wrap("ledger", response)
 
     def get_coinlist_wallets(self):
         """Get CoinList Wallets.
@@ -282,16 +665,31 @@ class CoinlistApi:
             dict: An object containing balance details.
         """
         response = self._make_request("GET", f"/v1/balances")
-        return response
+        return self._wrap("balances", response)
 
-    def get_list_fills(self):
+    def get_list_fills(
+        self,
+        symbol: str = None,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = None,
+        count: int = None,
+    ):
         """List Fills.
 
+        Args:
+            symbol (str, optional): Only fills for this symbol.
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, sort newest results first.
+            count (int, optional): Maximum item count per page (default 200; max 500).
+
         Returns:
             dict: An object containing an array of fills.
         """
-        response = self._make_request("GET", f"/v1/fills")
-        return response
+        params = _list_params(start_time, end_time, descending, count, symbol=symbol)
+        response = self._make_request("GET", f"/v1/fills", params=params)
+        return self._wrap("fills", response)
 
     def get_list_apikeys(self):
         """List API Keys.
@@ -304,14 +702,33 @@ class CoinlistApi:
         return response
 
     # ORDERS
-    def get_list_orders(self):
+    def get_list_orders(
+        self,
+        symbol: str = None,
+        status: str = None,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = None,
+        count: int = None,
+    ):
         """List Orders.
 
+        Args:
+            symbol (str, optional): Only orders for this symbol.
+            status (str, optional): Only orders with this status.
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, sort newest results first.
+            count (int, optional): Maximum item count per page (default 200; max 500).
+
         Returns:
             dict: An object containing an array of orders.
         """
-        response = self._make_request("GET", f"/v1/orders")
-        return response
+        params = _list_params(
+            start_time, end_time, descending, count, symbol=symbol, status=status
+        )
+        response = self._make_request("GET", f"/v1/orders", params=params)
+        return self._wrap("orders", response)
 
     def create_order(
         self,
@@ -320,6 +737,7 @@ class CoinlistApi:
         symbol: str,
         side: str = "sell",
         order_type: str = "limit",
+        client_id: str = None,
     ):
         """Create Order.
 
@@ -331,9 +749,15 @@ class CoinlistApi:
             order_type (str): The type of order, which controls how the order will be executed.
                               One of: market, limit, stop_market, stop_limit, take_market, or take_limit.
                               Defaults to 'limit'.
+            client_id (str, optional): Client order ID. Defaults to a new ``_uuid``; it
+                makes a retried request unable to place the order twice.
         Returns:
-            202 status: New order request received.
+            String: The order ID, or None if the order was not accepted.
         """
+        if self.symbols is not None:
+            price, size = self._symbol_rules().normalize(
+                symbol, price, size, side, order_type
+            )
         data = {
             "symbol": symbol,
             "type": order_type,
@@ -341,13 +765,14 @@ class CoinlistApi:
             "size": size,
             "price": price,
             "origin": "api",
+            "client_id": client_id or self._uuid(),
         }
         response = self._make_request(method="POST", path="/v1/orders", data=data)
         try:
-            returned = response.json()["order"]["order_id"]
-        except Exception as e:
-            print("Error while creating the order: ", e)
-        return returned
+            return response["order"]["order_id"]
+        except (KeyError, TypeError):
+            logger.error("Order was not accepted: %s", response)
+            return None
 
     def cancel_orders(self, symbol: str):
         """Cancel All Orders.
@@ -369,7 +794,7 @@ class CoinlistApi:
             dict: An object containing an order.
         """
         response = self._make_request("GET", f"/v1/orders/{order_id}")
-        return response
+        return self._wrap("order", response)
 
     def modify_order(
         self,
@@ -397,6 +822,10 @@ class CoinlistApi:
         Returns:
             dict: An object containing an array of modifed order params.
         """
+        if self.symbols is not None:
+            price, size = self._symbol_rules().normalize(
+                symbol, price, size, side, order_type
+            )
         data = {
             "symbol": symbol,
             "type": order_type,
@@ -407,49 +836,52 @@ class CoinlistApi:
         response = self._make_request("PATCH", f"/v1/orders/{order_id}", data=data)
         return response
 
-    # def create_orders(
-    #     self, price: float, size: int, symbol: str, side: str, order_type: str
-    # ):
-    #     """Create New Orders.
-
-    #     Args:
-    #         body (list of dict): Orders to create
-    #     """
-    #     data = [
-    #         {
-    #             "symbol": symbol,
-    #             "type": order_type,
-    #             "side": side,
-    #             "size": size,
-    #             "price": price,
-    #         }
-    #     ]
-    #     response = self._make_request("POST", f"/v1/orders/bulk", data=data)
-    #     return response
-
-    def get_reports(self, count: int = 200):
+    def get_reports(
+        self,
+        count: int = 200,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = None,
+    ):
         """List Report Requests.
 
         Args:
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, sort newest results first.
             count (int, optional): Maximum item count per page (default 200; max 500)
 
         Returns:
             dict: An object containing an array of report requests
         """
-        response = self._make_request("GET", f"/v1/reports", params=str(count))
+        params = _list_params(start_time, end_time, descending, count)
+        response = self._make_request("GET", f"/v1/reports", params=params)
         return response
 
-    def get_fills(self, report_type: str = "fills"):
+    def get_fills(
+        self, report_type: str = "fills", start_time: str = None, end_time: str = None
+    ):
         """Request Report.
 
-        Request a new fills or account report (CSV)
+        Request a new fills or account report (CSV). Its progress and download
+        URL show up in ``get_reports``; ``reports.ReportDownloader`` waits for
+        it and streams the CSV.
+
         Args:
-            count (int, optional): Maximum item count per page (default 200; max 500)
+            report_type (str, optional): "fills" or "account". Defaults to 'fills'.
+            start_time (str, optional): Start date-time of the report (inclusive).
+            end_time (str, optional): End date-time of the report (inclusive).
 
         Returns:
-            dict: An object containing an array of report requests
+            dict: An object containing the ID of the new report request.
         """
-        pass
+        data = {"type": report_type}
+        if start_time is not None:
+            data["start_time"] = start_time
+        if end_time is not None:
+            data["end_time"] = end_time
+        response = self._make_request("POST", "/v1/reports", data=data)
+        return response
 
     def get_transfers(
         self,
@@ -469,14 +901,9 @@ class CoinlistApi:
         Returns:
             dict: An object containing an array of transfers.
         """
-        params = {
-            start_time: start_time,
-            end_time: end_time,
-            descending: descending,
-            count: count,
-        }
+        params = _list_params(start_time, end_time, descending, count)
         response = self._make_request("GET", "/v1/transfers", params=params)
-        return response
+        return self._wrap("transfers", response)
 
     def transfer_to_wallet(self, asset: str = "BTC", amont: int = 0):
         """Transfer Funds From Pro to Wallet.
@@ -533,8 +960,8 @@ class CoinlistApi:
         self,
         symbol: str,
         field_name: str = "price",
-        start_time: str = str(datetime(2011, 11, 4, 0, 0, 0)),
-        end_time: str = str(datetime.today()),
+        start_time: str = None,
+        end_time: str = None,
         granularity: str = "1m",
         format: str = "json",
     ):
@@ -543,31 +970,34 @@ class CoinlistApi:
         Args:
             symbol (str): Required.
             field_name (str): enumerated value(price, fair_price, best_ask, best_bid). Default: "price".
-            start_time (str): date-time. Default: datetime(2011, 11, 4, 0, 0, 0)).
-            end_time (str): date-time. Default: time at the moment of request.
+            start_time (str, optional): date-time. Default: left to the exchange.
+            end_time (str, optional): date-time. Default: left to the exchange (now).
             granularity (str): enumerated value(1m, 5m, 30m). Default: "1m".
             format (str): enumerated value(json, csv). Default: 'json'.
 
         Returns:
             dict: Candles are returned in the form [time, open, high, low, close, volume, index_close].
         """
-        data = {
-            "symbol": symbol,
-            "field_name": field_name,
-            "start_time": start_time,
-            "end_time": end_time,
-            "granularity": granularity,
-            "format": format,
-        }
-        response = self._make_request("GET", f"/v1/symbols/{symbol}/candles", data=data)
+        params = _list_params(
+            start_time,
+            end_time,
+            None,
+            None,
+            field_name=field_name,
+            granularity=granularity,
+            format=format,
+        )
+        response = self._make_request(
+            "GET", f"/v1/symbols/{symbol}/candles", params=params
+        )
         return response
 
     def get_auctions(
         self,
         symbol: str,
-        min_volume: str = "price",
-        start_time: str = str(datetime(2011, 11, 4, 0, 0, 0)),
-        end_time: str = str(datetime.today()),
+        min_volume: str = None,
+        start_time: str = None,
+        end_time: str = None,
         descending: bool = False,
         count: int = 200,
     ):
@@ -575,7 +1005,7 @@ class CoinlistApi:
 
         Args:
             symbol (str): The symbol to list auctions for.
-            min_volume (str, optional): Return auctions with greater than or equal to this trade volume. Defaults to 'price'.
+            min_volume (str, optional): Return auctions with greater than or equal to this trade volume.
             start_time (str, optional): Start date-time for results (inclusive; filter on logical_time).
             end_time (str, optional): End date-time for results (inclusive; filter on logical_time).
             descending (bool, optional): If true, sort newest results first (default false). Defaults to False.
@@ -584,18 +1014,13 @@ class CoinlistApi:
         Returns:
             List: Returns historical, complete auctions for the given symbol - in descending chronological order. Indicative auctions are not included.
         """
-        data = {
-            "symbol": symbol,
-            "min_volume": min_volume,
-            "start_time": start_time,
-            "end_time": end_time,
-            "descending": descending,
-            "count": count,
-        }
+        params = _list_params(
+            start_time, end_time, descending, count, min_volume=min_volume
+        )
         response = self._make_request(
-            "GET", f"/v1/symbols/{symbol}/auctions", data=data
+            "GET", f"/v1/symbols/{symbol}/auctions", params=params
         )
-        return response
+        return self._wrap("auctions", response)
 
     def get_auction_results(self, symbol: str, auction_code: str):
         """Get Auction Results.
@@ -622,7 +1047,7 @@ class CoinlistApi:
             Dict: Get the full, price-aggregated order book for a symbol.
         """
         response = self._make_request("GET", f"/v1/symbols/{symbol}/book")
-        return response
+        return self._wrap("book", response)
 
     def get_quote(self, symbol: str):
         """Get Quote (Level 1).
@@ -634,17 +1059,38 @@ class CoinlistApi:
             Dict: Get the latest quote data including last trade, best bid, and best ask.
         """
         response = self._make_request("GET", f"/v1/symbols/{symbol}/quote")
-        return response
+        return self._wrap("quote", response)
 
     def get_symbols(self):
         """List Symbols.
 
+        Served from the symbol registry when one is attached.
+
         Returns:
             Dict: Get symbols and metadata for all active markets on CoinList Pro.
         """
+        if self.symbols is not None:
+            return self._symbol_rules().response
         response = self._make_request("GET", f"/v1/symbols")
         return response
 
+    def _symbol_rules(self):
+        """The attached symbol registry, refreshed if stale."""
+        if self.symbols.stale:
+            self._refresh_symbols(self._make_request("GET", "/v1/symbols"))
+        return self.symbols
+
+    def _refresh_symbols(self, response):
+        """Load a ``/v1/symbols`` response into the registry.
+
+        A failed refresh keeps the previous metadata, still stale so the next
+        call tries again; with nothing loaded yet it raises ``ApiError``.
+        """
+        if models.is_error(response) and self.symbols.loaded_at is not None:
+            logger.warning("Keeping stale symbol metadata after %s", response)
+            return
+        self.symbols.load(response)
+
     def get_symbol_summaries(self, symbol: str):
         """Get Symbol Summaries.
 
@@ -666,8 +1112,7 @@ class CoinlistApi:
         Returns:
             Dict: Get symbol metadata.
         """
-        response = self._make_request("GET", "/v1/symbols/summary")
-        return response
+        return self.get_symbol(symbol)
 
     def get_market_summary(self, symbol: str):
         """Get Market Summary.
@@ -681,6 +1126,258 @@ class CoinlistApi:
         response = self._make_request("GET", f"/v1/symbols/{symbol}")
         return response
 
+    def get_snapshot(
+        self,
+        symbols: list,
+        kinds=(snapshot.SUMMARY,),
+        max_workers: int = 8,
+        depth: int = 10,
+    ):
+        """Market data of many symbols in one columnar snapshot.
+
+        ``summary`` is one ``/v1/symbols/summary`` call for all symbols;
+        ``quote`` and ``book`` are fetched per symbol, ``max_workers`` at a
+        time. A failed request leaves NaN in its columns and is reported in
+        ``errors`` instead of failing the snapshot.
+
+        Args:
+            symbols (list): Symbols, in column order.
+            kinds (iterable, optional): Any of "summary", "quote" and "book".
+                Defaults to ("summary",).
+            max_workers (int, optional): Requests sent at the same time. Defaults to 8.
+            depth (int, optional): Book levels kept per side. Defaults to 10.
+
+        Returns:
+            MarketSnapshot: Columns (``array('d')``) aligned by symbol.
+        """
+        kinds = snapshot.check_kinds(kinds)
+        result = snapshot.MarketSnapshot(symbols)
+        plan = snapshot.requests_for(result.symbols, kinds)
+        fetch = {
+            snapshot.SUMMARY: self.get_symbol_summaries,
+            snapshot.QUOTE: self.get_quote,
+            snapshot.BOOK: self.get_order_book,
+        }
+
+        def run(request):
+            kind, symbol = request
+            try:
+                return fetch[kind](symbol)
+            except Exception as e:
+                return e
+
+        if len(plan) <= 1 or max_workers <= 1:
+            responses = [run(request) for request in plan]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(plan))) as pool:
+                responses = list(pool.map(run, plan))
+        for (kind, symbol), response in zip(plan, responses):
+            if isinstance(response, Exception):
+                result.fail(kind, symbol, response)
+            else:
+                result.add(kind, symbol, response, depth)
+        return result
+
+    # PAGINATION
+    def _iter_list(
+        self, method, prefetch, start_time, end_time, descending, count, **kwargs
+    ):
+        items_key, time_field, id_field = LIST_ENDPOINTS[method]
+        cursor = PageCursor(
+            items_key, time_field, id_field, start_time, end_time, descending, count
+        )
+        fetch = functools.partial(getattr(self, method), **kwargs)
+        return iterate(fetch, cursor, prefetch=prefetch)
+
+    def iter_transfers(
+        self,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = False,
+        count: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ):
+        """Iterate over all transfers, page by page.
+
+        The next page is fetched in the background while the current one is
+        consumed; at most two pages are held in memory.
+
+        Args:
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, newest results first. Defaults to False.
+            count (int, optional): Page size (max 500). Defaults to 500.
+            prefetch (bool, optional): Prefetch the next page. Defaults to True.
+
+        Yields:
+            dict: Transfers.
+        """
+        return self._iter_list(
+            "get_transfers", prefetch, start_time, end_time, descending, count
+        )
+
+    def iter_auctions(
+        self,
+        symbol: str,
+        min_volume: str = None,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = False,
+        count: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ):
+        """Iterate over all auctions of a symbol, page by page.
+
+        Args:
+            symbol (str): The symbol to list auctions for.
+            min_volume (str, optional): Minimum trade volume.
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, newest results first. Defaults to False.
+            count (int, optional): Page size (max 500). Defaults to 500.
+            prefetch (bool, optional): Prefetch the next page. Defaults to True.
+
+        Yields:
+            dict: Auctions.
+        """
+        return self._iter_list(
+            "get_auctions",
+            prefetch,
+            start_time,
+            end_time,
+            descending,
+            count,
+            symbol=symbol,
+            min_volume=min_volume,
+        )
+
+    def iter_reports(
+        self,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = False,
+        count: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ):
+        """Iterate over all report requests, page by page.
+
+        Args:
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, newest results first. Defaults to False.
+            count (int, optional): Page size (max 500). Defaults to 500.
+            prefetch (bool, optional): Prefetch the next page. Defaults to True.
+
+        Yields:
+            dict: Report requests.
+        """
+        return self._iter_list(
+            "get_reports", prefetch, start_time, end_time, descending, count
+        )
+
+    def iter_fills(
+        self,
+        symbol: str = None,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = False,
+        count: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ):
+        """Iterate over all fills, page by page.
+
+        Args:
+            symbol (str, optional): Only fills for this symbol.
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, newest results first. Defaults to False.
+            count (int, optional): Page size (max 500). Defaults to 500.
+            prefetch (bool, optional): Prefetch the next page. Defaults to True.
+
+        Yields:
+            dict: Fills.
+        """
+        return self._iter_list(
+            "get_list_fills",
+            prefetch,
+            start_time,
+            end_time,
+            descending,
+            count,
+            symbol=symbol,
+        )
+
+    def iter_orders(
+        self,
+        symbol: str = None,
+        status: str = None,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = False,
+        count: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ):
+        """Iterate over all orders, page by page.
+
+        Args:
+            symbol (str, optional): Only orders for this symbol.
+            status (str, optional): Only orders with this status.
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, newest results first. Defaults to False.
+            count (int, optional): Page size (max 500). Defaults to 500.
+            prefetch (bool, optional): Prefetch the next page. Defaults to True.
+
+        Yields:
+            dict: Orders.
+        """
+        return self._iter_list(
+            "get_list_orders",
+            prefetch,
+            start_time,
+            end_time,
+            descending,
+            count,
+            symbol=symbol,
+            status=status,
+        )
+
+    def iter_account_history(
+        self,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = False,
+        count: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ):
+        """Iterate over the whole account ledger, page by page.
+
+        Args:
+            start_time (str, optional): Start date-time for results (inclusive).
+            end_time (str, optional): End date-time for results (inclusive).
+            descending (bool, optional): If true, newest results first. Defaults to False.
+            count (int, optional): Page size (max 500). Defaults to 500.
+            prefetch (bool, optional): Prefetch the next page. Defaults to True.
+
+        Yields:
+            dict: Ledger transactions.
+        """
+        return self._iter_list(
+            "get_account_history", prefetch, start_time, end_time, descending, count
+        )
+
+
+def _list_params(start_time, end_time, descending, count, **extra):
+    """Query parameters of a list endpoint; unset values are left out."""
+    params = {
+        "start_time": start_time or None,
+        "end_time": end_time or None,
+        "descending": None if descending is None else str(bool(descending)).lower(),
+        "count": count,
+    }
+    params.update(extra)
+    return {key: value for key, value in params.items() if value is not None}
+
 
 if __name__ == "__main__":
     coinlist = CoinlistApi("", "")
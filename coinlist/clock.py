@@ -0,0 +1,229 @@
+"""Exchange clock estimation for signed request timestamps."""
+import logging
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+from coinlist.transport import require_sync
+
+logger = logging.getLogger(__name__)
+
+# Seconds between full re-estimates from all samples (which also feed the
+# drift fit); in between, new samples only narrow the current interval.
+_ESTIMATE_INTERVAL = 10.0
+
+
+class ClockSync:
+    """Estimates how far the exchange clock is from the local one.
+
+    Every sample is a request sent at local time ``sent`` and answered at
+    ``received`` carrying server time ``server`` with a resolution (1 s for
+    ``Date`` headers). The server read its clock somewhere inside the round
+    trip, so the offset lies in ``[server - received, server + resolution -
+    sent]``. Intersecting the intervals of recent samples (newest first,
+    corrected for drift, stopping at the first one that contradicts them)
+    narrows the estimate well below the header resolution; the offset is the
+    midpoint and the uncertainty half the width. Drift is the slope of the
+    offset over time and is used to extrapolate between samples. A
+    contradiction larger than ``max_step`` is taken as a clock step and older
+    samples are dropped.
+
+    The client feeds it the ``Date`` header of every response, which costs
+    nothing extra; ``start`` additionally polls ``/v1/time`` in the
+    background so an idle client stays in sync.
+
+    Args:
+        max_age (float, optional): Seconds a sample is used for. Defaults to 600.
+        max_samples (int, optional): Samples kept. Defaults to 64.
+        min_drift_span (float, optional): Seconds of history needed before drift
+            is estimated. Defaults to 120.
+        max_step (float, optional): Seconds of disagreement taken as a clock step.
+            Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        max_age: float = 600.0,
+        max_samples: int = 64,
+        min_drift_span: float = 120.0,
+        max_step: float = 1.0,
+    ):
+        self.max_age = max_age
+        self.min_drift_span = min_drift_span
+        self.max_step = max_step
+        self._samples = deque(maxlen=max_samples)
+        self._estimates = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._offset = 0.0
+        self._uncertainty = None
+        self._drift = 0.0
+        self._at = 0.0
+        self._estimated_at = float("-inf")
+        self._last_date = None
+        self._thread = None
+        self._stop = threading.Event()
+        self.steps = 0
+
+    # SAMPLES
+    def observe(self, sent: float, received: float, server: float, resolution: float = 0.0):
+        """Add one round trip; all times are Unix seconds."""
+        if received < sent:
+            return
+        lo, hi = server - received, server + resolution - sent
+        with self._lock:
+            self._samples.append((sent, received, server, resolution))
+            if received - self._estimated_at < _ESTIMATE_INTERVAL:
+                shift = self._offset + self._drift * (received - self._at)
+                cur_lo, cur_hi = shift - self._uncertainty, shift + self._uncertainty
+                if lo <= cur_hi and hi >= cur_lo:
+                    lo, hi = max(lo, cur_lo), min(hi, cur_hi)
+                    self._offset, self._uncertainty = (lo + hi) / 2, (hi - lo) / 2
+                    self._at = received
+                    return
+            self._update(received)
+
+    def observe_date(self, sent: float, received: float, date: str):
+        """Add a round trip answered with the HTTP ``Date`` header ``date``."""
+        cached = self._last_date
+        if cached is not None and cached[0] == date:
+            server = cached[1]
+        else:
+            try:
+                server = parsedate_to_datetime(date).timestamp()
+            except (TypeError, ValueError, IndexError):
+                return
+            self._last_date = (date, server)
+        self.observe(sent, received, server, 1.0)
+
+    def _update(self, now: float):
+        drift = self._drift
+        lo, hi = float("-inf"), float("inf")
+        used = 0
+        for sent, received, server, resolution in reversed(self._samples):
+            if now - received > self.max_age:
+                break
+            # Carry the older sample's interval forward to ``now``.
+            shift = drift * (now - (sent + received) / 2)
+            s_lo, s_hi = server - received + shift, server + resolution - sent + shift
+            if s_lo > hi or s_hi < lo:
+                if max(s_lo - hi, lo - s_hi) > self.max_step:
+                    # A clock was stepped: drop what came before.
+                    self.steps += 1
+                    while len(self._samples) > used:
+                        self._samples.popleft()
+                    self._estimates.clear()
+                    self._drift = 0.0
+                break
+            lo, hi = max(lo, s_lo), min(hi, s_hi)
+            used += 1
+        if not used:
+            return
+        self._offset, self._uncertainty, self._at = (lo + hi) / 2, (hi - lo) / 2, now
+        self._estimated_at = now
+        estimates = self._estimates
+        estimates.append((now, self._offset))
+        span = now - estimates[0][0]
+        if span >= self.min_drift_span:
+            n = len(estimates)
+            mean_t = sum(t for t, _ in estimates) / n
+            mean_o = sum(o for _, o in estimates) / n
+            var = sum((t - mean_t) ** 2 for t, _ in estimates)
+            if var > 0:
+                cov = sum((t - mean_t) * (o - mean_o) for t, o in estimates)
+                self._drift = cov / var
+
+    # ESTIMATE
+    @property
+    def synced(self):
+        return self._uncertainty is not None
+
+    @property
+    def offset(self):
+        """Seconds the exchange clock is ahead of the local one, right now."""
+        return self._offset + self._drift * (time.time() - self._at) if self._at else 0.0
+
+    @property
+    def uncertainty(self):
+        """Half-width of the offset interval in seconds, or None before any sample."""
+        return self._uncertainty
+
+    @property
+    def drift(self):
+        """Estimated drift of the offset, in seconds per second."""
+        return self._drift
+
+    def now(self):
+        """Current exchange time as Unix seconds."""
+        return time.time() + self.offset
+
+    def timestamp(self):
+        """``CL-ACCESS-TIMESTAMP`` value for a request signed now."""
+        return str(int(self.now()))
+
+    def stats(self):
+        return {
+            "offset": self.offset,
+            "uncertainty": self._uncertainty,
+            "drift": self._drift,
+            "samples": len(self._samples),
+            "steps": self.steps,
+        }
+
+    def reset(self):
+        """Forget all samples, e.g. after the local clock was stepped."""
+        with self._lock:
+            self._samples.clear()
+            self._estimates.clear()
+            self._offset, self._uncertainty, self._drift, self._at = 0.0, None, 0.0, 0.0
+            self._estimated_at = float("-inf")
+
+    # ACTIVE SYNC
+    def sync(self, client, samples: int = 3):
+        """Sample ``/v1/time`` ``samples`` times through ``client``.
+
+        Returns:
+            Float: The new offset.
+        """
+        require_sync(client, "ClockSync.sync")
+        for _ in range(samples):
+            client.exchange_time()
+        return self.offset
+
+    async def sync_async(self, client, samples: int = 3):
+        """Coroutine version of ``sync`` for an ``AsyncCoinlistApi``."""
+        for _ in range(samples):
+            await client.exchange_time()
+        return self.offset
+
+    def start(self, client, interval: float = 60.0, samples: int = 3):
+        """Re-sync from ``/v1/time`` every ``interval`` seconds in a daemon thread.
+
+        The thread needs a sync client; with ``AsyncCoinlistApi`` schedule
+        ``sync_async`` on the event loop instead.
+        """
+        require_sync(client, "ClockSync.start")
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.sync(client, samples)
+                except Exception:
+                    logger.exception("Coinlist clock sync failed")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="coinlist-clock", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background sync."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def __repr__(self):
+        return f"ClockSync(offset={self.offset:.3f}, uncertainty={self._uncertainty})"
@@ -0,0 +1,138 @@
+"""Single-flight coalescing of identical concurrent reads."""
+import asyncio
+import threading
+import time
+
+_MISS = object()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent requests into one.
+
+    The first caller for a key runs the request; callers arriving while it
+    is in flight wait for it and get the same result (or exception).
+    With a ``window``, a result is also reused by calls starting up to
+    ``window`` seconds after it arrived. Threads use ``do`` and coroutines
+    ``ado``; the two never share an in-flight call. Shared results are the
+    same object for every caller and must be treated as read-only.
+
+    Args:
+        window (float, optional): Seconds a result is reused after it arrived.
+            Defaults to 0 (only in-flight requests are shared).
+        max_results (int, optional): Results kept for the window before expired
+            ones are pruned. Defaults to 1024.
+    """
+
+    def __init__(self, window: float = 0.0, max_results: int = 1024):
+        self.window = window
+        self.max_results = max_results
+        self.calls = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._tasks = {}
+        self._results = {}
+
+    def _recent(self, key):
+        """A result of ``key`` still inside the window; call with the lock held."""
+        entry = self._results.get(key)
+        if entry is None:
+            return _MISS
+        expires, result = entry
+        if time.monotonic() >= expires:
+            del self._results[key]
+            return _MISS
+        return result
+
+    def _remember(self, key, result):
+        """Keep ``result`` for the window; call with the lock held."""
+        now = time.monotonic()
+        if len(self._results) >= self.max_results:
+            for k in [k for k, (expires, _) in self._results.items() if expires <= now]:
+                del self._results[k]
+            if len(self._results) >= self.max_results:
+                self._results.clear()
+        self._results[key] = (now + self.window, result)
+
+    def do(self, key, fn):
+        """Run ``fn()`` unless an identical call is in flight, and share its result.
+
+        Args:
+            key (hashable): Identity of the request.
+            fn (callable): Performs the request.
+        """
+        with self._lock:
+            self.calls += 1
+            if self.window:
+                result = self._recent(key)
+                if result is not _MISS:
+                    self.coalesced += 1
+                    return result
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if self.window and call.error is None:
+                    self._remember(key, call.result)
+            call.event.set()
+        return call.result
+
+    async def ado(self, key, fn):
+        """Coroutine version of ``do``; ``fn()`` returns an awaitable.
+
+        The shared request runs as its own task, so cancelling one caller
+        does not cancel it for the others.
+        """
+        with self._lock:
+            self.calls += 1
+            if self.window:
+                result = self._recent(key)
+                if result is not _MISS:
+                    self.coalesced += 1
+                    return result
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda t: self._done(key, t))
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+            if self.window and not task.cancelled() and task.exception() is None:
+                self._remember(key, task.result())
+
+    def forget(self, key=None):
+        """Drop remembered results, of ``key`` only if given."""
+        with self._lock:
+            if key is None:
+                self._results.clear()
+            else:
+                self._results.pop(key, None)
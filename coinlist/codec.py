@@ -0,0 +1,185 @@
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+FLOAT = "float"
+DECIMAL = "decimal"
+FIXED = "fixed"
+
+# Keys whose values are prices or quantities.
+NUMERIC_FIELDS = frozenset(
+    (
+        "price",
+        "size",
+        "size_filled",
+        "fill_fees",
+        "fee",
+        "quantity",
+        "amount",
+        "stop_price",
+        "average_fill_price",
+        "best_bid",
+        "best_ask",
+        "bid",
+        "ask",
+        "last",
+        "bid_size",
+        "ask_size",
+        "last_size",
+        "lowest_ask",
+        "highest_bid",
+        "highest_price_24h",
+        "lowest_price_24h",
+        "price_change_percent_24h",
+        "imbalance",
+        "last_price",
+        "last_trade_price",
+        "last_trade_qty",
+        "volume",
+        "volume_base_24h",
+        "volume_quote_24h",
+        "fair_price",
+        "index_price",
+        "net_liquidation_value_usd",
+        "balance",
+        "hold",
+        "maker",
+        "taker",
+        "liquidation",
+        "minimum_price_increment",
+        "minimum_size_increment",
+    )
+)
+# Keys holding [price, size, ...] level lists.
+LEVEL_FIELDS = frozenset(("bids", "asks"))
+# Keys holding {asset: amount} maps.
+AMOUNT_MAP_FIELDS = frozenset(("asset_balances", "asset_holds"))
+
+
+class JsonCodec:
+    """Pluggable JSON encoder/decoder.
+
+    Uses ``orjson`` when installed and the standard library otherwise.
+    Responses are decoded straight from the response bytes. Price and size
+    fields (NUMERIC_FIELDS, the levels under ``bids``/``asks`` and the
+    amounts under ``asset_balances``/``asset_holds``) can be
+    parsed exactly as ``Decimal`` or as fixed-point integers instead of
+    floats.
+
+    Args:
+        numbers (str, optional): "float" (leave as decoded), "decimal" or "fixed".
+            Defaults to "float". Numbers sent as JSON strings are converted exactly;
+            JSON floats go through their shortest round-trip repr.
+        scale (int, optional): Decimal places of fixed-point integers, e.g. 8 turns
+            "1.5" into 150000000. Defaults to 8.
+        backend (str, optional): "orjson" or "json". Defaults to orjson when available.
+        fields (iterable, optional): Numeric keys to convert. Defaults to NUMERIC_FIELDS.
+    """
+
+    def __init__(
+        self, numbers: str = FLOAT, scale: int = 8, backend: str = None, fields=None
+    ):
+        if numbers not in (FLOAT, DECIMAL, FIXED):
+            raise ValueError(f"Unknown number mode {numbers!r}")
+        if backend is None:
+            backend = "orjson" if orjson is not None else "json"
+        if backend == "orjson" and orjson is None:
+            raise ImportError(
+                "orjson is not installed: pip install coinlist-python[fast]"
+            )
+        if backend not in ("orjson", "json"):
+            raise ValueError(f"Unknown JSON backend {backend!r}")
+        self.numbers = numbers
+        self.scale = scale
+        self.backend = backend
+        self.fields = NUMERIC_FIELDS if fields is None else frozenset(fields)
+        self._factor = Decimal(10) ** scale
+        self._loads = orjson.loads if backend == "orjson" else json.loads
+
+    def dumps(self, obj) -> bytes:
+        """Serialize compactly to UTF-8 bytes."""
+        if self.backend == "orjson":
+            return orjson.dumps(obj, default=_default)
+        return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
+
+    def loads(self, data):
+        """Decode ``bytes`` (or ``str``) and convert numeric fields.
+
+        Args:
+            data (bytes or str): Response body.
+
+        Returns:
+            Decoded object.
+        """
+        obj = self._loads(data)
+        if self.numbers == FLOAT:
+            return obj
+        return self._convert(obj)
+
+    def _number(self, value):
+        if type(value) is str:
+            if self.numbers == FIXED:
+                fixed = _fixed_from_str(value, self.scale)
+                if fixed is not None:
+                    return fixed
+            try:
+                value = Decimal(value)
+            except ArithmeticError:
+                return value
+        elif type(value) is float:
+            value = Decimal(repr(value))
+        elif type(value) is int:
+            value = Decimal(value)
+        else:
+            return value
+        if self.numbers == FIXED:
+            return int((value * self._factor).to_integral_value())
+        return value
+
+    def _convert(self, obj):
+        if isinstance(obj, list):
+            return [self._convert(item) for item in obj]
+        if not isinstance(obj, dict):
+            return obj
+        fields, number, convert = self.fields, self._number, self._convert
+        out = {}
+        for key, value in obj.items():
+            if key in fields and not isinstance(value, (dict, list)):
+                out[key] = number(value)
+            elif key in LEVEL_FIELDS and isinstance(value, list):
+                out[key] = [
+                    [number(v) for v in level]
+                    if isinstance(level, list)
+                    else convert(level)
+                    for level in value
+                ]
+            elif key in AMOUNT_MAP_FIELDS and isinstance(value, dict):
+                out[key] = {asset: number(v) for asset, v in value.items()}
+            elif isinstance(value, (dict, list)):
+                out[key] = convert(value)
+            else:
+                out[key] = value
+        return out
+
+
+def _fixed_from_str(value: str, scale: int):
+    """Plain decimal string to a fixed-point int without Decimal; None if not plain."""
+    whole, _, frac = value.partition(".")
+    sign = ""
+    if whole and whole[0] in "+-":
+        sign, whole = whole[0], whole[1:]
+    if not (whole or frac) or len(frac) > scale:
+        return None
+    if (whole and not whole.isdecimal()) or (frac and not frac.isdecimal()):
+        return None
+    return int(sign + (whole or "0") + frac.ljust(scale, "0"))
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,428 @@
+"""Per-request instrumentation hooks, histogram aggregation and Prometheus export.
+
+A hook is any callable taking a ``RequestEvent``; install it with
+``CoinlistApi(hooks=[...])`` or ``client.add_hook``. ``MetricsCollector`` is
+a ready-made hook aggregating latency histograms and counters per endpoint
+template, and ``PrometheusExporter`` renders it in the Prometheus text format.
+"""
+import functools
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the latency buckets; a +Inf bucket is implied.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+PHASES = ("queue", "sign", "network", "decode")
+
+# Path segments kept as-is in endpoint templates.
+_STATIC_SEGMENTS = frozenset(
+    (
+        "v1",
+        "accounts",
+        "ledger",
+        "wallets",
+        "ledger-summary",
+        "balances",
+        "fills",
+        "fees",
+        "keys",
+        "time",
+        "orders",
+        "bulk",
+        "reports",
+        "transfers",
+        "to-wallet",
+        "from-wallet",
+        "internal-transfer",
+        "symbols",
+        "summary",
+        "candles",
+        "auctions",
+        "book",
+        "quote",
+    )
+)
+# Placeholder for a variable segment, by the segment before it.
+_PLACEHOLDERS = {
+    "accounts": "{trader_id}",
+    "orders": "{order_id}",
+    "symbols": "{symbol}",
+    "auctions": "{auction_code}",
+    "reports": "{report_id}",
+    "transfers": "{transfer_id}",
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def endpoint_template(path: str) -> str:
+    """Endpoint template of a request path, e.g. ``/v1/orders/{order_id}``.
+
+    Args:
+        path (str): Request path, with or without query string.
+
+    Returns:
+        String: Path with IDs and symbols replaced by placeholders.
+    """
+    segments = path.split("?", 1)[0].split("/")
+    for i in range(1, len(segments)):
+        if segments[i] and segments[i] not in _STATIC_SEGMENTS:
+            segments[i] = _PLACEHOLDERS.get(segments[i - 1], "{id}")
+    return "/".join(segments)
+
+
+class RequestEvent:
+    """Timing and outcome of one request, passed to every hook.
+
+    Times are in seconds: ``queue_time`` waiting for the rate limiter,
+    ``sign_time`` building and signing the request, ``network_time`` from
+    sending to the full response body, and ``decode_time`` parsing it.
+    ``status`` is None and ``error`` is set when no response was received.
+    ``retries`` counts the attempts made before this one.
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "status",
+        "request_bytes",
+        "response_bytes",
+        "queue_time",
+        "sign_time",
+        "network_time",
+        "decode_time",
+        "retries",
+        "error",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        status: int = None,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        queue_time: float = 0.0,
+        sign_time: float = 0.0,
+        network_time: float = 0.0,
+        decode_time: float = 0.0,
+        retries: int = 0,
+        error: BaseException = None,
+    ):
+        self.method = method
+        self.path = path
+        self.status = status
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.queue_time = queue_time
+        self.sign_time = sign_time
+        self.network_time = network_time
+        self.decode_time = decode_time
+        self.retries = retries
+        self.error = error
+
+    @property
+    def endpoint(self):
+        return endpoint_template(self.path)
+
+    @property
+    def total_time(self):
+        return self.queue_time + self.sign_time + self.network_time + self.decode_time
+
+    def __repr__(self):
+        return (
+            f"RequestEvent({self.method} {self.endpoint} status={self.status} "
+            f"total={self.total_time * 1e3:.3f}ms retries={self.retries})"
+        )
+
+
+class _Shard:
+    """Counters of one (endpoint, method) written by one thread only."""
+
+    __slots__ = (
+        "buckets",
+        "count",
+        "duration",
+        "phases",
+        "sent",
+        "received",
+        "retries",
+        "statuses",
+    )
+
+    def __init__(self, n_buckets: int):
+        self.buckets = [0] * n_buckets
+        self.count = 0
+        self.duration = 0.0
+        self.phases = [0.0] * len(PHASES)
+        self.sent = 0
+        self.received = 0
+        self.retries = 0
+        self.statuses = {}
+
+
+class MetricsCollector:
+    """Hook aggregating latency histograms and counters per endpoint template.
+
+    Each thread writes to its own shard, so recording takes no lock; shards
+    are only summed when a snapshot is taken. Recording costs a dict lookup,
+    a bisect over the bucket bounds and a few additions.
+
+    Args:
+        buckets (tuple, optional): Upper bounds in seconds of the latency
+            buckets. Defaults to DEFAULT_BUCKETS.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+
+    def _shard(self, key):
+        try:
+            shards = self._local.shards
+        except AttributeError:
+            shards = self._local.shards = {}
+        shard = shards.get(key)
+        if shard is None:
+            shard = shards[key] = _Shard(len(self.bounds) + 1)
+            with self._lock:
+                self._shards.append((key, shard))
+        return shard
+
+    def __call__(self, event: RequestEvent):
+        shard = self._shard((event.endpoint, event.method))
+        total = event.total_time
+        shard.buckets[bisect_left(self.bounds, total)] += 1
+        shard.count += 1
+        shard.duration += total
+        phases = shard.phases
+        phases[0] += event.queue_time
+        phases[1] += event.sign_time
+        phases[2] += event.network_time
+        phases[3] += event.decode_time
+        shard.sent += event.request_bytes
+        shard.received += event.response_bytes
+        shard.retries += event.retries
+        status = "error" if event.status is None else str(event.status)
+        shard.statuses[status] = shard.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        """Aggregated metrics.
+
+        Returns:
+            dict: ``{(endpoint, method): stats}``. ``stats`` holds ``count``,
+            ``sum`` (seconds), non-cumulative ``buckets`` (the last one is
+            +Inf), ``phases`` (seconds per phase), ``bytes_sent``,
+            ``bytes_received``, ``retries`` and ``statuses``.
+        """
+        with self._lock:
+            shards = list(self._shards)
+        out = {}
+        for key, shard in shards:
+            stats = out.get(key)
+            if stats is None:
+                stats = out[key] = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "buckets": [0] * (len(self.bounds) + 1),
+                    "phases": dict.fromkeys(PHASES, 0.0),
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                    "retries": 0,
+                    "statuses": {},
+                }
+            stats["count"] += shard.count
+            stats["sum"] += shard.duration
+            for i, n in enumerate(shard.buckets):
+                stats["buckets"][i] += n
+            for phase, value in zip(PHASES, shard.phases):
+                stats["phases"][phase] += value
+            stats["bytes_sent"] += shard.sent
+            stats["bytes_received"] += shard.received
+            stats["retries"] += shard.retries
+            for status, n in list(shard.statuses.items()):
+                stats["statuses"][status] = stats["statuses"].get(status, 0) + n
+        return out
+
+    def quantile(self, endpoint: str, method: str, q: float):
+        """Latency quantile estimated from the buckets, None without data.
+
+        Values are interpolated linearly inside the bucket holding the
+        quantile; the +Inf bucket reports the largest finite bound.
+        """
+        stats = self.snapshot().get((endpoint, method))
+        if not stats or not stats["count"]:
+            return None
+        rank = q * stats["count"]
+        seen = 0
+        for i, n in enumerate(stats["buckets"]):
+            if n and seen + n >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+    def reset(self):
+        """Drop everything recorded so far."""
+        with self._lock:
+            for _, shard in self._shards:
+                shard.__init__(len(self.bounds) + 1)
+
+
+class PrometheusExporter:
+    """Renders a ``MetricsCollector`` in the Prometheus text exposition format.
+
+    Args:
+        collector (MetricsCollector): Source of the metrics.
+        namespace (str, optional): Metric name prefix. Defaults to "coinlist".
+        clock (ClockSync, optional): Also export the exchange clock offset, its
+            uncertainty and drift, e.g. ``client.clock``.
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, collector: MetricsCollector, namespace: str = "coinlist", clock=None):
+        self.collector = collector
+        self.namespace = namespace
+        self.clock = clock
+        self._server = None
+
+    def render(self) -> str:
+        ns = self.namespace
+        snapshot = sorted(self.collector.snapshot().items())
+        bounds = [_number(b) for b in self.collector.bounds] + ["+Inf"]
+        lines = [
+            f"# HELP {ns}_request_duration_seconds Request latency including rate limiter wait.",
+            f"# TYPE {ns}_request_duration_seconds histogram",
+        ]
+        for (endpoint, method), stats in snapshot:
+            labels = _labels(endpoint=endpoint, method=method)
+            cumulative = 0
+            for le, n in zip(bounds, stats["buckets"]):
+                cumulative += n
+                lines.append(
+                    f'{ns}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}'
+                )
+            lines.append(f"{ns}_request_duration_seconds_sum{{{labels}}} {_number(stats['sum'])}")
+            lines.append(f"{ns}_request_duration_seconds_count{{{labels}}} {stats['count']}")
+
+        lines += [
+            f"# HELP {ns}_request_phase_seconds_total Time spent per request phase.",
+            f"# TYPE {ns}_request_phase_seconds_total counter",
+        ]
+        for (endpoint, method), stats in snapshot:
+            for phase, value in stats["phases"].items():
+                labels = _labels(endpoint=endpoint, method=method, phase=phase)
+                lines.append(f"{ns}_request_phase_seconds_total{{{labels}}} {_number(value)}")
+
+        lines += [
+            f"# HELP {ns}_responses_total Responses by status; 'error' when none was received.",
+            f"# TYPE {ns}_responses_total counter",
+        ]
+        for (endpoint, method), stats in snapshot:
+            for status, n in sorted(stats["statuses"].items()):
+                labels = _labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f"{ns}_responses_total{{{labels}}} {n}")
+
+        lines += [
+            f"# HELP {ns}_request_bytes_total Request and response body bytes.",
+            f"# TYPE {ns}_request_bytes_total counter",
+        ]
+        for (endpoint, method), stats in snapshot:
+            for direction in ("sent", "received"):
+                labels = _labels(endpoint=endpoint, method=method, direction=direction)
+                lines.append(
+                    f"{ns}_request_bytes_total{{{labels}}} {stats['bytes_' + direction]}"
+                )
+
+        lines += [
+            f"# HELP {ns}_request_retries_total Retried attempts.",
+            f"# TYPE {ns}_request_retries_total counter",
+        ]
+        for (endpoint, method), stats in snapshot:
+            labels = _labels(endpoint=endpoint, method=method)
+            lines.append(f"{ns}_request_retries_total{{{labels}}} {stats['retries']}")
+
+        if self.clock is not None and self.clock.synced:
+            clock = self.clock.stats()
+            for name, key, help in (
+                ("clock_offset_seconds", "offset", "Exchange clock minus local clock."),
+                ("clock_uncertainty_seconds", "uncertainty", "Half-width of the offset estimate."),
+                ("clock_drift_ratio", "drift", "Offset drift in seconds per second."),
+            ):
+                lines += [
+                    f"# HELP {ns}_{name} {help}",
+                    f"# TYPE {ns}_{name} gauge",
+                    f"{ns}_{name} {_number(clock[key])}",
+                ]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1"):
+        """Serve ``/metrics`` from a background thread.
+
+        Args:
+            port (int, optional): Port to listen on; 0 picks a free one. Defaults to 0.
+            host (str, optional): Interface to bind. Defaults to "127.0.0.1".
+
+        Returns:
+            Tuple: (host, port) the exporter listens on.
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", exporter.content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address
+
+    def close(self):
+        """Stop serving ``/metrics``."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
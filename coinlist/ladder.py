@@ -0,0 +1,356 @@
+"""Quote ladder reconciliation with the fewest cancel/modify/create operations."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from coinlist.models import is_error
+from coinlist.orders import OPEN_STATUSES
+from coinlist.transport import require_sync
+
+CANCEL = "cancel"
+MODIFY = "modify"
+CREATE = "create"
+
+_EPSILON = 1e-9
+
+
+def _float(value):
+    return 0.0 if value in (None, "") else float(value)
+
+
+def _level(level):
+    """``(side, price, size)`` from a tuple or a dict with those keys."""
+    if isinstance(level, dict):
+        side, price, size = level["side"], level["price"], level["size"]
+    else:
+        side, price, size = level
+    return side, float(price), float(size)
+
+
+def _remaining(order: dict):
+    return _float(order.get("size")) - _float(order.get("size_filled"))
+
+
+class LadderPlan:
+    """Operations taking the live orders of one symbol to a desired ladder.
+
+    Attributes:
+        symbol (str): Symbol of the ladder.
+        kept (list of dict): Live orders already matching a level.
+        cancels (list of dict): Live orders to cancel.
+        modifies (list of tuple): ``(order, (side, price, size))`` pairs.
+        creates (list of tuple): ``(side, price, size)`` levels to place.
+        naive (int): Operations of canceling every live order and placing
+            every level.
+    """
+
+    __slots__ = ("symbol", "kept", "cancels", "modifies", "creates", "naive")
+
+    def __init__(self, symbol, kept, cancels, modifies, creates, naive):
+        self.symbol = symbol
+        self.kept = kept
+        self.cancels = cancels
+        self.modifies = modifies
+        self.creates = creates
+        self.naive = naive
+
+    @property
+    def operations(self):
+        return len(self.cancels) + len(self.modifies) + len(self.creates)
+
+    @property
+    def saved(self):
+        return self.naive - self.operations
+
+    def __repr__(self):
+        return (
+            f"LadderPlan({self.symbol}, kept={len(self.kept)}, cancels={len(self.cancels)}, "
+            f"modifies={len(self.modifies)}, creates={len(self.creates)})"
+        )
+
+
+def plan_ladder(
+    symbol: str,
+    desired: list,
+    live: list,
+    price_tolerance: float = 0.0,
+    size_tolerance: float = 0.0,
+):
+    """Compute the fewest operations turning ``live`` into ``desired``.
+
+    Per side, live orders within the tolerances of a level are kept (the
+    closest price wins). The remaining levels and orders are paired from the
+    touch outwards and every pair becomes one modify; leftover orders are
+    canceled and leftover levels created. Keeping as many orders as possible
+    and modifying the rest is the minimum, ``max(levels, orders)`` operations
+    per side beyond the kept ones.
+
+    Sizes are resting sizes: a live order is compared by its unfilled size.
+
+    Args:
+        symbol (str): Symbol of the ladder.
+        desired (list): ``(side, price, size)`` tuples or dicts with those keys.
+        live (list of dict): Open orders of ``symbol``.
+        price_tolerance (float, optional): Price difference still kept. Defaults to 0.
+        size_tolerance (float, optional): Size difference still kept. Defaults to 0.
+
+    Returns:
+        LadderPlan: The operations, not yet sent.
+    """
+    levels = [_level(level) for level in desired]
+    kept, cancels, modifies, creates = [], [], [], []
+    for side in ("buy", "sell"):
+        side_levels = [level for level in levels if level[0] == side]
+        orders = [order for order in live if order.get("side") == side]
+        unmatched = []
+        for level in side_levels:
+            best, best_diff = None, None
+            for i, order in enumerate(orders):
+                diff = abs(_float(order.get("price")) - level[1])
+                if (
+                    diff <= price_tolerance + _EPSILON
+                    and abs(_remaining(order) - level[2]) <= size_tolerance + _EPSILON
+                    and (best is None or diff < best_diff)
+                ):
+                    best, best_diff = i, diff
+            if best is None:
+                unmatched.append(level)
+            else:
+                kept.append(orders.pop(best))
+        # From the touch outwards: highest bids and lowest asks first.
+        sign = -1 if side == "buy" else 1
+        unmatched.sort(key=lambda level: sign * level[1])
+        orders.sort(key=lambda order: sign * _float(order.get("price")))
+        paired = min(len(unmatched), len(orders))
+        modifies.extend(zip(orders[:paired], unmatched[:paired]))
+        cancels.extend(orders[paired:])
+        creates.extend(unmatched[paired:])
+    other = [order for order in live if order.get("side") not in ("buy", "sell")]
+    cancels.extend(other)
+    return LadderPlan(symbol, kept, cancels, modifies, creates, len(live) + len(levels))
+
+
+class ReconcileResult:
+    """Outcome of one reconcile cycle.
+
+    Attributes:
+        plan (LadderPlan): The operations that were sent.
+        errors (list of tuple): ``(operation, target, error)`` of failed operations;
+            the target is the order for cancels and modifies and the level for creates.
+        order_ids (list): IDs of the created orders, None where creation failed.
+        plan_time (float): Seconds spent fetching live orders and planning.
+        cancel_time (float): Seconds until every cancel was answered.
+        place_time (float): Seconds until every modify and create was answered.
+    """
+
+    __slots__ = ("plan", "errors", "order_ids", "plan_time", "cancel_time", "place_time")
+
+    def __init__(self, plan: LadderPlan):
+        self.plan = plan
+        self.errors = []
+        self.order_ids = []
+        self.plan_time = self.cancel_time = self.place_time = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    @property
+    def total_time(self):
+        return self.plan_time + self.cancel_time + self.place_time
+
+    def __repr__(self):
+        return (
+            f"ReconcileResult({self.plan!r}, errors={len(self.errors)}, "
+            f"total_time={self.total_time:.4f})"
+        )
+
+
+class LadderReconciler:
+    """Moves resting quotes to a desired ladder with the fewest requests.
+
+    Instead of canceling everything and placing the ladder again (two
+    requests per level, and every order loses its queue position), each
+    cycle keeps orders that already match a level, modifies as many of the
+    others as possible and only cancels or creates the rest (see
+    ``plan_ladder``). Cancels are sent first, concurrently, so that no
+    stale quote is live while new ones go out; modifies and creates then
+    go out concurrently.
+
+    Live orders come from ``tracker`` when given, with no request at all,
+    and operations then go through the tracker so it stays current;
+    otherwise the open orders are listed from the exchange every cycle.
+    With a ``SymbolRegistry`` on the client, levels are rounded to the tick
+    and lot size before comparing.
+
+    Usage:
+        reconciler = LadderReconciler(client, tracker)
+        result = reconciler.reconcile(
+            "BTC-USD", [("buy", 35990, 0.1), ("buy", 35980, 0.2), ("sell", 36010, 0.1)]
+        )
+        result.plan.saved, result.total_time
+
+    Args:
+        client (CoinlistApi): Client used to list and send orders.
+        tracker (OrderTracker, optional): Source of live orders.
+        max_workers (int, optional): Operations sent at the same time. Defaults to 8.
+        price_tolerance (float, optional): Price difference for which an order is
+            kept. Defaults to 0.
+        size_tolerance (float, optional): Size difference for which an order is
+            kept. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        client,
+        tracker=None,
+        max_workers: int = 8,
+        price_tolerance: float = 0.0,
+        size_tolerance: float = 0.0,
+    ):
+        require_sync(client, "LadderReconciler")
+        self.client = client
+        self.tracker = tracker
+        self.max_workers = max_workers
+        self.price_tolerance = price_tolerance
+        self.size_tolerance = size_tolerance
+        self.cycles = 0
+        self.operations = 0
+        self.saved = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def live_orders(self, symbol: str):
+        """Open orders of ``symbol``, from the tracker or the exchange."""
+        if self.tracker is not None:
+            return self.tracker.open_orders(symbol)
+        orders = []
+        for status in OPEN_STATUSES:
+            for order in self.client.iter_orders(symbol=symbol, status=status):
+                orders.append(order.to_dict() if hasattr(order, "to_dict") else dict(order))
+        return orders
+
+    def _normalize(self, symbol: str, desired: list):
+        levels = [_level(level) for level in desired]
+        if self.client.symbols is None:
+            return levels
+        rules = self.client._symbol_rules()
+        normalized = []
+        for side, price, size in levels:
+            price, size = rules.normalize(symbol, price, size, side)
+            normalized.append((side, float(price), float(size)))
+        return normalized
+
+    def plan(self, symbol: str, desired: list, live: list = None):
+        """The ``LadderPlan`` of a cycle, without sending anything."""
+        if live is None:
+            live = self.live_orders(symbol)
+        return plan_ladder(
+            symbol,
+            self._normalize(symbol, desired),
+            live,
+            self.price_tolerance,
+            self.size_tolerance,
+        )
+
+    def reconcile(self, symbol: str, desired: list, live: list = None):
+        """Move the quotes of ``symbol`` to ``desired``.
+
+        Args:
+            symbol (str): Symbol to quote.
+            desired (list): ``(side, price, size)`` levels (or dicts with those keys).
+            live (list of dict, optional): Open orders of ``symbol``. Defaults to
+                ``live_orders(symbol)``.
+
+        Returns:
+            ReconcileResult: The plan, failed operations and per-phase latency.
+        """
+        t0 = time.perf_counter()
+        plan = self.plan(symbol, desired, live)
+        result = ReconcileResult(plan)
+        t1 = time.perf_counter()
+        result.plan_time = t1 - t0
+        if plan.cancels:
+            self._run(result, [(CANCEL, order) for order in plan.cancels])
+        t2 = time.perf_counter()
+        result.cancel_time = t2 - t1
+        operations = [(MODIFY, pair) for pair in plan.modifies]
+        operations += [(CREATE, level) for level in plan.creates]
+        if operations:
+            result.order_ids = self._run(result, operations)[len(plan.modifies) :]
+        result.place_time = time.perf_counter() - t2
+        with self._lock:
+            self.cycles += 1
+            self.operations += plan.operations
+            self.saved += plan.saved
+            self.total_time += result.total_time
+            self.max_time = max(self.max_time, result.total_time)
+        return result
+
+    def _send(self, kind: str, symbol: str, target):
+        entry = self.tracker if self.tracker is not None else self.client
+        if kind == CANCEL:
+            return entry.cancel_order(target["order_id"])
+        if kind == MODIFY:
+            order, (side, price, size) = target
+            # Sizes are resting sizes; the exchange expects the total size.
+            size += _float(order.get("size_filled"))
+            return entry.modify_order(order["order_id"], price, size, symbol, side)
+        side, price, size = target
+        return entry.create_order(price, size, symbol, side)
+
+    def _run(self, result: ReconcileResult, operations: list):
+        """Send ``operations`` concurrently and record failures in ``result``."""
+        symbol = result.plan.symbol
+
+        def send(operation):
+            kind, target = operation
+            try:
+                response = self._send(kind, symbol, target)
+            except Exception as e:
+                return kind, target, None, e
+            failed = response is None if kind == CREATE else is_error(response)
+            return kind, target, response, response if failed else None
+
+        if len(operations) == 1:
+            outcomes = [send(operations[0])]
+        else:
+            outcomes = list(self._pool().map(send, operations))
+        for kind, target, response, error in outcomes:
+            if error is not None:
+                result.errors.append((kind, target, error))
+        return [response for _, _, response, _ in outcomes]
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="coinlist-ladder"
+                )
+            return self._executor
+
+    def stats(self):
+        """Cycles, operations sent and saved, and mean/max cycle latency."""
+        with self._lock:
+            return {
+                "cycles": self.cycles,
+                "operations": self.operations,
+                "saved": self.saved,
+                "mean_time": self.total_time / max(self.cycles, 1),
+                "max_time": self.max_time,
+            }
+
+    def close(self):
+        """Stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
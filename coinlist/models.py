@@ -0,0 +1,389 @@
+"""Compact typed views of API responses.
+
+Models are plain ``__slots__`` classes built from the response dicts. Large
+listings (orders, fills, ledger entries) are stored column by column in
+``array('d')`` and list columns; a model object is only created when a row
+is accessed. Numeric fields keep the type produced by the codec, except in
+float columns of the array containers.
+"""
+import re
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+# Low-cardinality string columns, interned so rows share one string object.
+CATEGORICAL_FIELDS = frozenset(
+    (
+        "symbol",
+        "side",
+        "type",
+        "status",
+        "asset",
+        "fee_currency",
+        "fee_type",
+        "transaction_type",
+        "stop_trigger",
+    )
+)
+
+
+class Model:
+    """Base of the response models; subclasses list their ``__slots__``."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        obj = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(obj, name, data.get(name))
+        return obj
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.to_dict() == self.to_dict()
+
+    def __repr__(self):
+        items = self.to_dict().items()
+        fields = ", ".join(f"{k}={v!r}" for k, v in items if v is not None)
+        return f"{type(self).__name__}({fields})"
+
+
+class Order(Model):
+    __slots__ = (
+        "order_id",
+        "client_id",
+        "symbol",
+        "type",
+        "side",
+        "size",
+        "price",
+        "stop_price",
+        "stop_trigger",
+        "size_filled",
+        "fill_fees",
+        "average_fill_price",
+        "status",
+        "post_only",
+        "created_at",
+        "updated_at",
+    )
+
+
+class Fill(Model):
+    __slots__ = (
+        "fill_id",
+        "order_id",
+        "symbol",
+        "side",
+        "auction_code",
+        "price",
+        "quantity",
+        "fee",
+        "fee_type",
+        "fee_currency",
+        "logical_time",
+    )
+
+
+class Quote(Model):
+    __slots__ = (
+        "symbol",
+        "bid",
+        "bid_size",
+        "ask",
+        "ask_size",
+        "last",
+        "last_size",
+        "auction_code",
+        "logical_time",
+    )
+
+
+class BookLevel(Model):
+    """One ``[price, size]`` level; unpacks like the list it came from."""
+
+    __slots__ = ("price", "size")
+
+    @classmethod
+    def from_level(cls, level):
+        obj = cls.__new__(cls)
+        obj.price, obj.size = level[0], level[1]
+        return obj
+
+    def __iter__(self):
+        yield self.price
+        yield self.size
+
+
+class Balance(Model):
+    __slots__ = ("asset", "balance", "hold")
+
+
+class Transfer(Model):
+    __slots__ = (
+        "transfer_id",
+        "created_at",
+        "confirmed_at",
+        "asset",
+        "amount",
+        "status",
+    )
+
+
+class Auction(Model):
+    __slots__ = (
+        "auction_code",
+        "symbol",
+        "logical_time",
+        "price",
+        "volume",
+        "imbalance",
+    )
+
+
+class LedgerEntry(Model):
+    __slots__ = (
+        "transaction_id",
+        "transaction_type",
+        "type",
+        "asset",
+        "amount",
+        "created_at",
+    )
+
+
+class ModelList(Sequence):
+    """List of response dicts exposing a model per row, built on access.
+
+    Args:
+        items (list of dict): Response rows.
+        model (type): Model class.
+    """
+
+    __slots__ = ("items", "model")
+
+    def __init__(self, items: list, model):
+        self.items = items
+        self.model = model
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ModelList(self.items[i], self.model)
+        return self.model.from_dict(self.items[i])
+
+    def __len__(self):
+        return len(self.items)
+
+    def to_dicts(self):
+        return list(self.items)
+
+
+class ColumnArray(Sequence):
+    """Struct-of-arrays container for large listings.
+
+    Float columns are ``array('d')``; other columns are lists. Rows are
+    turned into model objects only on access, and ``column(name)`` gives
+    direct access to a whole column.
+
+    Args:
+        items (iterable of dict, optional): Rows to load.
+    """
+
+    model = None
+    float_fields = ()
+
+    def __init__(self, items=()):
+        self._columns = {
+            name: array("d") if name in self.float_fields else []
+            for name in self.model.__slots__
+        }
+        self._len = 0
+        self.extend(items)
+
+    def extend(self, items):
+        """Append response rows."""
+        floats, interned, others = [], [], []
+        for name, col in self._columns.items():
+            if name in self.float_fields:
+                floats.append((name, col.append))
+            elif name in CATEGORICAL_FIELDS:
+                interned.append((name, col.append))
+            else:
+                others.append((name, col.append))
+        intern = sys.intern
+        n = 0
+        for item in items:
+            for name, append in floats:
+                value = item.get(name)
+                append(_NAN if value is None else float(value))
+            for name, append in interned:
+                value = item.get(name)
+                append(intern(value) if type(value) is str else value)
+            for name, append in others:
+                append(item.get(name))
+            n += 1
+        self._len += n
+
+    def column(self, name: str):
+        """A whole column: ``array('d')`` for float fields, list otherwise."""
+        return self._columns[name]
+
+    @property
+    def columns(self):
+        return dict(self._columns)
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        obj = self.model.__new__(self.model)
+        for name, col in self._columns.items():
+            setattr(obj, name, col[i])
+        return obj
+
+    def to_dicts(self):
+        names = list(self._columns)
+        return [dict(zip(names, row)) for row in zip(*self._columns.values())]
+
+
+class OrderArray(ColumnArray):
+    model = Order
+    float_fields = (
+        "size",
+        "price",
+        "stop_price",
+        "size_filled",
+        "fill_fees",
+        "average_fill_price",
+    )
+
+
+class FillArray(ColumnArray):
+    model = Fill
+    float_fields = ("price", "quantity", "fee")
+
+
+class LedgerArray(ColumnArray):
+    model = LedgerEntry
+    float_fields = ("amount",)
+
+
+_NAN = float("nan")
+
+
+def _items(response, key):
+    if isinstance(response, dict):
+        return response.get(key) or []
+    return response
+
+
+def _book(response):
+    book = dict(response)
+    for side in ("bids", "asks"):
+        levels = response.get(side) or []
+        book[side] = [BookLevel.from_level(level) for level in levels]
+    return book
+
+
+def _balances(response):
+    balances = response.get("asset_balances") or {}
+    holds = response.get("asset_holds") or {}
+    return [
+        Balance.from_dict(
+            {"asset": asset, "balance": balances.get(asset), "hold": holds.get(asset)}
+        )
+        for asset in sorted(set(balances) | set(holds))
+    ]
+
+
+def _quote(response):
+    return Quote.from_dict(response.get("quote", response))
+
+
+WRAPPERS = {
+    "order": lambda r: Order.from_dict(r.get("order", r)),
+    "orders": lambda r: OrderArray(_items(r, "orders")),
+    "fills": lambda r: FillArray(_items(r, "fills")),
+    "quote": _quote,
+    "book": _book,
+    "balances": _balances,
+    "transfers": lambda r: ModelList(_items(r, "transfers"), Transfer),
+    "auctions": lambda r: ModelList(_items(r, "auctions"), Auction),
+    "ledger": lambda r: LedgerArray(_items(r, "transactions")),
+}
+
+
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+def parse_time(value: str):
+    """Timezone-aware datetime of an ISO 8601 timestamp, UTC if it has no offset.
+
+    Fractions of a second of any length are accepted; before Python 3.11
+    ``fromisoformat`` only takes 3 or 6 digits.
+    """
+    text = _FRACTION.sub(
+        lambda m: "." + m.group(1)[:6].ljust(6, "0"), value.replace("Z", "+00:00"), 1
+    )
+    parsed = datetime.fromisoformat(text)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def get_field(item, name: str):
+    """Field ``name`` of a response dict or a model object, or None."""
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+def is_error(response):
+    """Whether a decoded response is an exchange error (``{"status": 4xx/5xx, ...}``)."""
+    if not isinstance(response, dict):
+        return False
+    status = response.get("status")
+    return isinstance(status, int) and status >= 400
+
+
+class ApiError(Exception):
+    """An exchange error response, raised where it cannot be returned.
+
+    Attributes:
+        status (int): HTTP status of the response.
+        message (str): Error message of the exchange.
+        response (dict): The decoded error response.
+    """
+
+    def __init__(self, response: dict):
+        self.response = response
+        self.status = response.get("status")
+        self.message = response.get("message")
+        super().__init__(f"{self.status}: {self.message}")
+
+
+def raise_for_error(response):
+    """Return ``response``, or raise ``ApiError`` if it is an error response."""
+    if is_error(response):
+        raise ApiError(response)
+    return response
+
+
+def wrap(kind: str, response):
+    """Typed view of a response; error responses are returned unchanged.
+
+    Args:
+        kind (str): One of WRAPPERS.
+        response (dict): Decoded response.
+    """
+    if is_error(response):
+        return response
+    return WRAPPERS[kind](response)
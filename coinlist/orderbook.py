@@ -0,0 +1,332 @@
+import threading
+from bisect import bisect_left, bisect_right
+
+from coinlist.transport import require_sync
+
+BUY = "buy"
+SELL = "sell"
+
+
+class SequenceGap(Exception):
+    """Raised when a delta does not follow the last applied sequence number."""
+
+
+class _Side:
+    """Price levels of one side kept as a sorted price list plus a size map.
+
+    Prices are kept ascending for both sides, so the best ask is the first
+    element and the best bid the last; both are O(1). Inserting a new level
+    is a bisect plus a list insert, which is a memmove and stays cheap even
+    for books several thousand levels deep.
+    """
+
+    __slots__ = ("prices", "sizes", "descending")
+
+    def __init__(self, descending: bool):
+        self.prices = []
+        self.sizes = {}
+        self.descending = descending
+
+    def clear(self):
+        self.prices = []
+        self.sizes = {}
+
+    def load(self, levels):
+        sizes = {}
+        for price, size, *_ in levels:
+            size = float(size)
+            if size > 0:
+                sizes[float(price)] = size
+        self.sizes = sizes
+        self.prices = sorted(sizes)
+
+    def set(self, price: float, size: float):
+        if size <= 0:
+            if self.sizes.pop(price, None) is not None:
+                i = bisect_left(self.prices, price)
+                del self.prices[i]
+        elif price in self.sizes:
+            self.sizes[price] = size
+        else:
+            self.sizes[price] = size
+            self.prices.insert(bisect_left(self.prices, price), price)
+
+    def best(self):
+        if not self.prices:
+            return None
+        return self.prices[-1] if self.descending else self.prices[0]
+
+    def top(self, n: int):
+        if self.descending:
+            prices = self.prices[: -n - 1 : -1] if n else self.prices[::-1]
+        else:
+            prices = self.prices[:n] if n else self.prices
+        sizes = self.sizes
+        return [(p, sizes[p]) for p in prices]
+
+    def __len__(self):
+        return len(self.prices)
+
+
+class LocalOrderBook:
+    """Incrementally maintained Level-2 order book for one symbol.
+
+    Seed it with a ``get_order_book`` snapshot, then feed it streaming
+    deltas. Every delta carrying a ``sequence`` must follow the previous one.
+    On a gap the book fetches a fresh snapshot through ``resync`` (outside
+    its lock) and buffers the deltas arriving meanwhile. The snapshot is
+    used only once it reaches the sequence just before the first buffered
+    delta; a staler one is fetched again, up to ``max_resyncs`` times, after
+    which ``SequenceGap`` is raised. The buffered deltas newer than the
+    snapshot are then replayed.
+
+    Args:
+        symbol (str): The symbol.
+        resync (callable, optional): Returns a fresh snapshot, e.g.
+            ``lambda: client.get_order_book(symbol)``. Without it a gap raises
+            ``SequenceGap``.
+        max_resyncs (int, optional): Snapshots fetched for one gap before
+            giving up. Defaults to 3.
+    """
+
+    def __init__(self, symbol: str, resync=None, max_resyncs: int = 3):
+        self.symbol = symbol
+        self.resync = resync
+        self.max_resyncs = max_resyncs
+        self.bids = _Side(descending=True)
+        self.asks = _Side(descending=False)
+        self.sequence = None
+        self.resyncs = 0
+        self.lock = threading.RLock()
+        self._pending = None
+
+    @classmethod
+    def from_client(cls, client, symbol: str):
+        """Create a book seeded from ``client.get_order_book(symbol)``."""
+        book = cls(symbol, resync=lambda: client.get_order_book(symbol))
+        book.load_snapshot(book.resync())
+        return book
+
+    @property
+    def resyncing(self):
+        return self._pending is not None
+
+    def load_snapshot(self, snapshot: dict):
+        """Replace the book with a full snapshot.
+
+        Args:
+            snapshot (dict): ``{"bids": [[price, size], ...], "asks": [...]}``
+                with an optional ``sequence``.
+        """
+        with self.lock:
+            self.bids.load(snapshot.get("bids") or [])
+            self.asks.load(snapshot.get("asks") or [])
+            self.sequence = _sequence(snapshot)
+
+    def apply(self, delta: dict):
+        """Apply a streaming delta.
+
+        Accepts ``bids``/``asks`` level lists and/or ``changes`` as
+        ``[side, price, size]`` rows; a size of 0 removes the level. During a
+        resync the delta is buffered and applied once the snapshot arrives.
+
+        Args:
+            delta (dict): Delta message.
+
+        Returns:
+            bool: False if the delta was stale and ignored.
+
+        Raises:
+            SequenceGap: On a gap without ``resync``, or when no snapshot
+                caught up with the gap within ``max_resyncs`` fetches.
+        """
+        with self.lock:
+            sequence = _sequence(delta)
+            if self._pending is not None:
+                self._pending.append(delta)
+                return True
+            if sequence is not None and self.sequence is not None:
+                if sequence <= self.sequence:
+                    return False
+                if sequence != self.sequence + 1:
+                    if self.resync is None:
+                        raise SequenceGap(
+                            f"{self.symbol}: expected sequence {self.sequence + 1}, "
+                            f"got {sequence}"
+                        )
+                    self._pending = [delta]
+            if self._pending is None:
+                self._update(delta, sequence)
+                return True
+        self._resync()
+        return True
+
+    def _update(self, delta: dict, sequence):
+        for price, size, *_ in delta.get("bids") or ():
+            self.bids.set(float(price), float(size))
+        for price, size, *_ in delta.get("asks") or ():
+            self.asks.set(float(price), float(size))
+        for side, price, size, *_ in delta.get("changes") or ():
+            book_side = self.bids if side == BUY else self.asks
+            book_side.set(float(price), float(size))
+        if sequence is not None:
+            self.sequence = sequence
+
+    def _resync(self):
+        """Fetch snapshots until one covers the buffered deltas, then replay them."""
+        try:
+            for _ in range(self.max_resyncs):
+                snapshot = self.resync()
+                with self.lock:
+                    self.resyncs += 1
+                    pending = self._pending
+                    first = _sequence(pending[0])
+                    latest = _sequence(snapshot)
+                    if latest is not None and latest < first - 1:
+                        # Older than the gap: the deltas in between are lost.
+                        continue
+                    self.load_snapshot(snapshot)
+                    if self.sequence is None:
+                        # The snapshot carries no sequence: continue from the gap.
+                        self.sequence = first - 1
+                    self._pending = None
+                    for i, delta in enumerate(pending):
+                        sequence = _sequence(delta)
+                        if sequence is not None:
+                            if sequence <= self.sequence:
+                                continue
+                            if sequence != self.sequence + 1:
+                                self._pending = pending[i:]
+                                break
+                        self._update(delta, sequence)
+                    if self._pending is None:
+                        return
+            raise SequenceGap(
+                f"{self.symbol}: no snapshot reached sequence "
+                f"{_sequence(self._pending[0]) - 1} after {self.max_resyncs} resyncs"
+            )
+        except BaseException:
+            with self.lock:
+                self._pending = None
+            raise
+
+    # QUERIES
+    @property
+    def best_bid(self):
+        return self.bids.best()
+
+    @property
+    def best_ask(self):
+        return self.asks.best()
+
+    @property
+    def spread(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    @property
+    def mid(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (ask + bid) / 2
+
+    def depth(self, n: int = 10, side: str = None):
+        """Top ``n`` levels, best first.
+
+        Args:
+            n (int, optional): Number of levels, 0 for all. Defaults to 10.
+            side (str, optional): "buy" or "sell". Defaults to both.
+
+        Returns:
+            Dict or List: ``{"bids": [(price, size)], "asks": [...]}`` or one side's list.
+        """
+        with self.lock:
+            if side == BUY:
+                return self.bids.top(n)
+            if side == SELL:
+                return self.asks.top(n)
+            return {"bids": self.bids.top(n), "asks": self.asks.top(n)}
+
+    def cumulative_size(self, side: str, n: int = None, price: float = None):
+        """Total size of the best levels of one side.
+
+        Args:
+            side (str): "buy" or "sell".
+            n (int, optional): Number of best levels to sum.
+            price (float, optional): Sum levels at or better than this price.
+
+        Returns:
+            float: Cumulative size.
+        """
+        with self.lock:
+            book_side = self.bids if side == BUY else self.asks
+            prices, sizes = book_side.prices, book_side.sizes
+            if price is not None:
+                if side == BUY:
+                    levels = prices[bisect_left(prices, price):]
+                else:
+                    levels = prices[: bisect_right(prices, price)]
+            elif not n:
+                levels = prices
+            else:
+                levels = prices[-n:] if side == BUY else prices[:n]
+            return sum(sizes[p] for p in levels)
+
+    def __len__(self):
+        return len(self.bids) + len(self.asks)
+
+
+class OrderBooks:
+    """Local books for many symbols, fed by a ``CoinlistStream``.
+
+    Usage:
+        books = OrderBooks(client)
+        stream = CoinlistStream(client, on_message=books.on_message)
+        stream.subscribe(BOOK, ["BTC-USD"])
+
+    Args:
+        client (CoinlistApi): Client used to fetch seed and resync snapshots.
+    """
+
+    def __init__(self, client):
+        require_sync(client, "OrderBooks")
+        self.client = client
+        self._books = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, symbol: str):
+        book = self._books.get(symbol)
+        if book is not None:
+            return book
+        # Seed outside the lock so one slow snapshot does not hold up every symbol.
+        book = LocalOrderBook(symbol, resync=lambda: self.client.get_order_book(symbol))
+        book.load_snapshot(book.resync())
+        with self._lock:
+            return self._books.setdefault(symbol, book)
+
+    def __contains__(self, symbol: str):
+        return symbol in self._books
+
+    def on_message(self, message: dict):
+        """Stream callback applying book messages to the matching book."""
+        symbol = message.get("symbol")
+        if symbol is None or message.get("channel", message.get("type")) not in (
+            "book",
+            "l2update",
+            "update",
+            "snapshot",
+        ):
+            return
+        book = self[symbol]
+        if message.get("type") == "snapshot":
+            book.load_snapshot(message)
+        else:
+            book.apply(message)
+
+
+def _sequence(message: dict):
+    sequence = message.get("sequence")
+    return None if sequence is None else int(sequence)
@@ -0,0 +1,364 @@
+"""Local order state kept current from the user stream."""
+import logging
+import threading
+
+from coinlist.streams import USER
+from coinlist.transport import require_sync
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ("pending", "accepted")
+CLOSED_STATUSES = frozenset(("done", "canceled", "rejected"))
+
+_SIZE_EPSILON = 1e-12
+
+
+def _as_dict(item):
+    return item.to_dict() if hasattr(item, "to_dict") else dict(item)
+
+
+def _empty_exposure():
+    return {"orders": 0, "buy": 0.0, "sell": 0.0, "buy_notional": 0.0, "sell_notional": 0.0}
+
+
+def _float(value):
+    return 0.0 if value in (None, "") else float(value)
+
+
+class OrderTracker:
+    """Orders placed through this tracker, kept current from the user stream.
+
+    Orders are placed, modified and canceled through the tracker so it knows
+    about them immediately; ``order`` and ``fill`` messages of the ``user``
+    channel then keep their state current without polling. After every
+    (re)connect ``reconcile`` pulls what was missed from ``get_list_orders``,
+    ``get_order`` and ``get_list_fills``.
+
+    Orders are indexed by order_id, client_id, symbol and status, and the
+    unfilled size and notional of open orders per symbol and side is updated
+    with every change rather than recomputed.
+
+    Usage:
+        tracker = OrderTracker(client)
+        stream = CoinlistStream(client)
+        tracker.attach(stream)
+        stream.start()
+        order_id = tracker.create_order(36000, "0.01", "BTC-USD", "buy")
+        tracker.exposure("BTC-USD")
+
+    Args:
+        client (CoinlistApi): Client used to place orders and reconcile.
+    """
+
+    def __init__(self, client):
+        require_sync(client, "OrderTracker")
+        self.client = client
+        self.reconciles = 0
+        self._orders = {}
+        self._client_ids = {}
+        self._by_symbol = {}
+        self._by_status = {}
+        self._fills = {}
+        self._filled = {}
+        self._fill_ids = set()
+        self._fill_cursor = None
+        self._exposure = {}
+        self._lock = threading.RLock()
+
+    def attach(self, stream):
+        """Feed the tracker from ``stream`` and reconcile after every connect."""
+        stream.add_callback(self.on_message)
+        stream.add_connect_callback(self.reconcile)
+        stream.subscribe(USER)
+
+    # ORDER ENTRY
+    def create_order(
+        self,
+        price: float,
+        size,
+        symbol: str,
+        side: str = "sell",
+        order_type: str = "limit",
+        client_id: str = None,
+    ):
+        """Place an order with ``client.create_order`` and track it.
+
+        Returns:
+            String: The order ID, or None if the order was not accepted.
+        """
+        client_id = client_id or self.client._uuid()
+        order_id = self.client.create_order(
+            price, size, symbol, side, order_type, client_id=client_id
+        )
+        if order_id is not None:
+            self.update(
+                {
+                    "order_id": order_id,
+                    "client_id": client_id,
+                    "symbol": symbol,
+                    "type": order_type,
+                    "side": side,
+                    "size": str(size),
+                    "price": None if price is None else str(price),
+                    "size_filled": "0",
+                    "status": "accepted",
+                },
+                known=False,
+            )
+        return order_id
+
+    def modify_order(
+        self,
+        order_id: str,
+        price: float,
+        size,
+        symbol: str,
+        side: str = "sell",
+        order_type: str = "limit",
+    ):
+        """Modify an order with ``client.modify_order`` and update its state.
+
+        Returns:
+            dict: The exchange response.
+        """
+        response = self.client.modify_order(order_id, price, size, symbol, side, order_type)
+        order = response.get("order") if isinstance(response, dict) else None
+        if order is not None:
+            self.update(order)
+        return response
+
+    def cancel_order(self, order_id: str):
+        """Cancel an order with ``client.cancel_order`` and mark it canceled.
+
+        Returns:
+            dict: The exchange response.
+        """
+        response = self.client.cancel_order(order_id)
+        if isinstance(response, dict) and response.get("order_id") == order_id:
+            self._set_status(order_id, "canceled")
+        return response
+
+    def cancel_orders(self, symbol: str):
+        """Cancel every order of ``symbol`` and mark the canceled ones.
+
+        Returns:
+            dict: The exchange response.
+        """
+        response = self.client.cancel_orders(symbol)
+        if isinstance(response, dict):
+            for order_id in response.get("order_ids") or ():
+                self._set_status(order_id, "canceled")
+        return response
+
+    def _set_status(self, order_id: str, status: str):
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is not None and order["status"] not in CLOSED_STATUSES:
+                self._store(dict(order, status=status))
+
+    # STATE
+    def update(self, order, known: bool = True):
+        """Apply an order snapshot (dict or ``models.Order``).
+
+        Snapshots older than the tracked state, by ``updated_at``, are
+        ignored, and a closed order never reopens.
+
+        Args:
+            order (dict): Order as returned by the exchange.
+            known (bool, optional): False for locally built snapshots, which only
+                add an order the tracker has not seen yet. Defaults to True.
+
+        Returns:
+            bool: Whether the tracked state changed.
+        """
+        order = _as_dict(order)
+        order_id = order.get("order_id")
+        if order_id is None:
+            return False
+        with self._lock:
+            current = self._orders.get(order_id)
+            if current is not None:
+                if not known:
+                    return False
+                closed = current["status"] in CLOSED_STATUSES
+                if closed and order.get("status") not in CLOSED_STATUSES:
+                    return False
+                previous, latest = current.get("updated_at"), order.get("updated_at")
+                if previous and latest and latest < previous:
+                    return False
+                order = dict(current, **order)
+            self._store(order)
+            return True
+
+    def _store(self, order: dict):
+        """Replace the tracked state of an order and its index entries."""
+        order_id = order["order_id"]
+        filled = self._filled.get(order_id, 0.0)
+        if filled > _float(order.get("size_filled")):
+            order["size_filled"] = "%.8g" % filled
+            if filled >= _float(order.get("size")) - _SIZE_EPSILON:
+                order["status"] = "done"
+        current = self._orders.get(order_id)
+        if current is not None:
+            self._unindex(current)
+        self._orders[order_id] = order
+        if order.get("client_id"):
+            self._client_ids[order["client_id"]] = order_id
+        self._by_symbol.setdefault(order.get("symbol"), {})[order_id] = order
+        self._by_status.setdefault(order.get("status"), {})[order_id] = order
+        self._add_exposure(order, 1)
+
+    def _unindex(self, order: dict):
+        order_id = order["order_id"]
+        for index, key in (
+            (self._by_symbol, order.get("symbol")),
+            (self._by_status, order.get("status")),
+        ):
+            orders = index.get(key)
+            if orders is not None:
+                orders.pop(order_id, None)
+                if not orders:
+                    del index[key]
+        self._add_exposure(order, -1)
+
+    def _add_exposure(self, order: dict, sign: int):
+        if order.get("status") in CLOSED_STATUSES:
+            return
+        remaining = _float(order.get("size")) - _float(order.get("size_filled"))
+        if remaining <= 0:
+            return
+        symbol = order.get("symbol")
+        exposure = self._exposure.get(symbol)
+        if exposure is None:
+            exposure = self._exposure[symbol] = _empty_exposure()
+        side = "buy" if order.get("side") == "buy" else "sell"
+        exposure["orders"] += sign
+        exposure[side] += sign * remaining
+        exposure[side + "_notional"] += sign * remaining * _float(order.get("price"))
+        if not exposure["orders"]:
+            # Drop the float residue of adding and removing the same sizes.
+            del self._exposure[symbol]
+
+    def apply_fill(self, fill):
+        """Apply a fill (dict or ``models.Fill``) to the order it belongs to.
+
+        Fills are deduplicated by ``fill_id``; fills of untracked orders are
+        ignored.
+
+        Returns:
+            bool: Whether the fill was new and applied.
+        """
+        fill = _as_dict(fill)
+        fill_id, order_id = fill.get("fill_id"), fill.get("order_id")
+        with self._lock:
+            if order_id not in self._orders or fill_id in self._fill_ids:
+                return False
+            if fill_id is not None:
+                self._fill_ids.add(fill_id)
+            self._fills.setdefault(order_id, []).append(fill)
+            # Running total, so an order update never re-sums its fills.
+            self._filled[order_id] = self._filled.get(order_id, 0.0) + _float(
+                fill.get("quantity")
+            )
+            logical_time = fill.get("logical_time")
+            if logical_time and (self._fill_cursor or "") < logical_time:
+                self._fill_cursor = logical_time
+            self._store(dict(self._orders[order_id]))
+            return True
+
+    def on_message(self, message: dict):
+        """Stream callback applying ``order`` and ``fill`` messages."""
+        kind = message.get("type")
+        if kind == "order" and message.get("order") is not None:
+            self.update(message["order"])
+        elif kind == "fill" and message.get("fill") is not None:
+            self.apply_fill(message["fill"])
+
+    def reconcile(self):
+        """Catch up with changes missed while the stream was disconnected.
+
+        Open orders are listed with ``iter_orders``; tracked orders that are
+        no longer listed as open are fetched with ``get_order``. Fills since
+        the last applied one (or since the oldest open order) are then pulled
+        with ``iter_fills``.
+        """
+        with self._lock:
+            tracked_open = {
+                order_id
+                for order_id, order in self._orders.items()
+                if order["status"] not in CLOSED_STATUSES
+            }
+            since = self._fill_cursor
+        listed = set()
+        for status in OPEN_STATUSES:
+            for order in self.client.iter_orders(status=status):
+                order = _as_dict(order)
+                listed.add(order["order_id"])
+                self.update(order)
+        for order_id in tracked_open - listed:
+            response = self.client.get_order(order_id)
+            order = response.get("order") if isinstance(response, dict) else response
+            if order is None:
+                logger.warning("Could not reconcile order %s: %s", order_id, response)
+                continue
+            self.update(order)
+        if since is None:
+            with self._lock:
+                created = [self._orders[i].get("created_at") for i in tracked_open]
+            created = [c for c in created if c]
+            since = min(created) if created else None
+        if since is not None:
+            for fill in self.client.iter_fills(start_time=since):
+                self.apply_fill(fill)
+        self.reconciles += 1
+
+    # QUERIES
+    def get(self, order_id: str):
+        """Tracked state of an order, or None."""
+        with self._lock:
+            order = self._orders.get(order_id)
+            return None if order is None else dict(order)
+
+    def by_client_id(self, client_id: str):
+        with self._lock:
+            order_id = self._client_ids.get(client_id)
+            return None if order_id is None else dict(self._orders[order_id])
+
+    def by_symbol(self, symbol: str):
+        with self._lock:
+            return [dict(o) for o in self._by_symbol.get(symbol, {}).values()]
+
+    def by_status(self, status: str):
+        with self._lock:
+            return [dict(o) for o in self._by_status.get(status, {}).values()]
+
+    def open_orders(self, symbol: str = None):
+        """Tracked orders that are not done, canceled or rejected."""
+        with self._lock:
+            if symbol is None:
+                orders = self._orders.values()
+            else:
+                orders = self._by_symbol.get(symbol, {}).values()
+            return [dict(o) for o in orders if o["status"] not in CLOSED_STATUSES]
+
+    def fills(self, order_id: str):
+        with self._lock:
+            return list(self._fills.get(order_id, ()))
+
+    def exposure(self, symbol: str):
+        """Unfilled size and notional of the open orders of ``symbol``.
+
+        Returns:
+            dict: ``orders``, ``buy``, ``sell``, ``net`` (buy - sell) and
+            ``buy_notional``/``sell_notional``.
+        """
+        with self._lock:
+            exposure = dict(self._exposure.get(symbol) or _empty_exposure())
+        exposure["net"] = exposure["buy"] - exposure["sell"]
+        return exposure
+
+    def __contains__(self, order_id: str):
+        return order_id in self._orders
+
+    def __len__(self):
+        return len(self._orders)
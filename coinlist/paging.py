@@ -0,0 +1,177 @@
+"""Time-window pagination shared by the sync and async list iterators.
+
+Coinlist list endpoints page by time: every request takes ``start_time``,
+``end_time``, ``descending`` and ``count`` (max 500). After a page the window
+is moved to the timestamp of its last item. Windows are inclusive, so the
+items sharing that boundary timestamp are remembered and skipped on the
+next page. A full page of items sharing one timestamp cannot be paged past
+that way; the page size is then raised to the maximum, and ``PageStuck`` is
+raised if even a maximum page holds nothing new. An error response raises
+``ApiError`` rather than ending the listing early.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from coinlist.models import get_field, raise_for_error
+
+MAX_PAGE_SIZE = 500
+
+# method name -> (items key, time field, id field)
+LIST_ENDPOINTS = {
+    "get_transfers": ("transfers", "created_at", "transfer_id"),
+    "get_auctions": ("auctions", "logical_time", "auction_code"),
+    "get_reports": ("reports", "created_at", "report_id"),
+    "get_list_fills": ("fills", "logical_time", "fill_id"),
+    "get_list_orders": ("orders", "created_at", "order_id"),
+    "get_account_history": ("transactions", "created_at", "transaction_id"),
+}
+
+
+class PageStuck(Exception):
+    """Raised when more items share one timestamp than a page can hold."""
+
+
+class PageCursor:
+    """Window state of one paginated listing.
+
+    Args:
+        items_key (str): Key of the item list in the response.
+        time_field (str): Item timestamp the endpoint filters on.
+        id_field (str): Unique item ID, used to skip boundary duplicates.
+        start_time (str, optional): Start date-time (inclusive).
+        end_time (str, optional): End date-time (inclusive).
+        descending (bool, optional): Newest first. Defaults to False.
+        count (int, optional): Page size. Defaults to MAX_PAGE_SIZE.
+    """
+
+    def __init__(
+        self,
+        items_key: str,
+        time_field: str,
+        id_field: str,
+        start_time: str = None,
+        end_time: str = None,
+        descending: bool = False,
+        count: int = MAX_PAGE_SIZE,
+    ):
+        self.items_key = items_key
+        self.time_field = time_field
+        self.id_field = id_field
+        self.start_time = start_time or None
+        self.end_time = end_time or None
+        self.descending = descending
+        self.count = count
+        self.done = False
+        self._boundary = None
+        self._boundary_ids = set()
+
+    def window(self):
+        """Keyword arguments for the next page request."""
+        return {
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "descending": self.descending,
+            "count": self.count,
+        }
+
+    def advance(self, response):
+        """Consume a page and move the window past it.
+
+        Args:
+            response (dict): Decoded page.
+
+        Returns:
+            List: New items of the page, boundary duplicates removed.
+
+        Raises:
+            ApiError: The page is an error response.
+        """
+        raise_for_error(response)
+        if isinstance(response, dict):
+            items = response.get(self.items_key) or []
+        else:
+            # A list or a typed container from ``coinlist.models``.
+            items = list(response)
+        new = [item for item in items if not self._seen(item)]
+        if len(items) < self.count:
+            self.done = True
+            return new
+        if not new:
+            # The window did not move: a full page all at the boundary
+            # timestamp. Only a larger page can reach past it.
+            if self.count < MAX_PAGE_SIZE:
+                self.count = MAX_PAGE_SIZE
+                return new
+            raise PageStuck(
+                f"More than {self.count} {self.items_key} share {self.time_field} "
+                f"{self._boundary}"
+            )
+        last = get_field(items[-1], self.time_field)
+        if last is None:
+            self.done = True
+            return new
+        if last != self._boundary:
+            self._boundary = last
+            self._boundary_ids = set()
+        self._boundary_ids.update(
+            get_field(item, self.id_field)
+            for item in items
+            if get_field(item, self.time_field) == last
+        )
+        if self.descending:
+            self.end_time = last
+        else:
+            self.start_time = last
+        return new
+
+    def _seen(self, item):
+        return (
+            self._boundary is not None
+            and get_field(item, self.time_field) == self._boundary
+            and get_field(item, self.id_field) in self._boundary_ids
+        )
+
+
+def iterate(fetch, cursor: PageCursor, prefetch: bool = True):
+    """Yield every item, fetching the next page while the current one is consumed.
+
+    At most two pages are held in memory: the one being yielded and the one
+    being prefetched.
+
+    Args:
+        fetch (callable): Called with ``cursor.window()`` keyword arguments.
+        cursor (PageCursor): Window state.
+        prefetch (bool, optional): Fetch the next page in a background thread. Defaults to True.
+
+    Yields:
+        dict: Items in endpoint order.
+    """
+    if not prefetch:
+        while not cursor.done:
+            yield from cursor.advance(fetch(**cursor.window()))
+        return
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="coinlist-prefetch") as pool:
+        future = pool.submit(fetch, **cursor.window())
+        while future is not None:
+            items = cursor.advance(future.result())
+            future = None if cursor.done else pool.submit(fetch, **cursor.window())
+            yield from items
+
+
+async def aiterate(fetch, cursor: PageCursor, prefetch: bool = True):
+    """Async version of ``iterate``; ``fetch`` returns an awaitable."""
+    if not prefetch:
+        while not cursor.done:
+            for item in cursor.advance(await fetch(**cursor.window())):
+                yield item
+        return
+    task = asyncio.ensure_future(fetch(**cursor.window()))
+    try:
+        while task is not None:
+            items = cursor.advance(await task)
+            task = None if cursor.done else asyncio.ensure_future(fetch(**cursor.window()))
+            for item in items:
+                yield item
+    finally:
+        if task is not None:
+            task.cancel()
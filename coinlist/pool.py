@@ -0,0 +1,249 @@
+"""Many accounts over one connection pool, with concurrent fan-out."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from coinlist.client import CoinlistApi
+from coinlist.models import is_error
+from coinlist.ratelimit import RequestScheduler
+from coinlist.transport import DEFAULT_TIMEOUT, HttpTransport
+
+
+class FanOutResult:
+    """Per-account results of a fan-out call.
+
+    Attributes:
+        results (dict): Account name to response, for accounts that succeeded.
+        errors (dict): Account name to the raised exception or the exchange
+            error response, for accounts that failed.
+    """
+
+    __slots__ = ("results", "errors")
+
+    def __init__(self, results: dict, errors: dict):
+        self.results = results
+        self.errors = errors
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def merged(self, key: str):
+        """Items of ``response[key]`` of every account, tagged with ``account``.
+
+        Args:
+            key (str): Items key, e.g. "orders" or "asset_balances".
+
+        Returns:
+            List of dict: Items in account order.
+        """
+        merged = []
+        for name, response in self.results.items():
+            items = response.get(key) if isinstance(response, dict) else response
+            if isinstance(items, dict):
+                items = [{"asset": asset, "amount": amount} for asset, amount in items.items()]
+            for item in items or ():
+                item = item.to_dict() if hasattr(item, "to_dict") else dict(item)
+                item["account"] = name
+                merged.append(item)
+        return merged
+
+    def __repr__(self):
+        return f"FanOutResult(results={sorted(self.results)}, errors={sorted(self.errors)})"
+
+
+class ClientPool:
+    """``CoinlistApi`` clients for many key pairs sharing one connection pool.
+
+    Every account gets its own ``RequestScheduler``, so each key spends its
+    own rate budget, while all of them reuse the keep-alive connections of a
+    single ``HttpTransport``. Fan-out calls run an endpoint for all or some
+    accounts on a thread pool; a failing account is reported in
+    ``FanOutResult.errors`` without affecting the others.
+
+    Usage:
+        with ClientPool({"main": (key, secret), "mm": (key2, secret2)}) as pool:
+            balances = pool.get_list_balances()
+            pool.cancel_orders("BTC-USD", accounts=["mm"])
+
+    Args:
+        accounts (dict or iterable, optional): ``{name: (access_key, access_secret)}``
+            or ``(access_key, access_secret)`` pairs named by their key.
+        max_workers (int, optional): Accounts served at the same time. Defaults to 8.
+        pool_maxsize (int, optional): Keep-alive connections to the exchange.
+            Defaults to ``max_workers``, and at least 10.
+        timeout (float or tuple, optional): ``(connect, read)`` timeout. Defaults to (3.05, 10).
+        limits (dict, optional): Per-account ``RequestScheduler`` limits.
+            Defaults to DEFAULT_LIMITS.
+        global_limit (tuple, optional): Per-account ``(rate per second, burst)``
+            shared by all endpoint classes.
+        **client_kwargs: Passed to every ``CoinlistApi``, e.g. ``models`` or ``retry``.
+    """
+
+    def __init__(
+        self,
+        accounts=None,
+        max_workers: int = 8,
+        pool_maxsize: int = None,
+        timeout=DEFAULT_TIMEOUT,
+        limits: dict = None,
+        global_limit: tuple = None,
+        **client_kwargs,
+    ):
+        self.max_workers = max_workers
+        self.limits = limits
+        self.global_limit = global_limit
+        self.client_kwargs = client_kwargs
+        self.transport = HttpTransport(
+            pool_maxsize=pool_maxsize or max(10, max_workers), timeout=timeout
+        )
+        self.endpoint_url = "https://trade-api.coinlist.co"
+        self._clients = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        if isinstance(accounts, dict):
+            accounts = accounts.items()
+        else:
+            accounts = [(pair[0], pair) for pair in accounts or ()]
+        for name, (access_key, access_secret) in accounts:
+            self.add(name, access_key, access_secret)
+
+    def add(self, name: str, access_key: str, access_secret: str):
+        """Add an account and return its client."""
+        client = CoinlistApi(
+            access_key,
+            access_secret,
+            transport=self.transport,
+            scheduler=RequestScheduler(self.limits, self.global_limit),
+            **self.client_kwargs,
+        )
+        client.endpoint_url = self.endpoint_url
+        with self._lock:
+            if name in self._clients:
+                raise ValueError(f"Account {name!r} is already in the pool")
+            self._clients[name] = client
+        return client
+
+    def remove(self, name: str):
+        """Remove an account and release its client."""
+        with self._lock:
+            client = self._clients.pop(name)
+        client.close()
+
+    def set_endpoint_url(self, url: str):
+        """Point every current and future client at ``url``."""
+        self.endpoint_url = url
+        for client in self._clients.values():
+            client.endpoint_url = url
+
+    @property
+    def names(self):
+        return list(self._clients)
+
+    def __getitem__(self, name: str):
+        return self._clients[name]
+
+    def __contains__(self, name: str):
+        return name in self._clients
+
+    def __iter__(self):
+        return iter(list(self._clients))
+
+    def __len__(self):
+        return len(self._clients)
+
+    def close(self):
+        """Stop the fan-out threads and close the shared connections."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            clients = list(self._clients.values())
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for client in clients:
+            client.close()
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # FAN-OUT
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="coinlist-pool"
+                )
+            return self._executor
+
+    def fan_out(self, call, *args, accounts: list = None, **kwargs):
+        """Run ``call`` for every selected account concurrently.
+
+        Args:
+            call (str or callable): Name of a ``CoinlistApi`` method, or a callable
+                taking the client as its first argument.
+            *args: Positional arguments of the call.
+            accounts (list, optional): Account names. Defaults to every account.
+            **kwargs: Keyword arguments of the call.
+
+        Returns:
+            FanOutResult: Responses and errors by account name, in account order.
+        """
+        names = self.names if accounts is None else list(accounts)
+        unknown = [name for name in names if name not in self._clients]
+        if unknown:
+            raise KeyError(f"Unknown accounts: {unknown}")
+
+        def run(name):
+            client = self._clients[name]
+            if isinstance(call, str):
+                return getattr(client, call)(*args, **kwargs)
+            return call(client, *args, **kwargs)
+
+        if len(names) == 1:
+            futures = None
+        else:
+            executor = self._pool()
+            futures = {name: executor.submit(run, name) for name in names}
+        results, errors = {}, {}
+        for name in names:
+            try:
+                response = run(name) if futures is None else futures[name].result()
+            except Exception as e:
+                errors[name] = e
+                continue
+            if is_error(response):
+                errors[name] = response
+            else:
+                results[name] = response
+        return FanOutResult(results, errors)
+
+    def get_list_balances(self, accounts: list = None):
+        """``get_list_balances`` of every selected account.
+
+        Returns:
+            FanOutResult: ``merged("asset_balances")`` lists balances by account.
+        """
+        return self.fan_out("get_list_balances", accounts=accounts)
+
+    def get_list_orders(self, accounts: list = None, **filters):
+        """``get_list_orders`` of every selected account.
+
+        Args:
+            accounts (list, optional): Account names. Defaults to every account.
+            **filters: ``symbol``, ``status``, ``start_time``, ``end_time``,
+                ``descending`` and ``count`` as for ``CoinlistApi.get_list_orders``.
+
+        Returns:
+            FanOutResult: ``merged("orders")`` lists the orders of all accounts.
+        """
+        return self.fan_out("get_list_orders", accounts=accounts, **filters)
+
+    def cancel_orders(self, symbol: str, accounts: list = None):
+        """Cancel every order of ``symbol`` in every selected account.
+
+        Returns:
+            FanOutResult: Cancel responses by account.
+        """
+        return self.fan_out("cancel_orders", symbol, accounts=accounts)
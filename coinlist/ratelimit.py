@@ -0,0 +1,295 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+from coinlist.transport import parse_retry_after
+
+ORDERS = "orders"
+MARKET = "market"
+ACCOUNT = "account"
+
+CANCEL = 0
+WRITE = 1
+READ = 2
+
+# (requests per second, burst) per endpoint class.
+# Assumed, not documented: the Coinlist API does not publish its rate limits.
+# These are conservative guesses that every client throttles to by default;
+# give the client a ``RequestScheduler(limits)`` or
+# ``RequestScheduler.unlimited()`` to use other values.
+DEFAULT_LIMITS = {
+    ORDERS: (25.0, 50),
+    MARKET: (50.0, 100),
+    ACCOUNT: (20.0, 40),
+}
+
+_ACCOUNT_PREFIXES = (
+    "/v1/accounts",
+    "/v1/balances",
+    "/v1/fills",
+    "/v1/fees",
+    "/v1/transfers",
+    "/v1/reports",
+    "/v1/keys",
+)
+
+
+def classify(method: str, path: str):
+    """Endpoint class and priority of a request.
+
+    Cancels (DELETE on ``/v1/orders``) get the highest priority, other order
+    writes come next and every read is last.
+
+    Args:
+        method (str): The HTTP method.
+        path (str): Request path.
+
+    Returns:
+        Tuple: (endpoint class, priority)
+    """
+    if path.startswith("/v1/orders"):
+        if method == "DELETE":
+            return ORDERS, CANCEL
+        return ORDERS, READ if method == "GET" else WRITE
+    if path.startswith(_ACCOUNT_PREFIXES):
+        return ACCOUNT, READ if method == "GET" else WRITE
+    return MARKET, READ if method == "GET" else WRITE
+
+
+class TokenBucket:
+    """Token bucket with an adaptive rate.
+
+    On throttling the rate is halved (down to ``min_rate``) and refills are
+    paused for the server's ``Retry-After``; every successful request then
+    adds back a small step until the configured rate is reached again.
+    Not thread-safe by itself; ``RequestScheduler`` guards it.
+
+    Args:
+        rate (float): Tokens per second.
+        burst (int): Bucket capacity.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.configured_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = max(self.configured_rate / 16, 0.1)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            start = max(self.updated, self.paused_until)
+            if now > start:
+                self.tokens = min(self.burst, self.tokens + (now - start) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float):
+        """Seconds until one token is available, 0 if available now."""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def throttled(self, now: float, retry_after: float = None):
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = min(self.tokens, 0.0)
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+
+    def succeeded(self):
+        if self.rate < self.configured_rate:
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate / 50)
+
+
+class RequestScheduler:
+    """Client-side rate limiter with priority lanes.
+
+    Every request waits for a token of its endpoint class bucket (and of the
+    optional global bucket). Among the requests that could go, the one with
+    the highest priority goes first, so cancels overtake queued reads.
+    Usable from threads (``acquire``) and from asyncio (``acquire_async``).
+
+    Args:
+        limits (dict, optional): ``{endpoint class: (rate per second, burst)}``.
+            Defaults to DEFAULT_LIMITS.
+        global_limit (tuple, optional): ``(rate per second, burst)`` shared by all classes.
+    """
+
+    def __init__(self, limits: dict = None, global_limit: tuple = None):
+        limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.buckets = {cls: TokenBucket(*limit) for cls, limit in limits.items()}
+        self.global_bucket = TokenBucket(*global_limit) if global_limit else None
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._done = set()
+        self._seq = itertools.count()
+        self._stats = {}
+        self._throttled = {}
+
+    @classmethod
+    def unlimited(cls):
+        """A scheduler that never delays, e.g. for local stub servers."""
+        inf = float("inf")
+        return cls({c: (inf, inf) for c in DEFAULT_LIMITS})
+
+    def _bucket(self, cls: str):
+        bucket = self.buckets.get(cls)
+        if bucket is None:
+            bucket = self.buckets[cls] = TokenBucket(*DEFAULT_LIMITS[MARKET])
+        return bucket
+
+    def _head(self, cls: str):
+        """Key of the highest-priority request waiting on ``cls``, or None."""
+        queue = self._queues.get(cls)
+        while queue and queue[0] in self._done:
+            self._done.discard(heapq.heappop(queue))
+        return queue[0] if queue else None
+
+    def _enqueue(self, cls: str, priority: int):
+        key = (priority, next(self._seq))
+        heapq.heappush(self._queues.setdefault(cls, []), key)
+        return key
+
+    def _dequeue(self, key):
+        self._done.add(key)
+
+    def _try_acquire(self, cls: str, key):
+        """Take a token for ``key`` if it may go now; otherwise return the wait."""
+        now = time.monotonic()
+        bucket = self._bucket(cls)
+        wait = bucket.wait_time(now)
+        if self.global_bucket is not None:
+            wait = max(wait, self.global_bucket.wait_time(now))
+        if wait > 0:
+            return wait
+        # A higher-priority request competing for the same tokens goes first.
+        others = self._queues if self.global_bucket is not None else (cls,)
+        for other in others:
+            head = self._head(other)
+            if head is not None and head < key:
+                if other == cls or self._bucket(other).wait_time(now) == 0:
+                    return max(0.001, 1 / bucket.rate)
+        bucket.take()
+        if self.global_bucket is not None:
+            self.global_bucket.take()
+        return 0.0
+
+    def acquire(self, method: str, path: str):
+        """Block until the request may be sent.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): Request path.
+
+        Returns:
+            String: The endpoint class, to pass to ``record``.
+        """
+        cls, priority = classify(method, path)
+        start = time.monotonic()
+        with self._cond:
+            key = self._enqueue(cls, priority)
+            try:
+                while True:
+                    wait = self._try_acquire(cls, key)
+                    if wait == 0:
+                        break
+                    self._cond.wait(wait)
+            finally:
+                self._dequeue(key)
+                self._cond.notify_all()
+            self._observe(cls, priority, time.monotonic() - start)
+        return cls
+
+    async def acquire_async(self, method: str, path: str):
+        """Coroutine version of ``acquire``."""
+        cls, priority = classify(method, path)
+        start = time.monotonic()
+        with self._cond:
+            key = self._enqueue(cls, priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_acquire(cls, key)
+                if wait == 0:
+                    break
+                await asyncio.sleep(wait)
+        finally:
+            with self._cond:
+                self._dequeue(key)
+                self._cond.notify_all()
+        with self._cond:
+            self._observe(cls, priority, time.monotonic() - start)
+        return cls
+
+    def record(self, cls: str, status: int, headers=None):
+        """Feed a response back so the bucket adapts to server throttling.
+
+        Args:
+            cls (str): Endpoint class returned by ``acquire``.
+            status (int): HTTP status code.
+            headers (Mapping, optional): Response headers, for ``Retry-After``.
+        """
+        with self._cond:
+            bucket = self._bucket(cls)
+            if status == 429 or status == 503:
+                retry_after = parse_retry_after(headers)
+                now = time.monotonic()
+                bucket.throttled(now, retry_after)
+                if self.global_bucket is not None:
+                    self.global_bucket.throttled(now, retry_after)
+                self._throttled[cls] = self._throttled.get(cls, 0) + 1
+            elif status < 400:
+                bucket.succeeded()
+                if self.global_bucket is not None:
+                    self.global_bucket.succeeded()
+
+    def _stats_for(self, cls, priority):
+        stats = self._stats.get((cls, priority))
+        if stats is None:
+            stats = self._stats[(cls, priority)] = {
+                "requests": 0,
+                "wait_total": 0.0,
+                "wait_max": 0.0,
+            }
+        return stats
+
+    def _observe(self, cls, priority, waited):
+        stats = self._stats_for(cls, priority)
+        stats["requests"] += 1
+        stats["wait_total"] += waited
+        if waited > stats["wait_max"]:
+            stats["wait_max"] = waited
+
+    def metrics(self):
+        """Queue depth, wait times and current rates.
+
+        Returns:
+            dict: ``queue_depth`` and ``wait`` keyed by (class, priority),
+            ``rates`` and ``throttled`` keyed by class.
+        """
+        with self._cond:
+            depth = {}
+            for cls, queue in self._queues.items():
+                for priority, _ in (k for k in queue if k not in self._done):
+                    depth[(cls, priority)] = depth.get((cls, priority), 0) + 1
+            wait = {}
+            for key, stats in self._stats.items():
+                stats = dict(stats)
+                stats["wait_mean"] = stats["wait_total"] / max(stats["requests"], 1)
+                wait[key] = stats
+            return {
+                "queue_depth": depth,
+                "wait": wait,
+                "rates": {cls: b.rate for cls, b in self.buckets.items()},
+                "throttled": dict(self._throttled),
+            }
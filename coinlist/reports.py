@@ -0,0 +1,271 @@
+"""CSV report pipeline: request, wait, stream and parse into columnar batches."""
+import codecs
+import csv
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+from coinlist.codec import NUMERIC_FIELDS
+from coinlist.models import CATEGORICAL_FIELDS
+from coinlist.transport import require_sync
+
+READY_STATUSES = frozenset(("complete", "completed", "ready", "done"))
+FAILED_STATUSES = frozenset(("failed", "error", "expired"))
+
+_NAN = float("nan")
+
+
+class ReportError(Exception):
+    """Raised when a report request is rejected or the report fails."""
+
+
+class ReportBatch:
+    """Up to ``batch_size`` report rows as columns.
+
+    Numeric columns (``codec.NUMERIC_FIELDS``) are ``array('d')`` with NaN
+    for empty cells; other columns are lists of strings, categorical ones
+    interned.
+    """
+
+    __slots__ = ("fields", "columns", "_len")
+
+    def __init__(self, fields: list, columns: dict, length: int):
+        self.fields = fields
+        self.columns = columns
+        self._len = length
+
+    def column(self, name: str):
+        return self.columns[name]
+
+    def __len__(self):
+        return self._len
+
+    def to_dicts(self):
+        return [dict(zip(self.fields, row)) for row in zip(*self.columns.values())]
+
+    def __repr__(self):
+        return f"ReportBatch({self._len} rows, fields={self.fields})"
+
+
+def iter_lines(chunks, encoding: str = "utf-8"):
+    """Decode byte chunks into lines, line endings kept, as ``csv.reader`` wants."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in chunks:
+        text = pending + decoder.decode(chunk)
+        lines = text.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def parse_csv(lines, batch_size: int = 50_000, numeric_fields=NUMERIC_FIELDS):
+    """Parse CSV lines (header first) into ``ReportBatch`` objects.
+
+    Only one batch is held at a time, so files of any size stream through
+    in constant memory.
+
+    Args:
+        lines (iterable of str): CSV lines, e.g. from ``iter_lines``.
+        batch_size (int, optional): Rows per batch. Defaults to 50000.
+        numeric_fields (iterable, optional): Columns parsed as floats.
+
+    Yields:
+        ReportBatch: Batches of at most ``batch_size`` rows.
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be positive")
+    reader = csv.reader(lines)
+    fields = next(reader, None)
+    if not fields:
+        return
+    numeric = [name in numeric_fields for name in fields]
+    interned = [name in CATEGORICAL_FIELDS for name in fields]
+    intern = sys.intern
+
+    def empty():
+        return [array("d") if is_numeric else [] for is_numeric in numeric]
+
+    columns, n = empty(), 0
+    appends = [column.append for column in columns]
+    width = len(fields)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [""] * (width - len(row))
+        for i in range(width):
+            value = row[i]
+            if numeric[i]:
+                try:
+                    appends[i](float(value) if value else _NAN)
+                except ValueError:
+                    appends[i](_NAN)
+            else:
+                appends[i](intern(value) if interned[i] else value)
+        n += 1
+        if n == batch_size:
+            yield ReportBatch(fields, dict(zip(fields, columns)), n)
+            columns, n = empty(), 0
+            appends = [column.append for column in columns]
+    if n:
+        yield ReportBatch(fields, dict(zip(fields, columns)), n)
+
+
+def read_spill(path: str, batch_size: int = 50_000):
+    """Batches of a report spilled by ``ReportDownloader`` (gzip CSV)."""
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        yield from parse_csv(f, batch_size)
+
+
+class ReportDownloader:
+    """Requests CSV reports and streams them as columnar batches.
+
+    ``batches`` requests a report (``client.get_fills``), polls
+    ``get_reports`` with exponential backoff until it is ready, then
+    downloads the CSV in ``chunk_size`` pieces and parses it incrementally,
+    so neither the file nor the parsed rows are ever fully in memory. With
+    ``spill_path`` the raw CSV is also written to a gzip file that
+    ``read_spill`` re-reads without downloading again.
+
+    Usage:
+        downloader = ReportDownloader(client)
+        for batch in downloader.batches("fills", start_time="2021-01-01"):
+            prices = batch.column("price")
+
+    Args:
+        client (CoinlistApi): Client used to request, poll and download.
+        batch_size (int, optional): Rows per batch. Defaults to 50000.
+        poll_interval (float, optional): First delay between polls in seconds. Defaults to 0.5.
+        max_poll_interval (float, optional): Upper bound of the poll delay. Defaults to 15.
+        timeout (float, optional): Seconds to wait for a report. Defaults to 900.
+        chunk_size (int, optional): Bytes read from the download at a time. Defaults to 64 KiB.
+    """
+
+    def __init__(
+        self,
+        client,
+        batch_size: int = 50_000,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 15.0,
+        timeout: float = 900.0,
+        chunk_size: int = 1 << 16,
+    ):
+        require_sync(client, "ReportDownloader")
+        self.client = client
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.polls = 0
+
+    def request(self, report_type: str = "fills", start_time: str = None, end_time: str = None):
+        """Request a report and return its ID."""
+        response = self.client.get_fills(report_type, start_time, end_time)
+        report_id = response.get("report_id") if isinstance(response, dict) else None
+        if report_id is None:
+            raise ReportError(f"Report request rejected: {response}")
+        return report_id
+
+    def _find(self, report_id: str):
+        response = self.client.get_reports(descending=True)
+        for report in (response or {}).get("reports") or ():
+            if report.get("report_id") == report_id:
+                return report
+        return None
+
+    def wait(self, report_id: str):
+        """Poll ``get_reports`` until the report is ready.
+
+        Returns:
+            dict: The report, with its download ``url``.
+
+        Raises:
+            ReportError: The report failed.
+            TimeoutError: It was not ready within ``timeout``.
+        """
+        deadline = time.monotonic() + self.timeout
+        delay = self.poll_interval
+        while True:
+            self.polls += 1
+            report = self._find(report_id)
+            status = (report or {}).get("status")
+            if status in READY_STATUSES and report.get("url"):
+                return report
+            if status in FAILED_STATUSES:
+                raise ReportError(f"Report {report_id} {status}")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Report {report_id} not ready after {self.timeout}s")
+            time.sleep(min(remaining, random.uniform(delay / 2, delay)))
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def _chunks(self, url: str):
+        r = self.client.transport.request("GET", url, stream=True)
+        try:
+            r.raise_for_status()
+            yield from r.iter_content(self.chunk_size)
+        finally:
+            r.close()
+
+    def stream(self, report: dict, spill_path: str = None):
+        """Download a ready report and yield its batches.
+
+        Args:
+            report (dict): Report returned by ``wait``.
+            spill_path (str, optional): Also keep the CSV here, gzip-compressed.
+                Written to a temporary file and moved into place once complete.
+
+        Yields:
+            ReportBatch: Batches of at most ``batch_size`` rows.
+        """
+        chunks = self._chunks(report["url"])
+        if spill_path is None:
+            yield from parse_csv(iter_lines(chunks), self.batch_size)
+            return
+        directory = os.path.dirname(os.path.abspath(spill_path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".csv.gz.part")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+                fileobj=raw, mode="wb", compresslevel=1
+            ) as spill:
+
+                def tee():
+                    for chunk in chunks:
+                        spill.write(chunk)
+                        yield chunk
+
+                yield from parse_csv(iter_lines(tee()), self.batch_size)
+            os.replace(tmp, spill_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def batches(
+        self,
+        report_type: str = "fills",
+        start_time: str = None,
+        end_time: str = None,
+        spill_path: str = None,
+    ):
+        """Request a report, wait for it and yield its batches.
+
+        Args:
+            report_type (str, optional): "fills" or "account". Defaults to 'fills'.
+            start_time (str, optional): Start date-time of the report (inclusive).
+            end_time (str, optional): End date-time of the report (inclusive).
+            spill_path (str, optional): Also keep the CSV here, gzip-compressed.
+
+        Yields:
+            ReportBatch: Batches of at most ``batch_size`` rows.
+        """
+        report = self.wait(self.request(report_type, start_time, end_time))
+        yield from self.stream(report, spill_path)
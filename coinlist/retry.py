@@ -0,0 +1,205 @@
+"""Retry and hedging policies shared by the sync and async clients."""
+import random
+import threading
+from collections import deque
+
+from coinlist.instrumentation import endpoint_template
+from coinlist.transport import parse_retry_after
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+IDEMPOTENT_METHODS = frozenset(("GET", "DELETE", "PATCH"))
+# POSTs that are safe to repeat because every order carries a client_id.
+_ORDER_POSTS = ("/v1/orders", "/v1/orders/bulk")
+
+# Latency-sensitive reads hedged by default.
+HEDGED_ENDPOINTS = frozenset(
+    (
+        "/v1/symbols/{symbol}/quote",
+        "/v1/symbols/{symbol}/book",
+        "/v1/orders/{order_id}",
+    )
+)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for idempotent requests.
+
+    Only requests that can safely run twice are retried: GET, DELETE and
+    PATCH, and order POSTs where every order has a ``client_id`` (the
+    exchange rejects a second order with the same ``client_id``, so a retry
+    after an ambiguous failure cannot create a duplicate; the client then
+    looks the first order up by ``client_id`` and returns it). Retries happen on
+    connection errors, timeouts and RETRY_STATUSES; a ``Retry-After`` header
+    is used as the minimum delay.
+
+    Args:
+        max_attempts (int, optional): Attempts including the first. Defaults to 3.
+        backoff (float, optional): Base delay in seconds. Defaults to 0.1.
+        max_backoff (float, optional): Upper bound of a delay in seconds. Defaults to 2.
+        statuses (iterable, optional): Statuses to retry. Defaults to RETRY_STATUSES.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        statuses=RETRY_STATUSES,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self._random = random.Random()
+
+    def allows(self, method: str, path: str, data=None):
+        """Whether a request may be retried."""
+        if self.max_attempts <= 1:
+            return False
+        if method in IDEMPOTENT_METHODS:
+            return True
+        if method == "POST" and path in _ORDER_POSTS:
+            orders = data if isinstance(data, list) else [data]
+            return all(isinstance(o, dict) and o.get("client_id") for o in orders)
+        return False
+
+    def delay(self, attempt: int, headers=None):
+        """Seconds to wait after failed attempt number ``attempt`` (0-based)."""
+        delay = self._random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        retry_after = parse_retry_after(headers)
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+
+def is_order_post(method: str, path: str):
+    return method == "POST" and path in _ORDER_POSTS
+
+
+def is_duplicate(response):
+    """Whether an order (or one bulk result) was rejected for reusing its ``client_id``.
+
+    The exchange's wording is not documented; any error message mentioning
+    a duplicate is taken as one.
+    """
+    if not isinstance(response, dict):
+        return False
+    message = response.get("message")
+    return isinstance(message, str) and "duplicate" in message.lower()
+
+
+def duplicate_orders(data, response):
+    """Order specs of ``data`` that ``response`` rejected as duplicates.
+
+    After a retry, a duplicate means the first attempt was placed and only
+    its response was lost.
+
+    Args:
+        data (dict or list): Body of the order POST (one order or a bulk list).
+        response: Decoded response of the retry.
+
+    Returns:
+        List of dict: The rejected specs.
+    """
+    if isinstance(data, dict):
+        return [data] if is_duplicate(response) else []
+    results = response.get("orders") if isinstance(response, dict) else None
+    if not isinstance(results, list):
+        return []
+    by_client_id = {spec.get("client_id"): spec for spec in data}
+    return [
+        by_client_id[result["client_id"]]
+        for result in results
+        if is_duplicate(result) and result.get("client_id") in by_client_id
+    ]
+
+
+def restore_orders(data, response, found: dict):
+    """``response`` with duplicate rejections replaced by the orders placed first.
+
+    Args:
+        data (dict or list): Body of the order POST.
+        response: Decoded response of the retry.
+        found (dict): ``{client_id: order or None}`` of the orders looked up;
+            rejections whose order was not found are kept.
+    """
+    if isinstance(data, dict):
+        order = found.get(data.get("client_id"))
+        return response if order is None else {"order": order}
+    results = []
+    for result in response["orders"]:
+        if is_duplicate(result):
+            result = found.get(result.get("client_id")) or result
+        results.append(result)
+    return dict(response, orders=results)
+
+
+class HedgePolicy:
+    """When to send a second copy of a slow read.
+
+    The hedge fires once the first attempt has been outstanding longer than
+    the ``quantile`` of recent latencies of the same endpoint, so about
+    ``1 - quantile`` of requests are duplicated. Until ``min_samples``
+    latencies are known, ``initial_delay`` is used.
+
+    Args:
+        endpoints (iterable, optional): Endpoint templates to hedge. Defaults to HEDGED_ENDPOINTS.
+        quantile (float, optional): Latency quantile used as the delay. Defaults to 0.95.
+        initial_delay (float, optional): Delay in seconds before enough samples. Defaults to 0.05.
+        min_delay (float, optional): Lower bound of the delay. Defaults to 0.002.
+        max_delay (float, optional): Upper bound of the delay. Defaults to 1.
+        window (int, optional): Latencies kept per endpoint. Defaults to 200.
+        min_samples (int, optional): Samples needed before using the quantile. Defaults to 20.
+    """
+
+    def __init__(
+        self,
+        endpoints=HEDGED_ENDPOINTS,
+        quantile: float = 0.95,
+        initial_delay: float = 0.05,
+        min_delay: float = 0.002,
+        max_delay: float = 1.0,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        self.endpoints = frozenset(endpoints)
+        self.quantile = quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedged = 0
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def applies(self, method: str, path: str):
+        return method == "GET" and endpoint_template(path) in self.endpoints
+
+    def observe(self, path: str, seconds: float):
+        """Record the latency of one attempt."""
+        endpoint = endpoint_template(path)
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def fired(self):
+        """Count a hedge that was sent."""
+        with self._lock:
+            self.hedged += 1
+
+    def delay(self, path: str):
+        """Seconds to wait for the first attempt before hedging."""
+        with self._lock:
+            self.requests += 1
+            samples = self._samples.get(endpoint_template(path))
+            if not samples or len(samples) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(samples)
+        value = ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+        return min(self.max_delay, max(self.min_delay, value))
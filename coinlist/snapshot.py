@@ -0,0 +1,197 @@
+"""Columnar market snapshots for many symbols, shared by the sync and async clients."""
+import time
+from array import array
+
+from coinlist.models import get_field, is_error
+
+SUMMARY = "summary"
+QUOTE = "quote"
+BOOK = "book"
+KINDS = (SUMMARY, QUOTE, BOOK)
+
+# Column name to field of a ``/v1/symbols/summary`` entry.
+SUMMARY_FIELDS = {
+    "bid": "highest_bid",
+    "ask": "lowest_ask",
+    "last": "last_price",
+    "volume": "volume_base_24h",
+    "quote_volume": "volume_quote_24h",
+    "change_24h": "price_change_percent_24h",
+    "high_24h": "highest_price_24h",
+    "low_24h": "lowest_price_24h",
+}
+QUOTE_FIELDS = {
+    "bid": "bid",
+    "ask": "ask",
+    "last": "last",
+    "bid_size": "bid_size",
+    "ask_size": "ask_size",
+    "last_size": "last_size",
+}
+BOOK_COLUMNS = ("bid", "ask", "bid_depth", "ask_depth")
+
+_NAN = float("nan")
+
+
+def check_kinds(kinds):
+    """Validate requested data kinds and return them as a set."""
+    kinds = {kinds} if isinstance(kinds, str) else set(kinds)
+    unknown = kinds - set(KINDS)
+    if unknown:
+        raise ValueError(f"Unknown snapshot kinds {sorted(unknown)}; use {KINDS}")
+    return kinds
+
+
+def _float(value):
+    try:
+        return _NAN if value is None or value == "" else float(value)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _error(response):
+    """The error carried by an exchange error response, or None."""
+    return response if is_error(response) else None
+
+
+def _level(level):
+    if isinstance(level, (list, tuple)):
+        return _float(level[0]), _float(level[1])
+    return _float(get_field(level, "price")), _float(get_field(level, "size"))
+
+
+class MarketSnapshot:
+    """Market data of many symbols as columns aligned by symbol.
+
+    Every column is an ``array('d')`` with one value per symbol in
+    ``symbols`` order (NaN where a value is missing), so it can be handed to
+    ``numpy.frombuffer`` or ``numpy.asarray`` without copying row by row.
+
+    Columns depend on the requested kinds: ``summary`` gives bid, ask, last,
+    volume, quote_volume, change_24h, high_24h and low_24h; ``quote`` gives
+    bid, ask, last (replacing the summary values, being fresher), bid_size,
+    ask_size and last_size; ``book`` gives bid_depth and ask_depth (the size
+    of the top ``depth`` levels), bid and ask when no other kind supplies
+    them, and keeps the levels in ``books``.
+
+    Args:
+        symbols (list): Symbols, in column order.
+    """
+
+    def __init__(self, symbols: list):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        if len(self.index) != len(self.symbols):
+            raise ValueError("Duplicate symbols in snapshot")
+        self.columns = {}
+        self.books = {}
+        self.errors = {}
+        self.taken_at = time.time()
+
+    def _column(self, name: str):
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = array("d", [_NAN]) * len(self.symbols)
+        return column
+
+    def _fail(self, symbol: str, kind: str, error):
+        self.errors.setdefault(symbol, {})[kind] = error
+
+    def add_summary(self, response):
+        """Fill summary columns from a ``/v1/symbols/summary`` response."""
+        if _error(response):
+            for symbol in self.symbols:
+                self._fail(symbol, SUMMARY, response)
+            return
+        if isinstance(response, list):
+            response = {get_field(item, "symbol"): item for item in response}
+        for name, field in SUMMARY_FIELDS.items():
+            column = self._column(name)
+            for symbol, i in self.index.items():
+                entry = response.get(symbol)
+                if entry is not None:
+                    column[i] = _float(get_field(entry, field))
+        for symbol in self.symbols:
+            if symbol not in response:
+                self._fail(symbol, SUMMARY, "Missing from summary")
+
+    def add_quote(self, symbol: str, response):
+        """Fill quote columns of ``symbol`` from a ``get_quote`` response."""
+        if _error(response):
+            self._fail(symbol, QUOTE, response)
+            return
+        quote = response.get("quote", response) if isinstance(response, dict) else response
+        i = self.index[symbol]
+        for name, field in QUOTE_FIELDS.items():
+            self._column(name)[i] = _float(get_field(quote, field))
+
+    def add_book(self, symbol: str, response, depth: int = 10):
+        """Fill book columns of ``symbol`` from a ``get_order_book`` response."""
+        if _error(response):
+            self._fail(symbol, BOOK, response)
+            return
+        i = self.index[symbol]
+        bids = [_level(level) for level in get_field(response, "bids") or ()]
+        asks = [_level(level) for level in get_field(response, "asks") or ()]
+        bids.sort(reverse=True)
+        asks.sort()
+        self.books[symbol] = {"bids": bids[:depth], "asks": asks[:depth]}
+        self._column("bid_depth")[i] = sum(size for _, size in bids[:depth])
+        self._column("ask_depth")[i] = sum(size for _, size in asks[:depth])
+        for name, levels in (("bid", bids), ("ask", asks)):
+            column = self._column(name)
+            if levels and column[i] != column[i]:
+                column[i] = levels[0][0]
+
+    def add(self, kind: str, symbol: str, response, depth: int = 10):
+        """Apply one fetched response; ``symbol`` is ignored for summaries."""
+        if kind == SUMMARY:
+            self.add_summary(response)
+        elif kind == QUOTE:
+            self.add_quote(symbol, response)
+        else:
+            self.add_book(symbol, response, depth)
+
+    def fail(self, kind: str, symbol: str, error):
+        """Record a failed request; a failed summary fails every symbol."""
+        for name in self.symbols if kind == SUMMARY else [symbol]:
+            self._fail(name, kind, error)
+
+    def column(self, name: str):
+        """A whole column as ``array('d')`` aligned with ``symbols``."""
+        return self.columns[name]
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def row(self, symbol: str):
+        """Values of one symbol as a dict."""
+        i = self.index[symbol]
+        return {name: column[i] for name, column in self.columns.items()}
+
+    @property
+    def mid(self):
+        """``(bid + ask) / 2`` per symbol."""
+        bid, ask = self.columns["bid"], self.columns["ask"]
+        return array("d", ((b + a) / 2 for b, a in zip(bid, ask)))
+
+    @property
+    def spread(self):
+        """``ask - bid`` per symbol."""
+        bid, ask = self.columns["bid"], self.columns["ask"]
+        return array("d", (a - b for b, a in zip(bid, ask)))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __repr__(self):
+        return f"MarketSnapshot({len(self.symbols)} symbols, columns={sorted(self.columns)})"
+
+
+def requests_for(symbols: list, kinds: set):
+    """``(kind, symbol)`` fetches needed for a snapshot; summaries need one for all."""
+    plan = [(SUMMARY, None)] if SUMMARY in kinds else []
+    for kind in (QUOTE, BOOK):
+        if kind in kinds:
+            plan.extend((kind, symbol) for symbol in symbols)
+    return plan
@@ -0,0 +1,405 @@
+import asyncio
+import concurrent.futures
+import json
+import logging
+import queue
+import random
+import threading
+import time
+
+try:
+    import websocket
+except ImportError:  # pragma: no cover - optional dependency
+    websocket = None
+
+from coinlist.codec import JsonCodec
+
+logger = logging.getLogger(__name__)
+
+QUOTES = "quotes"
+TRADES = "trades"
+BOOK = "book"
+USER = "user"
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+
+_CLOSED = object()
+
+
+class _BoundedSink:
+    """Bounded hand-off between the reader thread and a consumer.
+
+    With ``BLOCK`` a full queue stalls the reader thread, which in turn stops
+    reading the socket and pushes backpressure to the server through TCP.
+    The drop policies keep the reader running and count what was discarded.
+    """
+
+    def __init__(self, maxsize: int, policy: str):
+        if policy not in (BLOCK, DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown backpressure policy {policy!r}")
+        self.queue = queue.Queue(maxsize)
+        self.policy = policy
+        self.dropped = 0
+
+    def put(self, message, stop: threading.Event):
+        if self.policy == BLOCK:
+            while not stop.is_set():
+                try:
+                    self.queue.put(message, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            return
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+            if self.policy == DROP_OLDEST:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(message)
+                except queue.Full:
+                    pass
+
+
+class CoinlistStream:
+    """Market-data and user streaming over one WebSocket connection.
+
+    Subscriptions are remembered and replayed after every reconnect. Messages
+    are delivered to registered callbacks on the reader thread, and/or through
+    ``messages()`` (blocking iterator) and ``__aiter__`` (async iterator), each
+    backed by a bounded queue. Requires the optional ``websocket-client``
+    dependency.
+
+    Usage:
+        stream = CoinlistStream(client, on_message=print)
+        stream.subscribe(QUOTES, ["BTC-USD", "ETH-USD"])
+        stream.start()
+
+    Args:
+        client (CoinlistApi, optional): Client whose credentials and ``_sign`` are
+            used to authenticate. Public channels work without one.
+        url (str, optional): WebSocket URL. Defaults to ``client.wss_url``.
+        on_message (callable, optional): Called with every decoded message.
+        on_error (callable, optional): Called with connection errors before reconnecting.
+        heartbeat_interval (float, optional): Seconds of silence before a ping is
+            sent; a connection silent for twice this long is dropped. Defaults to 15.
+        max_backoff (float, optional): Upper bound of the reconnect delay in seconds. Defaults to 30.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        url: str = None,
+        on_message=None,
+        on_error=None,
+        heartbeat_interval: float = 15,
+        max_backoff: float = 30,
+    ):
+        if websocket is None:
+            raise ImportError(
+                "CoinlistStream requires websocket-client: pip install coinlist-python[stream]"
+            )
+        self.client = client
+        self.codec = getattr(client, "codec", None) or JsonCodec()
+        self.url = url or (client.wss_url if client is not None else "wss://trade-api.coinlist.co")
+        self.heartbeat_interval = heartbeat_interval
+        self.max_backoff = max_backoff
+        self.on_error = on_error
+        self.reconnects = 0
+        self._callbacks = [on_message] if on_message else []
+        self._connect_callbacks = []
+        self._sinks = []
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._ws = None
+        self._thread = None
+
+    # SUBSCRIPTIONS
+    def subscribe(self, channel: str, symbols: list = None):
+        """Subscribe to a channel, now and after every reconnect.
+
+        Args:
+            channel (str): One of QUOTES, TRADES, BOOK or USER.
+            symbols (list, optional): Symbols to subscribe; not needed for USER.
+        """
+        symbols = list(symbols or [])
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).update(symbols)
+        self._send_if_connected(self._subscribe_message("subscribe", channel, symbols))
+
+    def unsubscribe(self, channel: str, symbols: list = None):
+        """Unsubscribe from a channel, or from some of its symbols.
+
+        Args:
+            channel (str): Channel name.
+            symbols (list, optional): Symbols to drop. Defaults to the whole channel.
+        """
+        with self._lock:
+            current = self._subscriptions.get(channel, set())
+            symbols = list(current if symbols is None else symbols)
+            current.difference_update(symbols)
+            if not current:
+                self._subscriptions.pop(channel, None)
+        self._send_if_connected(self._subscribe_message("unsubscribe", channel, symbols))
+
+    @property
+    def subscriptions(self):
+        with self._lock:
+            return {channel: sorted(symbols) for channel, symbols in self._subscriptions.items()}
+
+    def add_callback(self, callback):
+        """Register a callback called on the reader thread with every message."""
+        self._callbacks.append(callback)
+
+    def add_connect_callback(self, callback):
+        """Register a callback called on the reader thread after every (re)connect.
+
+        It runs once subscriptions are replayed and before further messages are
+        delivered, so it can resync state missed while disconnected.
+        """
+        self._connect_callbacks.append(callback)
+
+    @staticmethod
+    def _subscribe_message(kind: str, channel: str, symbols: list):
+        return {"type": kind, "channels": [{"name": channel, "symbols": symbols}]}
+
+    def _auth_message(self):
+        clock = getattr(self.client, "clock", None)
+        timestamp = clock.timestamp() if clock is not None else str(int(time.time()))
+        signature = self.client._sign(timestamp + "GET" + "/v1/websocket", self.client.ACCESS_SECRET)
+        return {
+            "type": "auth",
+            "key": self.client.ACCESS_KEY,
+            "signature": signature,
+            "timestamp": timestamp,
+        }
+
+    # LIFECYCLE
+    def start(self):
+        """Connect in a background thread. Returns immediately."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="coinlist-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Close the connection and stop reconnecting."""
+        self._stop.set()
+        for sink in self._sinks:
+            if isinstance(sink, _AsyncSink):
+                sink.close()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wait_connected(self, timeout: float = None):
+        """Block until the stream is connected and subscribed."""
+        return self._connected.wait(timeout)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                ws = websocket.create_connection(self.url, timeout=self.heartbeat_interval)
+                self._ws = ws
+                self._on_open(ws)
+                backoff = 0.5
+                self._read_loop(ws)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.warning("Coinlist stream disconnected: %s", e)
+                if self.on_error is not None:
+                    self.on_error(e)
+            finally:
+                self._connected.clear()
+                if self._ws is not None:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                    self._ws = None
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            self._stop.wait(random.uniform(0, backoff))
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _on_open(self, ws):
+        if self.client is not None and self.client.ACCESS_KEY:
+            self._send(ws, self._auth_message())
+        with self._lock:
+            subscriptions = [(c, sorted(s)) for c, s in self._subscriptions.items()]
+        for channel, symbols in subscriptions:
+            self._send(ws, self._subscribe_message("subscribe", channel, symbols))
+        self._connected.set()
+        for callback in self._connect_callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Coinlist stream connect callback failed")
+
+    def _read_loop(self, ws):
+        last_seen = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                opcode, frame = ws.recv_data_frame(True)
+            except websocket.WebSocketTimeoutException:
+                if time.monotonic() - last_seen > 2 * self.heartbeat_interval:
+                    raise ConnectionError("Heartbeat timeout")
+                with self._send_lock:
+                    ws.ping()
+                continue
+            last_seen = time.monotonic()
+            if opcode == websocket.ABNF.OPCODE_CLOSE:
+                raise ConnectionError("Connection closed by server")
+            if opcode in (websocket.ABNF.OPCODE_TEXT, websocket.ABNF.OPCODE_BINARY):
+                self._dispatch(self.codec.loads(frame.data))
+
+    def _dispatch(self, message):
+        if not isinstance(message, dict) or message.get("type") == "heartbeat":
+            return
+        for callback in self._callbacks:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Coinlist stream callback failed")
+        for sink in self._sinks:
+            sink.put(message, self._stop)
+
+    def _send(self, ws, message):
+        with self._send_lock:
+            ws.send(json.dumps(message, separators=(",", ":")))
+
+    def _send_if_connected(self, message):
+        ws = self._ws
+        if ws is not None and self._connected.is_set():
+            try:
+                self._send(ws, message)
+            except Exception as e:
+                logger.warning("Coinlist stream send failed, will resend on reconnect: %s", e)
+
+    # CONSUMERS
+    # ``_sinks`` is replaced rather than mutated, so the reader thread can
+    # iterate it without a lock while consumers come and go.
+    def _add_sink(self, sink):
+        with self._lock:
+            self._sinks = self._sinks + [sink]
+
+    def _remove_sink(self, sink):
+        with self._lock:
+            self._sinks = [s for s in self._sinks if s is not sink]
+
+    def messages(self, maxsize: int = 10000, policy: str = BLOCK, timeout: float = None):
+        """Iterate over messages from a bounded queue.
+
+        Args:
+            maxsize (int, optional): Queue capacity. Defaults to 10000.
+            policy (str, optional): BLOCK, DROP_OLDEST or DROP_NEWEST when full. Defaults to BLOCK.
+            timeout (float, optional): Stop iterating after this many idle seconds.
+
+        Yields:
+            dict: Decoded messages.
+        """
+        sink = _BoundedSink(maxsize, policy)
+        self._add_sink(sink)
+        try:
+            while not self._stop.is_set():
+                try:
+                    yield sink.queue.get(timeout=0.1 if timeout is None else timeout)
+                except queue.Empty:
+                    if timeout is not None:
+                        return
+        finally:
+            self._remove_sink(sink)
+
+    def __aiter__(self):
+        return self.aiter()
+
+    async def aiter(self, maxsize: int = 10000, policy: str = BLOCK):
+        """Async iterator over messages, bounded like ``messages``.
+
+        Args:
+            maxsize (int, optional): Queue capacity. Defaults to 10000.
+            policy (str, optional): BLOCK, DROP_OLDEST or DROP_NEWEST when full. Defaults to BLOCK.
+
+        Yields:
+            dict: Decoded messages.
+        """
+        loop = asyncio.get_running_loop()
+        sink = _AsyncSink(loop, maxsize, policy)
+        self._add_sink(sink)
+        try:
+            while not self._stop.is_set():
+                message = await sink.queue.get()
+                if message is _CLOSED:
+                    return
+                yield message
+        finally:
+            self._remove_sink(sink)
+
+
+class _AsyncSink:
+    """Bounded hand-off from the reader thread into an event loop."""
+
+    def __init__(self, loop, maxsize: int, policy: str):
+        if policy not in (BLOCK, DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown backpressure policy {policy!r}")
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.policy = policy
+        self.dropped = 0
+
+    def put(self, message, stop: threading.Event):
+        if self.policy == BLOCK:
+            future = asyncio.run_coroutine_threadsafe(self.queue.put(message), self.loop)
+            while not stop.is_set():
+                try:
+                    future.result(timeout=0.1)
+                    return
+                except concurrent.futures.TimeoutError:
+                    continue
+                except Exception:
+                    return
+            future.cancel()
+            return
+        self.loop.call_soon_threadsafe(self._put_nowait, message)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_CLOSED)
+
+    def _put_nowait(self, message):
+        if self.queue.full():
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
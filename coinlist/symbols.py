@@ -0,0 +1,248 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from decimal import (
+    ROUND_CEILING,
+    ROUND_DOWN,
+    ROUND_FLOOR,
+    ROUND_HALF_EVEN,
+    Decimal,
+)
+
+from coinlist.models import raise_for_error
+
+_TICK_KEYS = ("minimum_price_increment", "price_increment", "tick_size")
+_LOT_KEYS = ("minimum_size_increment", "size_increment", "lot_size")
+_MIN_SIZE_KEYS = ("minimum_size", "min_size", "minimum_trade_size")
+_MIN_NOTIONAL_KEYS = ("minimum_notional", "min_notional")
+_MARKET_TYPES = ("market", "stop_market", "take_market")
+_PRICE_ROUNDING = {"buy": ROUND_FLOOR, "sell": ROUND_CEILING}
+
+
+class OrderValidationError(ValueError):
+    """Raised when an order would be rejected for its tick, lot or notional."""
+
+
+class SymbolInfo:
+    """Trading rules of one symbol.
+
+    Args:
+        data (dict): Symbol entry as returned by ``/v1/symbols``.
+    """
+
+    __slots__ = (
+        "symbol",
+        "base",
+        "quote",
+        "tick",
+        "lot",
+        "min_size",
+        "min_notional",
+        "data",
+    )
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.symbol = data["symbol"]
+        base, _, quote = self.symbol.partition("-")
+        self.base = data.get("base_currency") or base
+        self.quote = data.get("quote_currency") or quote
+        self.tick = _decimal(data, _TICK_KEYS)
+        self.lot = _decimal(data, _LOT_KEYS)
+        self.min_size = _decimal(data, _MIN_SIZE_KEYS) or self.lot
+        self.min_notional = _decimal(data, _MIN_NOTIONAL_KEYS)
+
+    def round_price(self, price, side: str = None):
+        """Round a price to the tick size.
+
+        Buy prices round down and sell prices round up, so rounding never
+        makes an order more aggressive; without a side the price rounds to
+        the nearest tick.
+
+        Returns:
+            Decimal: Rounded price.
+        """
+        price = Decimal(str(price))
+        if not self.tick:
+            return price
+        rounding = _PRICE_ROUNDING.get(side, ROUND_HALF_EVEN)
+        return (price / self.tick).to_integral_value(rounding) * self.tick
+
+    def round_size(self, size):
+        """Round a size down to the lot size.
+
+        Returns:
+            Decimal: Rounded size.
+        """
+        size = Decimal(str(size))
+        if not self.lot:
+            return size
+        return (size / self.lot).to_integral_value(ROUND_DOWN) * self.lot
+
+    def normalize(self, price, size, side: str = None, order_type: str = "limit"):
+        """Round and validate an order locally.
+
+        Args:
+            price (float, str or None): Order price; may be None for market orders.
+            size (float or str): Order size.
+            side (str, optional): buy or sell.
+            order_type (str, optional): Order type. Defaults to 'limit'.
+
+        Returns:
+            Tuple: (price str or None, size str)
+
+        Raises:
+            OrderValidationError: The size rounds to zero or is below the minimum
+                size, or the notional is below the minimum.
+        """
+        size_d = self.round_size(size)
+        if size_d <= 0:
+            raise OrderValidationError(
+                f"{self.symbol}: size {size} is below lot size {self.lot}"
+            )
+        if self.min_size and size_d < self.min_size:
+            raise OrderValidationError(
+                f"{self.symbol}: size {size_d} is below minimum size {self.min_size}"
+            )
+        price_d = None
+        if price is not None and order_type not in _MARKET_TYPES:
+            price_d = self.round_price(price, side)
+            if price_d <= 0:
+                raise OrderValidationError(
+                    f"{self.symbol}: price {price} rounds to {price_d}"
+                )
+            notional = price_d * size_d
+            if self.min_notional and notional < self.min_notional:
+                raise OrderValidationError(
+                    f"{self.symbol}: notional {notional} is below {self.min_notional}"
+                )
+        # Plain notation: str() gives exponents (1.2E-7) for small increments.
+        return (None if price_d is None else format(price_d, "f")), format(size_d, "f")
+
+
+class SymbolRegistry:
+    """In-memory index of ``/v1/symbols`` metadata.
+
+    Loaded once and refreshed when older than ``ttl``. With ``snapshot_path``
+    the last load is written to disk and used on the next cold start while
+    it is younger than ``ttl``.
+
+    Args:
+        ttl (float, optional): Seconds before the metadata is refreshed. Defaults to 3600.
+        snapshot_path (str, optional): JSON snapshot file for fast cold start.
+    """
+
+    def __init__(self, ttl: float = 3600, snapshot_path: str = None):
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.loaded_at = None
+        self._response = None
+        self._by_symbol = {}
+        self._by_base = {}
+        self._by_quote = {}
+        self._lock = threading.Lock()
+        if snapshot_path:
+            self._load_snapshot()
+
+    @property
+    def stale(self):
+        return self.loaded_at is None or time.time() - self.loaded_at >= self.ttl
+
+    def load(self, response: dict, loaded_at: float = None):
+        """Index a ``/v1/symbols`` response.
+
+        Args:
+            response (dict): ``{"symbols": [...]}``.
+            loaded_at (float, optional): Epoch seconds of the data. Defaults to now.
+
+        Raises:
+            ApiError: ``response`` is an error response; nothing is loaded.
+        """
+        raise_for_error(response)
+        by_symbol, by_base, by_quote = {}, {}, {}
+        for entry in response.get("symbols") or []:
+            info = SymbolInfo(entry)
+            by_symbol[info.symbol] = info
+            by_base.setdefault(info.base, []).append(info)
+            by_quote.setdefault(info.quote, []).append(info)
+        with self._lock:
+            self._response = response
+            self._by_symbol = by_symbol
+            self._by_base = by_base
+            self._by_quote = by_quote
+            self.loaded_at = time.time() if loaded_at is None else loaded_at
+        if self.snapshot_path and loaded_at is None:
+            self._write_snapshot()
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        if time.time() - snapshot.get("loaded_at", 0) < self.ttl:
+            self.load(snapshot["response"], loaded_at=snapshot["loaded_at"])
+
+    def _write_snapshot(self):
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"loaded_at": self.loaded_at, "response": self._response}, f)
+        os.replace(tmp, self.snapshot_path)
+
+    @property
+    def response(self):
+        """The raw ``/v1/symbols`` response last loaded."""
+        return self._response
+
+    def get(self, symbol: str):
+        """Rules of ``symbol``.
+
+        Raises:
+            KeyError: Unknown symbol.
+        """
+        return self._by_symbol[symbol]
+
+    def __contains__(self, symbol: str):
+        return symbol in self._by_symbol
+
+    def __len__(self):
+        return len(self._by_symbol)
+
+    @property
+    def symbols(self):
+        return list(self._by_symbol)
+
+    def by_base(self, asset: str):
+        """Symbols whose base asset is ``asset``."""
+        return list(self._by_base.get(asset, ()))
+
+    def by_quote(self, asset: str):
+        """Symbols whose quote asset is ``asset``."""
+        return list(self._by_quote.get(asset, ()))
+
+    def normalize(
+        self, symbol: str, price, size, side: str = None, order_type: str = "limit"
+    ):
+        """Round and validate an order against the rules of ``symbol``.
+
+        Unknown symbols are passed through unchanged.
+
+        Returns:
+            Tuple: (price, size)
+        """
+        info = self._by_symbol.get(symbol)
+        if info is None:
+            return price, size
+        return info.normalize(price, size, side, order_type)
+
+
+def _decimal(data: dict, keys):
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ""):
+            value = Decimal(str(value))
+            return value if value > 0 else None
+    return None
@@ -0,0 +1,125 @@
+import inspect
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = (3.05, 10)
+# Failures where the request may not have reached the exchange or its answer was lost.
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+def parse_retry_after(headers):
+    """Seconds of a ``Retry-After`` response header, or None."""
+    if not headers:
+        return None
+    value = headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def require_sync(client, owner: str):
+    """Raise TypeError if ``client`` is an asyncio client.
+
+    Helpers that call the client from plain code or a thread would only get
+    coroutines back from ``AsyncCoinlistApi``.
+
+    Args:
+        client (CoinlistApi): Client given to the helper.
+        owner (str): Helper name used in the error message.
+    """
+    if inspect.iscoroutinefunction(getattr(client, "_make_request", None)):
+        raise TypeError(f"{owner} needs a CoinlistApi, not an AsyncCoinlistApi")
+
+
+class HttpTransport:
+    """Pooled keep-alive HTTP transport.
+
+    One ``requests.Session`` is shared by every call, so the TCP+TLS
+    handshake to the exchange is paid once per pooled connection instead of
+    once per request. The underlying urllib3 pools are thread-safe, so a
+    single transport can be shared between threads.
+
+    Args:
+        pool_connections (int, optional): Number of per-host pools to cache. Defaults to 4.
+        pool_maxsize (int, optional): Maximum connections kept alive per host. Defaults to 10.
+        pool_block (bool, optional): Block instead of opening extra connections
+            when a host pool is exhausted, which makes ``pool_maxsize`` a hard
+            per-host limit. Defaults to False.
+        timeout (float or tuple, optional): ``(connect, read)`` timeout in seconds. Defaults to (3.05, 10).
+        max_retries (int, optional): Connection-level retries done by urllib3. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries: int = 0,
+    ):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._closed = False
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=max_retries,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict = None,
+        data=None,
+        timeout=None,
+        stream: bool = False,
+    ):
+        """Send a request over a pooled connection.
+
+        Args:
+            method (str): The HTTP method should be UPPER CASE.
+            url (str): Full URL including the query string.
+            headers (dict, optional): Request headers.
+            data (str or bytes, optional): Already serialized request body.
+            timeout (float or tuple, optional): Overrides the transport timeout.
+            stream (bool, optional): Defer reading the body, for ``iter_content``.
+                Defaults to False.
+
+        Returns:
+            requests.Response: Raw response.
+        """
+        if self._closed:
+            raise RuntimeError("Transport is closed")
+        return self.session.request(
+            method,
+            url,
+            headers=headers,
+            data=data,
+            timeout=self.timeout if timeout is None else timeout,
+            stream=stream,
+        )
+
+    def close(self):
+        """Close every pooled connection."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self.session.close()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
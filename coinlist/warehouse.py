@@ -0,0 +1,364 @@
+"""Local SQLite store of immutable history with incremental sync."""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import timezone
+from decimal import Decimal
+
+from coinlist.models import is_error, parse_time
+from coinlist.transport import require_sync
+
+logger = logging.getLogger(__name__)
+
+# table -> (id field, time field, indexed filter columns)
+TABLES = {
+    "auctions": ("auction_code", "logical_time", ("symbol",)),
+    "transfers": ("transfer_id", "created_at", ("asset", "status")),
+    "ledger": (
+        "transaction_id",
+        "created_at",
+        ("trader_id", "asset", "transaction_type"),
+    ),
+}
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _epoch(value):
+    """Unix seconds of an ISO 8601 string, datetime or number."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = parse_time(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+
+def _as_dict(item):
+    return item.to_dict() if hasattr(item, "to_dict") else item
+
+
+class Warehouse:
+    """Auctions, transfers and ledger transactions kept in a local SQLite file.
+
+    History does not change once written, so it is downloaded once: every
+    ``sync_*`` call resumes from the watermark (the latest stored time) of
+    its listing and only fetches the tail, written in bulk transactions of
+    ``batch_size`` rows that also move the watermark, so an interrupted
+    sync resumes where it stopped. Rows are indexed by ID, time and the
+    filter columns of each table (symbol; asset and status; trader_id, asset
+    and transaction_type), so the query helpers answer time-range and filter
+    queries locally without any request. Auction results are fetched once
+    and served from the store afterwards.
+
+    Usage:
+        with Warehouse("history.db", client) as warehouse:
+            warehouse.sync_auctions(["BTC-USD", "ETH-USD"])
+            auctions = warehouse.auctions("BTC-USD", start="2021-06-01")
+
+    Args:
+        path (str, optional): Database file. Defaults to ":memory:".
+        client (CoinlistApi, optional): Client used to sync; without one the
+            store is read-only.
+        batch_size (int, optional): Rows written per transaction. Defaults to 5000.
+    """
+
+    def __init__(
+        self, path: str = ":memory:", client=None, batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        require_sync(client, "Warehouse")
+        self.path = path
+        self.client = client
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._create()
+
+    def _create(self):
+        statements = [
+            "CREATE TABLE IF NOT EXISTS watermarks "
+            "(stream TEXT PRIMARY KEY, time TEXT, t REAL, synced_at REAL)",
+            "CREATE TABLE IF NOT EXISTS auction_results "
+            "(auction_code TEXT PRIMARY KEY, symbol TEXT, data TEXT NOT NULL)",
+        ]
+        for table, (_, _, columns) in TABLES.items():
+            filters = "".join(f", {column} TEXT" for column in columns)
+            statements.append(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                f"(id TEXT PRIMARY KEY, t REAL NOT NULL{filters}, data TEXT NOT NULL)"
+            )
+            statements.append(f"CREATE INDEX IF NOT EXISTS {table}_t ON {table} (t)")
+            for column in columns:
+                statements.append(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{column}_t ON {table} ({column}, t)"
+                )
+        with self._lock:
+            for statement in statements:
+                self._db.execute(statement)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # SYNC
+    def watermark(self, stream: str):
+        """Time of the latest stored item of ``stream`` (e.g. "auctions:BTC-USD"), or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT time FROM watermarks WHERE stream = ?", (stream,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def _store(self, stream: str, table: str, items, **extra):
+        """Write ``items`` in bulk transactions and advance the watermark of ``stream``.
+
+        Items already stored unchanged (the inclusive window boundary) are
+        not written again. Items without a valid time are skipped with a
+        warning.
+
+        Returns:
+            Int: New or changed rows.
+        """
+        id_field, time_field, columns = TABLES[table]
+        placeholders = ", ".join("?" * (len(columns) + 3))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in ("t",) + columns + ("data",))
+        insert = (
+            f"INSERT INTO {table} VALUES ({placeholders}) ON CONFLICT(id) "
+            f"DO UPDATE SET {updates} WHERE {table}.data != excluded.data"
+        )
+        written = 0
+        batch, latest = [], None
+        skipped = 0
+        dumps = json.dumps
+
+        def flush():
+            with self._lock:
+                self._db.execute("BEGIN")
+                try:
+                    changed = self._db.executemany(insert, batch).rowcount
+                    if latest is not None:
+                        self._db.execute(
+                            "INSERT INTO watermarks VALUES (?, ?, ?, ?) "
+                            "ON CONFLICT(stream) DO UPDATE SET time = excluded.time, "
+                            "t = excluded.t, synced_at = excluded.synced_at "
+                            "WHERE excluded.t >= watermarks.t",
+                            (stream, latest[1], latest[0], time.time()),
+                        )
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+            return changed
+
+        for item in items:
+            item = _as_dict(item)
+            stamp = item.get(time_field)
+            try:
+                t = _epoch(stamp)
+            except (TypeError, ValueError, AttributeError):
+                t = None
+            if t is None:
+                skipped += 1
+                continue
+            row = [item[id_field], t]
+            row.extend(extra.get(column, item.get(column)) for column in columns)
+            row.append(dumps(item, separators=(",", ":"), default=_default))
+            batch.append(row)
+            if latest is None or t > latest[0]:
+                latest = (t, stamp)
+            if len(batch) >= self.batch_size:
+                written += flush()
+                batch = []
+        if batch:
+            written += flush()
+        if skipped:
+            logger.warning(
+                "Skipped %d %s item(s) without a valid %s", skipped, table, time_field
+            )
+        with self._lock:
+            self._db.execute(
+                "UPDATE watermarks SET synced_at = ? WHERE stream = ?", (time.time(), stream)
+            )
+        return written
+
+    def _require_client(self):
+        if self.client is None:
+            raise ValueError("Warehouse has no client to sync with")
+        return self.client
+
+    def sync_auctions(self, symbols):
+        """Fetch auctions of ``symbols`` newer than what is stored.
+
+        Args:
+            symbols (str or list): Symbols to sync.
+
+        Returns:
+            Int: Rows written.
+        """
+        client = self._require_client()
+        symbols = [symbols] if isinstance(symbols, str) else symbols
+        written = 0
+        for symbol in symbols:
+            stream = f"auctions:{symbol}"
+            items = client.iter_auctions(symbol, start_time=self.watermark(stream))
+            written += self._store(stream, "auctions", items)
+        return written
+
+    def sync_transfers(self):
+        """Fetch transfers newer than what is stored.
+
+        Returns:
+            Int: Rows written.
+        """
+        client = self._require_client()
+        items = client.iter_transfers(start_time=self.watermark("transfers"))
+        return self._store("transfers", "transfers", items)
+
+    def sync_ledger(self):
+        """Fetch ledger transactions of the current account newer than what is stored.
+
+        Returns:
+            Int: Rows written.
+        """
+        client = self._require_client()
+        trader_id = client.get_traider_id()
+        stream = f"ledger:{trader_id}"
+        items = client.iter_account_history(start_time=self.watermark(stream))
+        return self._store(stream, "ledger", items, trader_id=trader_id)
+
+    def sync(self, symbols=()):
+        """Sync auctions of ``symbols``, transfers and the ledger.
+
+        Returns:
+            dict: Rows written per table.
+        """
+        return {
+            "auctions": self.sync_auctions(symbols) if symbols else 0,
+            "transfers": self.sync_transfers(),
+            "ledger": self.sync_ledger(),
+        }
+
+    # QUERIES
+    def _select(self, table, start, end, descending, limit, filters):
+        clauses, args = [], []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if start is not None:
+            clauses.append("t >= ?")
+            args.append(_epoch(start))
+        if end is not None:
+            clauses.append("t <= ?")
+            args.append(_epoch(end))
+        query = f"SELECT data FROM {table}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY t DESC, id DESC" if descending else " ORDER BY t, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(int(limit))
+        loads = json.loads
+        with self._lock:
+            rows = self._db.execute(query, args).fetchall()
+        return [loads(data) for (data,) in rows]
+
+    def auctions(
+        self,
+        symbol: str = None,
+        start=None,
+        end=None,
+        descending: bool = False,
+        limit: int = None,
+    ):
+        """Stored auctions, oldest first.
+
+        Args:
+            symbol (str, optional): Only auctions of this symbol.
+            start (str, datetime or float, optional): Start time (inclusive).
+            end (str, datetime or float, optional): End time (inclusive).
+            descending (bool, optional): Newest first. Defaults to False.
+            limit (int, optional): Maximum number of rows.
+
+        Returns:
+            List of dict: Auctions as returned by the exchange.
+        """
+        return self._select("auctions", start, end, descending, limit, {"symbol": symbol})
+
+    def transfers(
+        self,
+        asset: str = None,
+        status: str = None,
+        start=None,
+        end=None,
+        descending: bool = False,
+        limit: int = None,
+    ):
+        """Stored transfers, oldest first; filters as for ``auctions``."""
+        filters = {"asset": asset, "status": status}
+        return self._select("transfers", start, end, descending, limit, filters)
+
+    def ledger(
+        self,
+        asset: str = None,
+        transaction_type: str = None,
+        trader_id: str = None,
+        start=None,
+        end=None,
+        descending: bool = False,
+        limit: int = None,
+    ):
+        """Stored ledger transactions, oldest first; filters as for ``auctions``."""
+        filters = {
+            "trader_id": trader_id,
+            "asset": asset,
+            "transaction_type": transaction_type,
+        }
+        return self._select("ledger", start, end, descending, limit, filters)
+
+    def auction_results(self, symbol: str, auction_code: str):
+        """Results of a historical auction, fetched once and then served locally."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM auction_results WHERE auction_code = ?", (auction_code,)
+            ).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        response = self._require_client().get_auction_results(symbol, auction_code)
+        if is_error(response):
+            return response
+        data = json.dumps(_as_dict(response), separators=(",", ":"), default=_default)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO auction_results VALUES (?, ?, ?)",
+                (auction_code, symbol, data),
+            )
+        return response
+
+    def count(self, table: str):
+        """Rows stored in ``table``."""
+        if table not in TABLES and table != "auction_results":
+            raise ValueError(f"Unknown table {table!r}")
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def __repr__(self):
+        return f"Warehouse({self.path!r})"
@@ -0,0 +1,20 @@
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET, FakeExchange
+from coinlist import CoinlistApi
+from coinlist.ratelimit import RequestScheduler
+
+
+@pytest.fixture
+def exchange():
+    with FakeExchange(history=1200) as exchange:
+        yield exchange
+
+
+@pytest.fixture
+def client(exchange):
+    client = CoinlistApi(KEY, SECRET, scheduler=RequestScheduler.unlimited())
+    client.endpoint_url = exchange.url
+    client.wss_url = exchange.ws_url
+    with client:
+        yield client
@@ -0,0 +1,48 @@
+import pytest
+
+from benchmarks import payloads
+from coinlist import ApiError
+from coinlist.accounts import AccountContext
+
+
+def test_accounts_are_reloaded_after_the_ttl(client, exchange, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("coinlist.accounts.time.monotonic", lambda: now[0])
+    client.account_context.ttl = 60
+    assert client.get_traider_id() == payloads.TRADER_ID
+    client.get_traider_id()
+    assert exchange.hits["GET /v1/accounts"] == 1
+    now[0] += 60
+    client.get_traider_id()
+    assert exchange.hits["GET /v1/accounts"] == 2
+    client.get_traider_id(refresh=True)
+    assert exchange.hits["GET /v1/accounts"] == 3
+
+
+def test_select_validates_loaded_trader_ids(client):
+    with pytest.raises(ValueError):
+        client.select_account("someone-else")
+    client.select_account(payloads.TRADER_ID)
+    assert client.get_traider_id() == payloads.TRADER_ID
+
+    context = AccountContext(trader_id="preset")
+    assert context.trader_id == "preset"
+    context.select("other")
+    assert context.trader_id == "other"
+
+
+def test_error_responses_are_returned_and_not_cached(client, exchange):
+    exchange.fail_next(status=503, path="/accounts$")
+    assert client.list_accounts()["status"] == 503
+    assert not client.account_context.fresh and client.account_context.accounts == []
+
+    exchange.fail_next(status=503, path="/accounts$")
+    with pytest.raises(ApiError) as e:
+        client.get_account_summary()
+    assert e.value.status == 503
+
+    assert client.get_traider_id() == payloads.TRADER_ID
+    client.account_context.invalidate()
+    client.account_context.update(payloads.accounts())
+    client.account_context.update({"status": 503, "message": "Unavailable"})
+    assert client.account_context.trader_ids == [payloads.TRADER_ID]
@@ -0,0 +1,104 @@
+import random
+from collections import deque
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from benchmarks import payloads
+from coinlist.analytics import FeeSchedule, FillAnalytics, analyze_fills, ledger_totals
+from coinlist.models import FillArray
+
+
+def _fifo_reference(fills):
+    """Lot-by-lot FIFO realized PnL per symbol."""
+    lots, pnl = {}, {}
+    for f in fills:
+        queue = lots.setdefault(f["symbol"], deque())
+        sign = 1 if f["side"] == "buy" else -1
+        qty, price = float(f["quantity"]), float(f["price"])
+        while qty > 1e-12 and queue and queue[0][0] != sign:
+            _, lot_qty, lot_price = queue[0]
+            closed = min(qty, lot_qty)
+            pnl[f["symbol"]] = pnl.get(f["symbol"], 0.0) + closed * (price - lot_price) * -sign
+            qty -= closed
+            if lot_qty - closed > 1e-12:
+                queue[0] = (queue[0][0], lot_qty - closed, lot_price)
+            else:
+                queue.popleft()
+        if qty > 1e-12:
+            queue.append((sign, qty, price))
+    return pnl
+
+
+def _fills(n, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            "fill_id": str(i),
+            "symbol": rng.choice(["BTC-USD", "ETH-USD"]),
+            "side": rng.choice(["buy", "sell"]),
+            "price": "%.2f" % rng.uniform(90, 110),
+            "quantity": "%.3f" % rng.uniform(0.1, 3),
+            "fee": "0.01",
+            "fee_type": "maker",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1000])
+def test_fifo_matches_lot_by_lot_reference(chunk_size):
+    fills = _fills(500)
+    summary = analyze_fills(fills, chunk_size=chunk_size).summary()
+    reference = _fifo_reference(fills)
+    for symbol, pnl in zip(summary["symbol"], summary["realized_pnl"]):
+        assert pnl == pytest.approx(reference[symbol], rel=1e-9, abs=1e-6)
+    position = {s: 0.0 for s in summary["symbol"]}
+    for f in fills:
+        position[f["symbol"]] += float(f["quantity"]) * (1 if f["side"] == "buy" else -1)
+    assert list(summary["position"]) == pytest.approx([position[s] for s in summary["symbol"]])
+    assert summary["fees"].sum() == pytest.approx(5.0)
+
+
+def test_average_cost_and_vwap():
+    fills = [
+        {"symbol": "X", "side": "buy", "price": "10", "quantity": "1"},
+        {"symbol": "X", "side": "buy", "price": "20", "quantity": "1"},
+        {"symbol": "X", "side": "sell", "price": "30", "quantity": "3"},
+        {"symbol": "X", "side": "buy", "price": "25", "quantity": "1"},
+    ]
+    average = analyze_fills(fills, method="average").summary()
+    assert average["realized_pnl"][0] == pytest.approx(2 * (30 - 15) + (30 - 25))
+    assert average["position"][0] == 0
+    fifo = analyze_fills(fills).summary()
+    assert fifo["realized_pnl"][0] == pytest.approx(20 + 10 + 5)
+    assert fifo["vwap_buy"][0] == pytest.approx(55 / 3)
+    assert fifo["turnover"][0] == pytest.approx(145)
+
+
+def test_fee_schedule_and_fill_array(client, exchange):
+    fees = FeeSchedule(client)
+    fills = payloads.history(200)["fills"]
+    for f in fills[:10]:
+        f["fee"] = None
+    stats = FillAnalytics(fees=fees).add(FillArray(fills))
+    summary = stats.summary()
+    assert summary["count"].sum() == 200
+    assert summary["expected_fees"].sum() == pytest.approx(
+        sum(float(f["price"]) * float(f["quantity"]) for f in fills)
+        * 0.0045
+        + sum(
+            float(f["price"]) * float(f["quantity"]) * 0.0005
+            for f in fills
+            if f["fee_type"] == "taker"
+        )
+    )
+    assert summary["fees"].sum() == pytest.approx(summary["expected_fees"].sum(), rel=0.05)
+    assert sum(n for route, n in exchange.hits.items() if "fees" in route) == 1
+
+
+def test_ledger_totals():
+    ledger = payloads.history(100)["transactions"]
+    totals = ledger_totals(ledger, chunk_size=30)
+    assert totals["USD"]["trade"] == pytest.approx(sum(float(t["amount"]) for t in ledger))
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from benchmarks import payloads
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import (
+    ApiError,
+    AsyncCoinlistApi,
+    OrderTracker,
+    ReportDownloader,
+    SymbolRegistry,
+    Warehouse,
+)
+from coinlist.ratelimit import RequestScheduler
+from coinlist.retry import RetryPolicy
+
+pytest.importorskip("aiohttp")
+
+
+def _run(exchange, body, **kwargs):
+    async def main():
+        client = AsyncCoinlistApi(
+            KEY, SECRET, scheduler=RequestScheduler.unlimited(), **kwargs
+        )
+        client.endpoint_url = exchange.url
+        async with client:
+            return await body(client)
+
+    return asyncio.run(main())
+
+
+def test_endpoints_run_concurrently(exchange):
+    async def body(client):
+        return await asyncio.gather(
+            client.get_quote("BTC-USD"),
+            client.get_quote("ETH-USD"),
+            client.get_traider_id(),
+            client.get_account_summary(),
+        )
+
+    btc, eth, trader_id, summary = _run(exchange, body)
+    assert "ask" in btc["quote"] and "ask" in eth["quote"]
+    assert trader_id == payloads.TRADER_ID
+    assert "asset_balances" in summary
+
+
+def test_listing_pages_and_raises_on_error_pages(exchange):
+    async def body(client):
+        transfers = [t async for t in client.iter_transfers(count=100)]
+        partial = []
+        with pytest.raises(ApiError):
+            async for transfer in client.iter_transfers(count=100, prefetch=False):
+                partial.append(transfer)
+                if len(partial) == 150:
+                    exchange.fail_next(status=503, path="/transfers")
+        return transfers, partial
+
+    transfers, partial = _run(exchange, body)
+    assert len({t["transfer_id"] for t in transfers}) == 1200
+    assert 150 <= len(partial) < 1200
+
+
+def test_retries_and_bulk_orders(exchange):
+    orders = [
+        {"symbol": "BTC-USD", "side": "buy", "size": "1", "price": "10"}
+        for _ in range(5)
+    ]
+
+    async def body(client):
+        exchange.fail_next(2, status=502, path="/v1/balances")
+        balances = await client.get_list_balances()
+        return balances, await client.create_orders(orders, batch_size=2)
+
+    balances, results = _run(exchange, body, retry=RetryPolicy(backoff=0.001))
+    assert "asset_balances" in balances
+    assert not any(r["error"] for r in results)
+    assert sorted(r["order_id"] for r in results) == sorted(exchange.orders)
+
+
+def test_symbol_registry_and_account_errors(exchange):
+    async def body(client):
+        exchange.fail_next(status=503, path="/accounts$")
+        with pytest.raises(ApiError):
+            await client.get_traider_id()
+        order_id = await client.create_order(36000.019, "0.12345", "BTC-USD", "buy")
+        return order_id, await client.get_symbol("ETH-USD")
+
+    order_id, symbol = _run(exchange, body, symbols=SymbolRegistry())
+    assert symbol["symbol"]["symbol"] == "ETH-USD"
+    assert exchange.orders[order_id]["price"] == "36000.01"
+    assert exchange.hits["GET /v1/symbols"] == 1
+
+
+def test_clock_syncs_through_the_event_loop(exchange):
+    exchange.clock_offset = -30.0
+
+    async def body(client):
+        offset = await client.clock.sync_async(client)
+        with pytest.raises(TypeError):
+            client.clock.start(client)
+        return offset
+
+    assert _run(exchange, body) == pytest.approx(-30.0, abs=0.05)
+
+
+@pytest.mark.parametrize(
+    "helper", [OrderTracker, ReportDownloader, lambda c: Warehouse(client=c)]
+)
+def test_sync_helpers_reject_the_async_client(exchange, helper):
+    async def body(client):
+        with pytest.raises(TypeError):
+            helper(client)
+
+    _run(exchange, body)
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from coinlist import ApiError, CandleDownloader
+
+SYMBOL = "BTC-USD"
+HOUR = 3600
+# A fixed, closed range so every candle is cached.
+T0 = 1_600_000_000 // HOUR * HOUR
+
+
+def _candles(exchange):
+    return exchange.hits["GET /v1/symbols/([^/]+)/candles"]
+
+
+def test_cache_serves_repeated_ranges(client, exchange, tmp_path):
+    downloader = CandleDownloader(client, cache_dir=str(tmp_path), window=100)
+    first = downloader.download(SYMBOL, T0, T0 + 5 * HOUR)
+    assert len(first) == 301 and _candles(exchange) == 4
+    again = downloader.download(SYMBOL, T0 + HOUR, T0 + 2 * HOUR)
+    assert _candles(exchange) == 4
+    assert np.array_equal(again, first[60:121])
+
+
+def test_cache_grows_contiguously_before_and_after(client, exchange, tmp_path):
+    downloader = CandleDownloader(client, cache_dir=str(tmp_path))
+    downloader.download(SYMBOL, T0, T0 + HOUR)
+    # Entirely before the cached span: the hour in between is fetched too.
+    head = downloader.download(SYMBOL, T0 - 3 * HOUR, T0 - 2 * HOUR)
+    assert len(head) == 61
+    tail = downloader.download(SYMBOL, T0 + 3 * HOUR, T0 + 4 * HOUR)
+    assert len(tail) == 61
+    cached = np.load(downloader.cache_path(SYMBOL, "price", "1m"))
+    assert cached["time"][0] == T0 - 3 * HOUR and cached["time"][-1] == T0 + 4 * HOUR
+    assert set(np.diff(cached["time"])) == {60}
+
+    hits = _candles(exchange)
+    span = downloader.download(SYMBOL, T0 - 3 * HOUR, T0 + 4 * HOUR)
+    assert len(span) == 7 * 60 + 1 and _candles(exchange) == hits
+
+
+def test_failed_window_is_raised_and_not_cached(
+    client, exchange, tmp_path, monkeypatch
+):
+    get_candles = client.get_candles
+    starts = []
+
+    def second_window_fails(symbol, **kwargs):
+        starts.append(kwargs["start_time"])
+        if len(starts) == 2:
+            exchange.fail_next(status=503, path="/candles")
+        return get_candles(symbol, **kwargs)
+
+    monkeypatch.setattr(client, "get_candles", second_window_fails)
+    downloader = CandleDownloader(
+        client, cache_dir=str(tmp_path), max_workers=1, window=100
+    )
+    with pytest.raises(ApiError) as e:
+        downloader.download(SYMBOL, T0, T0 + 299 * 60)
+    assert e.value.status == 503
+    assert not os.path.exists(downloader.cache_path(SYMBOL, "price", "1m"))
+    assert len(downloader.download(SYMBOL, T0, T0 + 299 * 60)) == 300
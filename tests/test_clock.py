@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import AsyncCoinlistApi, ClockSync, CoinlistApi, CoinlistStream
+from coinlist.instrumentation import MetricsCollector, PrometheusExporter
+from coinlist.ratelimit import RequestScheduler
+
+
+def test_date_headers_correct_a_skewed_host(client, exchange):
+    exchange.clock_offset = 120.0
+    # The first request is rejected, corrects the clock and is re-signed.
+    assert "fees_by_symbols" in client.list_fees()
+    assert client.clock.offset == pytest.approx(120.0, abs=1.0)
+    assert "fees_by_symbols" in client.list_fees()
+    assert sum(exchange.rejected.values()) == 1
+
+
+def test_other_401s_are_not_resent(exchange):
+    client = CoinlistApi(KEY, "d3Jvbmc=", scheduler=RequestScheduler.unlimited())
+    client.endpoint_url = exchange.url
+    assert client.list_fees()["status"] == 401
+    assert sum(exchange.rejected.values()) == 1
+
+
+def test_stream_auth_uses_the_exchange_clock(client, exchange):
+    exchange.clock_offset = 300.0
+    client.exchange_time()
+    message = CoinlistStream(client)._auth_message()
+    assert int(message["timestamp"]) == pytest.approx(exchange.now(), abs=2)
+
+
+def test_exchange_time_gives_a_precise_sample(client, exchange):
+    exchange.clock_offset = -45.25
+    server = client.exchange_time()
+    assert server == pytest.approx(exchange.now(), abs=0.5)
+    assert client.clock.offset == pytest.approx(-45.25, abs=0.05)
+    assert client.clock.uncertainty < 0.05
+
+
+def test_intersection_narrows_date_resolution():
+    clock = ClockSync()
+    true_offset = 0.3
+    for i in range(20):
+        sent = 1000.0 + i * 0.37
+        received = sent + 0.01
+        server = int(sent + 0.005 + true_offset)
+        clock.observe(sent, received, server, 1.0)
+    assert clock.uncertainty < 0.05
+    assert abs(clock._offset - true_offset) <= clock.uncertainty
+
+
+def test_step_and_drift():
+    clock = ClockSync(min_drift_span=60)
+    for i in range(40):
+        t = 1000.0 + i * 10
+        offset = 2.0 + 1e-3 * (t - 1000.0)
+        clock.observe(t, t + 0.002, t + 0.001 + offset)
+    assert clock.drift == pytest.approx(1e-3, rel=0.05)
+    clock.observe(1500.0, 1500.002, 1500.001 + 50.0)
+    assert clock._offset == pytest.approx(50.0, abs=0.01)
+    assert clock.steps == 1 and clock.stats()["samples"] == 1
+
+
+def test_local_clock_only(exchange):
+    client = CoinlistApi(KEY, SECRET, scheduler=RequestScheduler.unlimited(), clock=False)
+    client.endpoint_url = exchange.url
+    assert client.clock is None
+    assert "fees_by_symbols" in client.list_fees()
+
+
+def test_async_client_syncs(exchange):
+    pytest.importorskip("aiohttp")
+    exchange.clock_offset = 90.0
+
+    async def main():
+        client = AsyncCoinlistApi(KEY, SECRET, scheduler=RequestScheduler.unlimited())
+        client.endpoint_url = exchange.url
+        async with client:
+            await client.exchange_time()
+            return client.clock.offset, await client.list_accounts()
+
+    offset, accounts = asyncio.run(main())
+    assert offset == pytest.approx(90.0, abs=0.05)
+    assert "accounts" in accounts
+
+
+def test_prometheus_exports_clock(client, exchange):
+    client.exchange_time()
+    text = PrometheusExporter(MetricsCollector(), clock=client.clock).render()
+    assert "# TYPE coinlist_clock_offset_seconds gauge" in text
+    assert "coinlist_clock_uncertainty_seconds " in text
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET, FakeExchange
+from coinlist import AsyncCoinlistApi, CoinlistApi
+from coinlist.coalesce import SingleFlight
+from coinlist.ratelimit import RequestScheduler
+
+
+def _client(exchange, **kwargs):
+    client = CoinlistApi(KEY, SECRET, scheduler=RequestScheduler.unlimited(), **kwargs)
+    client.endpoint_url = exchange.url
+    return client
+
+
+def _hits(exchange, name):
+    return sum(n for route, n in exchange.hits.items() if name in route)
+
+
+def test_concurrent_identical_gets_share_one_request(exchange):
+    client = _client(exchange, coalesce=True)
+    exchange.slow_next(1, 0.2, path="/quote")
+    with ThreadPoolExecutor(8) as pool:
+        quotes = list(pool.map(lambda _: client.get_quote("BTC-USD"), range(8)))
+    assert _hits(exchange, "quote") == 1
+    assert all(q is quotes[0] for q in quotes)
+    assert client.single_flight.coalesced == 7
+
+
+def test_different_params_are_not_coalesced(exchange):
+    client = _client(exchange, coalesce=True)
+    exchange.slow_next(2, 0.1, path="/quote")
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(client.get_quote, ["BTC-USD", "ETH-USD"]))
+    assert _hits(exchange, "quote") == 2
+
+
+def test_result_window_and_default_off(exchange):
+    client = _client(exchange, coalesce=SingleFlight(window=60))
+    client.get_quote("BTC-USD")
+    client.get_quote("BTC-USD")
+    assert _hits(exchange, "quote") == 1
+    client.single_flight.forget()
+    client.get_quote("BTC-USD")
+    assert _hits(exchange, "quote") == 2
+
+    client = _client(exchange)
+    assert client.single_flight is None
+    client.get_quote("BTC-USD")
+    client.get_quote("BTC-USD")
+    assert _hits(exchange, "quote") == 4
+
+
+def test_shared_flight_keeps_hosts_and_keys_apart(exchange):
+    flight = SingleFlight(window=60)
+    with FakeExchange(history=10) as other:
+        for url in (exchange.url, other.url):
+            client = _client(exchange, coalesce=flight)
+            client.endpoint_url = url
+            client.get_quote("BTC-USD")
+        assert _hits(exchange, "quote") == _hits(other, "quote") == 1
+    client = _client(exchange, coalesce=flight)
+    assert "fees_by_symbols" in client.list_fees()
+    # Another account on the same host must not get the first one's answer.
+    other_key = _client(exchange, coalesce=flight)
+    other_key.ACCESS_KEY = "other-key"
+    assert other_key.list_fees()["status"] == 401
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "k", fail)
+        started.wait()
+        follower = pool.submit(flight.do, "k", fail)
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+    assert flight.calls == 2 and flight.coalesced == 1
+    assert flight.do("k", lambda: 1) == 1
+
+
+def test_async_gets_are_coalesced(exchange):
+    async def run():
+        async with AsyncCoinlistApi(
+            KEY, SECRET, scheduler=RequestScheduler.unlimited(), coalesce=True
+        ) as client:
+            client.endpoint_url = exchange.url
+            exchange.slow_next(1, 0.2, path="/quote")
+            first = asyncio.ensure_future(client.get_quote("ETH-USD"))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            return await asyncio.gather(*(client.get_quote("ETH-USD") for _ in range(5)))
+
+    quotes = asyncio.run(run())
+    assert _hits(exchange, "quote") == 1
+    assert all(q["quote"]["bid"] for q in quotes)
@@ -0,0 +1,66 @@
+import json
+import re
+from decimal import Decimal
+
+import pytest
+
+from benchmarks import payloads
+from coinlist import JsonCodec
+
+_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+_TIME = "2021-06-01T00:00:00.000Z"
+
+
+def _responses():
+    order = {"symbol": "BTC-USD", "side": "buy", "size": "0.5", "price": "36000"}
+    responses = {
+        "symbols": payloads.symbols(),
+        "summary": payloads.symbol_summary(),
+        "quote": payloads.quote("BTC-USD", _TIME),
+        "book": payloads.book("BTC-USD", 5, _TIME),
+        "account_summary": payloads.account_summary(),
+        "balances": payloads.balances(),
+        "wallets": payloads.wallets(),
+        "ledger_summary": payloads.ledger_summary(),
+        "fees": payloads.fees(),
+        "order": payloads.order("o-1", order, _TIME),
+    }
+    for key, items in payloads.history(50).items():
+        responses[key] = {key: items}
+    return responses
+
+
+def _numeric_strings(obj, path=""):
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            yield from _numeric_strings(value, f"{path}.{key}")
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from _numeric_strings(value, path)
+    elif isinstance(obj, str) and _NUMBER.fullmatch(obj):
+        yield path
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_decimal_mode_leaves_no_numeric_strings(backend):
+    pytest.importorskip(backend)
+    codec = JsonCodec(numbers="decimal", backend=backend)
+    for name, response in _responses().items():
+        decoded = codec.loads(json.dumps(response))
+        assert list(_numeric_strings(decoded, name)) == []
+
+
+def test_fixed_mode_is_exact():
+    codec = JsonCodec(numbers="fixed", scale=8)
+    quote = codec.loads(json.dumps(payloads.quote("BTC-USD", _TIME)))
+    assert quote["bid"] == 3623188000000 and quote["bid_size"] == 75000000
+    summary = codec.loads(json.dumps(payloads.account_summary()))
+    assert summary["asset_balances"]["BTC"] == 125000000
+
+
+def test_float_mode_decodes_unchanged():
+    codec = JsonCodec()
+    body = json.dumps(payloads.quote("BTC-USD", _TIME)).encode()
+    assert codec.loads(body) == json.loads(body)
+    decimal = JsonCodec(numbers="decimal").loads(body)
+    assert decimal["ask"] == Decimal("36268.12")
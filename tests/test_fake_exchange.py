@@ -0,0 +1,108 @@
+import asyncio
+import queue
+
+import pytest
+
+from benchmarks import suite
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import AsyncCoinlistApi, CoinlistApi, CoinlistStream
+from coinlist.ratelimit import RequestScheduler
+
+
+def test_signed_requests_are_accepted(client, exchange):
+    assert client.get_traider_id()
+    assert "asset_balances" in client.get_account_summary()
+    assert client.get_quote("BTC-USD")["quote"]["bid"]
+    assert not exchange.rejected
+
+
+def test_bad_signature_is_rejected(exchange):
+    client = CoinlistApi(KEY, "YmFkLXNlY3JldA==", scheduler=RequestScheduler.unlimited())
+    client.endpoint_url = exchange.url
+    assert client.get_list_balances()["status"] == 401
+    assert exchange.rejected["Invalid signature"] == 1
+
+
+def test_order_lifecycle(client):
+    order_id = client.create_order(36000, "0.01", "BTC-USD", "buy")
+    assert client.get_order(order_id)["order"]["status"] == "accepted"
+    client.modify_order(order_id, 36001, "0.02", "BTC-USD", "buy")
+    assert client.get_order(order_id)["order"]["price"] == "36001"
+    client.cancel_order(order_id)
+    assert client.get_order(order_id)["order"]["status"] == "canceled"
+
+
+def test_bulk_orders(client):
+    orders = [{"symbol": "ETH-USD", "side": "sell", "size": "0.1", "price": 2600}] * 30
+    results = client.create_orders(orders, batch_size=25)
+    assert len(results) == 30
+    assert all(r["order_id"] and r["error"] is None for r in results)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_paging_returns_every_item_once(client, descending, prefetch):
+    ids = [
+        f["fill_id"]
+        for f in client.iter_fills(descending=descending, count=100, prefetch=prefetch)
+    ]
+    assert len(ids) == len(set(ids)) == 1200
+
+
+def test_async_client_signs_encoded_queries(exchange):
+    async def fetch():
+        async with AsyncCoinlistApi(
+            KEY, SECRET, scheduler=RequestScheduler.unlimited()
+        ) as client:
+            client.endpoint_url = exchange.url
+            return [f async for f in client.iter_fills(start_time="2021-06-01T00:10:00Z")]
+
+    assert len(asyncio.run(fetch())) == 1200 - 600
+    assert not exchange.rejected
+
+
+def test_injected_errors(client, exchange):
+    exchange.fail_next(2, status=503, path="/v1/balances")
+    assert client.get_list_balances()["status"] == 503
+    assert client.get_list_balances()["status"] == 503
+    assert "asset_balances" in client.get_list_balances()
+
+
+def test_stream_receives_user_and_market_messages(client, exchange):
+    received = queue.Queue()
+    stream = CoinlistStream(client, on_message=received.put)
+    stream.subscribe("user")
+    stream.subscribe("quotes", ["BTC-USD"])
+    with stream:
+        assert stream.wait_connected(5)
+        assert exchange.wait_subscribed("quotes", "BTC-USD")
+        assert exchange.wait_subscribed("user")
+        client.create_order(36000, "0.01", "BTC-USD", "buy")
+        exchange.publish("quotes", {"type": "quote", "symbol": "BTC-USD"}, "BTC-USD")
+        types = set()
+        while not {"order", "quote"} <= types:
+            types.add(received.get(timeout=5)["type"])
+    assert not exchange.rejected
+
+
+def test_dispatch_skips_non_dict_frames_and_tolerates_new_consumers(client):
+    received = []
+    stream = CoinlistStream(client, on_message=received.append)
+
+    def subscribe_late(message):
+        # A consumer starting on another thread while the reader dispatches.
+        stream._add_sink(queue.Queue())
+
+    stream.add_callback(subscribe_late)
+    stream._add_sink(type("Sink", (), {"put": lambda self, m, stop: received.append(m)})())
+    for frame in (["ack"], "pong", 1, {"type": "heartbeat"}, {"type": "quote"}):
+        stream._dispatch(frame)
+    assert received == [{"type": "quote"}] * 2
+
+
+def test_suite_compare_flags_regressions():
+    previous = {"metrics": {"create_order_per_s": 100.0, "get_quote_p50_ms": 1.0}}
+    current = {"metrics": {"create_order_per_s": 70.0, "get_quote_p50_ms": 1.1}}
+    rows, regressions = suite.compare(current, previous, threshold=0.2)
+    assert len(rows) == 2
+    assert regressions == ["create_order_per_s"]
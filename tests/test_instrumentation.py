@@ -0,0 +1,98 @@
+import asyncio
+import urllib.request
+
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import AsyncCoinlistApi, MetricsCollector, PrometheusExporter
+from coinlist.instrumentation import RequestEvent, endpoint_template
+from coinlist.ratelimit import RequestScheduler
+
+
+@pytest.mark.parametrize(
+    "path, template",
+    [
+        ("/v1/orders/abc-123", "/v1/orders/{order_id}"),
+        ("/v1/orders/bulk", "/v1/orders/bulk"),
+        ("/v1/accounts/t1/ledger?count=5", "/v1/accounts/{trader_id}/ledger"),
+        ("/v1/symbols/BTC-USD/auctions/X-1", "/v1/symbols/{symbol}/auctions/{auction_code}"),
+        ("/v1/symbols/summary", "/v1/symbols/summary"),
+    ],
+)
+def test_endpoint_template(path, template):
+    assert endpoint_template(path) == template
+
+
+def test_collector_records_every_request(client, exchange):
+    collector = MetricsCollector()
+    events = []
+    client.add_hook(collector)
+    client.add_hook(events.append)
+    order_ids = [client.create_order(36000, "0.01", "BTC-USD", "buy") for _ in range(3)]
+    for order_id in order_ids:
+        client.get_order(order_id)
+    exchange.fail_next(1, status=503, path="/v1/orders/")
+    client.get_order(order_ids[0])
+
+    stats = collector.snapshot()
+    get = stats[("/v1/orders/{order_id}", "GET")]
+    assert get["count"] == 4 and sum(get["buckets"]) == 4
+    assert get["statuses"] == {"200": 3, "503": 1}
+    assert stats[("/v1/orders", "POST")]["bytes_sent"] > 0
+    assert all(e.network_time > 0 and e.sign_time > 0 for e in events)
+    assert 0 < collector.quantile("/v1/orders/{order_id}", "GET", 0.5) <= 10
+
+
+def test_failing_hook_does_not_break_requests(client):
+    def broken(event):
+        raise RuntimeError("boom")
+
+    client.add_hook(broken)
+    assert client.get_traider_id()
+
+
+def test_transport_errors_are_reported(client):
+    events = []
+    client.add_hook(events.append)
+    client.endpoint_url = "http://127.0.0.1:9"
+    with pytest.raises(Exception):
+        client.get_list_balances()
+    assert events[0].status is None and events[0].error is not None
+
+
+def test_async_client_hooks(exchange):
+    collector = MetricsCollector()
+
+    async def run():
+        async with AsyncCoinlistApi(
+            KEY,
+            SECRET,
+            scheduler=RequestScheduler.unlimited(),
+            hooks=[collector],
+            coalesce=False,
+        ) as client:
+            client.endpoint_url = exchange.url
+            await asyncio.gather(*(client.get_quote("ETH-USD") for _ in range(5)))
+
+    asyncio.run(run())
+    assert collector.snapshot()[("/v1/symbols/{symbol}/quote", "GET")]["count"] == 5
+
+
+def test_prometheus_exporter():
+    collector = MetricsCollector(buckets=(0.01, 0.1))
+    collector(RequestEvent("GET", "/v1/fills", 200, 2, 10, network_time=0.05))
+    collector(RequestEvent("GET", "/v1/fills", None, 2, 0, network_time=0.5, error=OSError()))
+    exporter = PrometheusExporter(collector)
+    text = exporter.render()
+    labels = 'endpoint="/v1/fills",method="GET"'
+    assert f'coinlist_request_duration_seconds_bucket{{{labels},le="0.01"}} 0' in text
+    assert f'coinlist_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'coinlist_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f'coinlist_responses_total{{{labels},status="error"}} 1' in text
+
+    host, port = exporter.serve()
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as r:
+            assert r.read().decode() == exporter.render()
+    finally:
+        exporter.close()
@@ -0,0 +1,118 @@
+from coinlist import LadderReconciler, OrderTracker
+from coinlist.ladder import plan_ladder
+
+SYMBOL = "BTC-USD"
+
+
+def _order(order_id, side, price, size, filled=0):
+    return {
+        "order_id": order_id,
+        "symbol": SYMBOL,
+        "side": side,
+        "price": str(price),
+        "size": str(size),
+        "size_filled": str(filled),
+    }
+
+
+def test_plan_keeps_matches_and_modifies_before_cancel_create():
+    live = [
+        _order("a", "buy", 100, 1),
+        _order("b", "buy", 99, 1),
+        _order("c", "buy", 98, 1),
+        _order("d", "sell", 101, 1.5, filled=0.5),
+        _order("e", "sell", 102, 1),
+    ]
+    desired = [
+        ("buy", 100, 1),
+        ("buy", 99, 2),
+        ("buy", 97, 1),
+        ("buy", 96, 1),
+        {"side": "sell", "price": 101, "size": 1},
+    ]
+    plan = plan_ladder(SYMBOL, desired, live)
+    assert [o["order_id"] for o in plan.kept] == ["a", "d"]
+    assert [(o["order_id"], level) for o, level in plan.modifies] == [
+        ("b", ("buy", 99.0, 2.0)),
+        ("c", ("buy", 97.0, 1.0)),
+    ]
+    assert plan.creates == [("buy", 96.0, 1.0)]
+    assert [o["order_id"] for o in plan.cancels] == ["e"]
+    assert plan.operations == 4 and plan.naive == 10 and plan.saved == 6
+
+
+def test_tolerances_keep_close_orders():
+    live = [_order("a", "buy", 100.004, 0.99)]
+    assert plan_ladder(SYMBOL, [("buy", 100, 1)], live).operations == 1
+    plan = plan_ladder(
+        SYMBOL, [("buy", 100, 1)], live, price_tolerance=0.01, size_tolerance=0.02
+    )
+    assert plan.operations == 0 and len(plan.kept) == 1
+
+
+def _open(exchange, ids):
+    orders = [exchange.orders[i] for i in ids]
+    return sorted(
+        (o["side"], float(o["price"]), float(o["size"]) - float(o["size_filled"]))
+        for o in orders
+        if o["status"] not in ("done", "canceled")
+    )
+
+
+def test_reconcile_through_tracker(client, exchange):
+    tracker = OrderTracker(client)
+    events = []
+    client.add_hook(events.append)
+    with LadderReconciler(client, tracker) as reconciler:
+        ladder = [("buy", 35990, 0.1), ("buy", 35980, 0.2), ("sell", 36010, 0.1)]
+        first = reconciler.reconcile(SYMBOL, ladder)
+        assert first.ok and first.plan.operations == 3 and first.plan.saved == 0
+        assert all(first.order_ids)
+
+        events.clear()
+        ladder = [
+            ("buy", 35995, 0.1),
+            ("buy", 35990, 0.2),
+            ("sell", 36005, 0.1),
+            ("sell", 36015, 0.1),
+        ]
+        second = reconciler.reconcile(SYMBOL, ladder)
+        assert second.ok
+        assert len(second.plan.modifies) == 3 and len(second.plan.creates) == 1
+        assert second.plan.saved == 7 - 4
+        assert sorted(e.method for e in events) == ["PATCH"] * 3 + ["POST"]
+
+        third = reconciler.reconcile(SYMBOL, ladder[:2])
+        assert [o["side"] for o in third.plan.cancels] == ["sell", "sell"]
+        assert third.plan.operations == 2 and len(third.plan.kept) == 2
+        stats = reconciler.stats()
+    ids = [o["order_id"] for o in tracker.by_symbol(SYMBOL)]
+    assert _open(exchange, ids) == sorted(ladder[:2])
+    assert stats["cycles"] == 3 and stats["saved"] == 3 + 4
+    assert stats["operations"] == 3 + 4 + 2 and stats["max_time"] > 0
+
+
+def test_cancels_go_out_before_new_quotes(client, exchange):
+    events = []
+    with LadderReconciler(client) as reconciler:
+        reconciler.reconcile("ETH-USD", [("sell", 2600, 1), ("sell", 2610, 1)])
+        client.add_hook(events.append)
+        result = reconciler.reconcile("ETH-USD", [("buy", 2400, 1)])
+    assert len(result.plan.cancels) == 2 and len(result.plan.modifies) == 0
+    methods = [e.method for e in events if e.method != "GET"]
+    assert methods == ["DELETE", "DELETE", "POST"]
+    # ``live_orders`` came from the exchange, as there is no tracker.
+    assert any(e.method == "GET" for e in events)
+    assert result.plan.creates == [("buy", 2400.0, 1.0)]
+
+
+def test_failed_operations_are_reported(client, exchange):
+    tracker = OrderTracker(client)
+    reconciler = LadderReconciler(client, tracker)
+    order_id = reconciler.reconcile(SYMBOL, [("buy", 35000, 1)]).order_ids[0]
+    exchange.orders[order_id]["status"] = "done"
+    result = reconciler.reconcile(SYMBOL, [])
+    reconciler.close()
+    ((kind, target, error),) = result.errors
+    assert kind == "cancel" and target["order_id"] == order_id
+    assert error["status"] == 400
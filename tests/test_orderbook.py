@@ -0,0 +1,115 @@
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import CoinlistApi, OrderBooks
+from coinlist.orderbook import LocalOrderBook, SequenceGap
+from coinlist.ratelimit import RequestScheduler
+
+SYMBOL = "BTC-USD"
+
+
+def _snapshot(sequence, bid=100.0):
+    return {"bids": [[bid, 1.0]], "asks": [[bid + 1, 1.0]], "sequence": sequence}
+
+
+def _delta(sequence, price, size=1.0):
+    return {"sequence": sequence, "bids": [[price, size]]}
+
+
+def _book(snapshots):
+    """A book seeded at sequence 1 whose resyncs return ``snapshots`` in turn."""
+    snapshots = iter(snapshots)
+    book = LocalOrderBook(SYMBOL, resync=lambda: next(snapshots))
+    book.load_snapshot(_snapshot(1))
+    return book
+
+
+def test_gap_without_resync_raises():
+    book = LocalOrderBook(SYMBOL)
+    book.load_snapshot(_snapshot(1))
+    assert book.apply(_delta(2, 99))
+    assert not book.apply(_delta(2, 98))
+    with pytest.raises(SequenceGap):
+        book.apply(_delta(4, 98))
+    assert book.sequence == 2 and book.depth(0, "buy") == [(100.0, 1.0), (99.0, 1.0)]
+
+
+def test_resync_replays_deltas_newer_than_the_snapshot():
+    book = _book([_snapshot(7, bid=100.5)])
+    assert book.apply(_delta(8, 97))
+    assert book.resyncs == 1 and book.sequence == 8
+    assert book.depth(0, "buy") == [(100.5, 1.0), (97.0, 1.0)]
+
+
+def test_stale_snapshot_is_fetched_again():
+    book = _book([_snapshot(5), _snapshot(5), _snapshot(9, bid=100.5)])
+    book.apply(_delta(10, 97))
+    assert book.resyncs == 3 and book.sequence == 10
+    assert book.best_bid == 100.5 and book.depth(0, "buy")[-1] == (97.0, 1.0)
+
+
+def test_stale_snapshots_raise_after_max_resyncs():
+    book = _book([_snapshot(5)] * 3)
+    with pytest.raises(SequenceGap):
+        book.apply(_delta(10, 97))
+    assert book.resyncs == 3 and not book.resyncing
+    # Still behind: the next delta starts another resync.
+    book.resync = lambda: _snapshot(10)
+    assert book.apply(_delta(11, 97)) and book.sequence == 11
+
+
+def test_deltas_arriving_during_resync_are_buffered():
+    book = LocalOrderBook(SYMBOL)
+    book.load_snapshot(_snapshot(1))
+
+    def resync():
+        # The stream keeps delivering while the snapshot request is in flight.
+        assert book.resyncing
+        for sequence, price in ((6, 96), (7, 95), (8, 94)):
+            book.apply(_delta(sequence, price))
+        return _snapshot(6, bid=100.5)
+
+    book.resync = resync
+    book.apply(_delta(5, 97))
+    assert book.sequence == 8 and not book.resyncing
+    # 5 and 6 are in the snapshot already; 7 and 8 are replayed on top of it.
+    assert book.depth(0, "buy") == [(100.5, 1.0), (95.0, 1.0), (94.0, 1.0)]
+
+
+def test_gap_inside_the_buffer_resyncs_again():
+    snapshots = iter([_snapshot(6), _snapshot(9, bid=100.5)])
+
+    def resync():
+        snapshot = next(snapshots)
+        if snapshot["sequence"] == 6:
+            book.apply(_delta(7, 95))
+            book.apply(_delta(10, 94))
+        return snapshot
+
+    book = LocalOrderBook(SYMBOL, resync=resync)
+    book.load_snapshot(_snapshot(1))
+    book.apply(_delta(5, 97))
+    assert book.resyncs == 2 and book.sequence == 10
+    assert book.depth(0, "buy") == [(100.5, 1.0), (94.0, 1.0)]
+
+
+def test_order_books_seed_from_the_exchange(client, exchange):
+    books = OrderBooks(client)
+    book = books[SYMBOL]
+    assert books[SYMBOL] is book and SYMBOL in books
+    assert book.best_bid < book.best_ask
+    assert exchange.hits["GET /v1/symbols/([^/]+)/book"] == 1
+
+
+def test_books_load_typed_snapshots(exchange):
+    client = CoinlistApi(KEY, SECRET, scheduler=RequestScheduler.unlimited(), models=True)
+    client.endpoint_url = exchange.url
+    with client:
+        snapshot = client.get_order_book(SYMBOL)
+        price, size = snapshot["bids"][0]
+        assert (price, size) == (snapshot["bids"][0].price, snapshot["bids"][0].size)
+        book = OrderBooks(client)[SYMBOL]
+        assert len(book) == len(snapshot["bids"]) + len(snapshot["asks"])
+        assert book.best_bid == float(price)
+        # Errors are passed through untouched rather than wrapped.
+        assert client.get_order_book("NOPE-USD")["status"] == 404
@@ -0,0 +1,84 @@
+import queue
+import time
+
+import pytest
+
+from coinlist import CoinlistStream, OrderTracker
+
+
+def test_orders_are_indexed_and_exposure_is_incremental(client, exchange):
+    tracker = OrderTracker(client)
+    buy = tracker.create_order(36000, "0.5", "BTC-USD", "buy")
+    sell = tracker.create_order(37000, "0.2", "BTC-USD", "sell")
+    other = tracker.create_order(2500, "1", "ETH-USD", "buy")
+    assert {o["order_id"] for o in tracker.by_symbol("BTC-USD")} == {buy, sell}
+    assert len(tracker.by_status("accepted")) == 3
+    exposure = tracker.exposure("BTC-USD")
+    assert exposure["buy"] == pytest.approx(0.5) and exposure["sell"] == pytest.approx(0.2)
+    assert exposure["net"] == pytest.approx(0.3)
+    assert exposure["buy_notional"] == pytest.approx(18000)
+
+    tracker.modify_order(buy, 35000, "0.4", "BTC-USD", "buy")
+    assert tracker.exposure("BTC-USD")["buy_notional"] == pytest.approx(14000)
+    tracker.cancel_order(sell)
+    assert tracker.get(sell)["status"] == "canceled"
+    assert tracker.exposure("BTC-USD")["sell"] == 0
+    tracker.cancel_orders("ETH-USD")
+    assert tracker.exposure("ETH-USD")["orders"] == 0
+    assert tracker.by_client_id(tracker.get(other)["client_id"])["order_id"] == other
+
+
+def test_fills_update_state_once(client, exchange):
+    tracker = OrderTracker(client)
+    order_id = tracker.create_order(36000, "1", "BTC-USD", "buy")
+    fill = exchange.fill_order(order_id, "0.25", publish=False)
+    assert tracker.apply_fill(fill)
+    assert not tracker.apply_fill(fill)
+    assert tracker.exposure("BTC-USD")["buy"] == pytest.approx(0.75)
+    # An order snapshot reporting the same fill does not count it twice.
+    tracker.update(client.get_order(order_id)["order"])
+    assert tracker.exposure("BTC-USD")["buy"] == pytest.approx(0.75)
+    tracker.apply_fill(exchange.fill_order(order_id, publish=False))
+    assert tracker.get(order_id)["status"] == "done"
+    assert not tracker.open_orders() and len(tracker.fills(order_id)) == 2
+
+
+def test_reconcile_recovers_missed_changes(client, exchange):
+    tracker = OrderTracker(client)
+    filled = tracker.create_order(36000, "1", "BTC-USD", "buy")
+    canceled = tracker.create_order(2500, "2", "ETH-USD", "sell")
+    partial = tracker.create_order(150, "4", "SOL-USD", "buy")
+    exchange.fill_order(filled, publish=False)
+    exchange.fill_order(partial, "1", publish=False)
+    exchange.orders[canceled]["status"] = "canceled"
+    exchange.orders[canceled]["updated_at"] = exchange._timestamp()
+    tracker.reconcile()
+    assert tracker.get(filled)["status"] == "done"
+    assert tracker.get(canceled)["status"] == "canceled"
+    assert tracker.exposure("SOL-USD")["buy"] == pytest.approx(3)
+    assert len(tracker.fills(partial)) == 1
+    assert [o["order_id"] for o in tracker.open_orders()] == [partial]
+
+
+def test_stream_keeps_orders_current_and_reconnect_reconciles(client, exchange):
+    tracker = OrderTracker(client)
+    stream = CoinlistStream(client, heartbeat_interval=1)
+    tracker.attach(stream)
+    seen = queue.Queue()
+    stream.add_callback(seen.put)
+    with stream:
+        assert stream.wait_connected(5) and exchange.wait_subscribed("user")
+        order_id = tracker.create_order(36000, "1", "BTC-USD", "buy")
+        exchange.fill_order(order_id, "0.4")
+        while seen.get(timeout=5).get("event") != "filled":
+            pass
+        assert tracker.exposure("BTC-USD")["buy"] == pytest.approx(0.6)
+
+        reconciles = tracker.reconciles
+        exchange.fill_order(order_id, publish=False)
+        exchange.drop_connections()
+        deadline = time.monotonic() + 5
+        while tracker.reconciles == reconciles and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert tracker.get(order_id)["status"] == "done"
+    assert tracker.exposure("BTC-USD")["orders"] == 0
@@ -0,0 +1,54 @@
+import pytest
+
+from coinlist import ApiError
+from coinlist.paging import MAX_PAGE_SIZE, PageCursor, PageStuck, iterate
+
+
+def _transfers(exchange, n, created_at):
+    template = exchange.listings["transfers"].items[-1]
+    added = [
+        dict(template, transfer_id=f"burst-{i}", created_at=created_at) for i in range(n)
+    ]
+    for transfer in added:
+        exchange.listings["transfers"].add(transfer)
+    return added
+
+
+def test_boundary_items_are_returned_once(client, exchange):
+    # Pages of 100 end inside this burst, so the next window starts on its timestamp.
+    _transfers(exchange, 30, exchange.listings["transfers"].items[80]["created_at"])
+    ids = [t["transfer_id"] for t in client.iter_transfers(count=100, prefetch=False)]
+    assert len(ids) == len(set(ids)) == 1230
+
+
+def test_full_page_at_one_timestamp_grows_the_page(client, exchange):
+    added = _transfers(exchange, 150, "2022-01-01T00:00:00Z")
+    transfers = client.iter_transfers(start_time="2022-01-01T00:00:00Z", count=100)
+    assert [t["transfer_id"] for t in transfers] == [t["transfer_id"] for t in added]
+
+
+def test_more_items_at_one_timestamp_than_a_page_raise():
+    items = [{"id": i, "t": "2022-01-01"} for i in range(MAX_PAGE_SIZE + 10)]
+    cursor = PageCursor("items", "t", "id", count=MAX_PAGE_SIZE)
+
+    def fetch(start_time, end_time, descending, count):
+        return {"items": items[:count]}
+
+    with pytest.raises(PageStuck):
+        list(iterate(fetch, cursor, prefetch=False))
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_error_page_raises_instead_of_truncating(client, exchange, prefetch):
+    transfers = client.iter_transfers(count=100, prefetch=prefetch)
+    assert len([next(transfers) for _ in range(100)]) == 100
+    exchange.fail_next(2, status=503, path="/transfers")
+    with pytest.raises(ApiError) as e:
+        list(transfers)
+    assert e.value.status == 503
+
+
+def test_error_on_the_first_page_raises(client, exchange):
+    exchange.fail_next(status=429, path="/transfers")
+    with pytest.raises(ApiError):
+        list(client.iter_transfers(count=100))
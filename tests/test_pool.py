@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import ClientPool
+from coinlist.ratelimit import DEFAULT_LIMITS
+
+UNLIMITED = {cls: (float("inf"), float("inf")) for cls in DEFAULT_LIMITS}
+
+
+@pytest.fixture
+def pool(exchange):
+    accounts = {name: (KEY, SECRET) for name in ("a", "b", "c")}
+    with ClientPool(accounts, limits=UNLIMITED) as pool:
+        pool.set_endpoint_url(exchange.url)
+        yield pool
+
+
+def test_clients_share_transport_but_not_rate_budget(pool):
+    assert len({id(pool[name].transport) for name in pool}) == 1
+    assert len({id(pool[name].scheduler) for name in pool}) == 3
+
+
+def test_fan_out_runs_accounts_concurrently(pool, exchange):
+    exchange.slow_next(3, 0.2, path="/v1/balances")
+    start = time.perf_counter()
+    result = pool.get_list_balances()
+    assert time.perf_counter() - start < 0.5
+    assert result.ok and sorted(result.results) == ["a", "b", "c"]
+    merged = result.merged("asset_balances")
+    assert {item["account"] for item in merged} == {"a", "b", "c"}
+
+
+def test_errors_are_isolated_per_account(pool, exchange):
+    for name in ("a", "b"):
+        pool[name].create_order(36000, "0.01", "BTC-USD", "buy")
+    exchange.fail_next(1, status=500, path="/v1/orders")
+    result = pool.get_list_orders(symbol="BTC-USD", accounts=["a", "b"])
+    assert len(result.errors) == 1 and len(result.results) == 1
+    assert all(item["symbol"] == "BTC-USD" for item in result.merged("orders"))
+
+    def boom(client):
+        raise RuntimeError(client.ACCESS_KEY)
+
+    result = pool.fan_out(boom, accounts=["c"])
+    assert isinstance(result.errors["c"], RuntimeError)
+    with pytest.raises(KeyError):
+        pool.fan_out("get_list_balances", accounts=["missing"])
+
+
+def test_cancel_orders_fan_out(pool, exchange):
+    order_id = pool["a"].create_order(36000, "0.01", "BTC-USD", "buy")
+    result = pool.cancel_orders("BTC-USD")
+    assert result.ok
+    assert exchange.orders[order_id]["status"] == "canceled"
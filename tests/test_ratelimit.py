@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import CoinlistApi, RequestScheduler
+from coinlist.ratelimit import CANCEL, MARKET, ORDERS, READ, TokenBucket, classify
+
+
+def test_requests_are_classified_and_prioritized():
+    assert classify("DELETE", "/v1/orders/abc") == (ORDERS, CANCEL)
+    assert classify("GET", "/v1/orders") == (ORDERS, READ)
+    assert classify("GET", "/v1/balances")[0] == "account"
+    assert classify("GET", "/v1/symbols/BTC-USD/quote") == (MARKET, READ)
+
+
+def test_bucket_backs_off_on_429_and_recovers():
+    bucket = TokenBucket(rate=10, burst=5)
+    now = bucket.updated
+    for _ in range(5):
+        assert bucket.wait_time(now) == 0
+        bucket.take()
+    assert bucket.wait_time(now) == pytest.approx(0.1)
+
+    bucket.throttled(now, retry_after=2)
+    assert bucket.rate == 5
+    # Nothing refills while the server asked to wait.
+    assert bucket.wait_time(now + 1) == pytest.approx(1.0)
+    assert bucket.wait_time(now + 2) == pytest.approx(0.2)
+    assert bucket.wait_time(now + 2.25) == 0
+
+    for _ in range(24):
+        bucket.succeeded()
+    assert bucket.rate == pytest.approx(9.8)
+    bucket.succeeded()
+    bucket.succeeded()
+    assert bucket.rate == 10
+
+
+def test_repeated_throttling_stops_at_the_minimum_rate():
+    bucket = TokenBucket(rate=32, burst=1)
+    for _ in range(10):
+        bucket.throttled(bucket.updated)
+    assert bucket.rate == bucket.min_rate == 2
+
+
+def test_scheduler_waits_out_retry_after():
+    scheduler = RequestScheduler()
+    scheduler.record(MARKET, 429, {"Retry-After": "0.2"})
+    start = time.monotonic()
+    assert scheduler.acquire("GET", "/v1/symbols/BTC-USD/quote") == MARKET
+    assert time.monotonic() - start >= 0.19
+    metrics = scheduler.metrics()
+    assert metrics["throttled"] == {MARKET: 1}
+    assert metrics["rates"][MARKET] == 25
+
+
+def test_cancels_overtake_queued_reads():
+    scheduler = RequestScheduler({ORDERS: (10, 1)})
+    scheduler.acquire("GET", "/v1/orders")
+    order = []
+    queued = threading.Semaphore(0)
+    enqueue = scheduler._enqueue
+
+    def tracked(cls, priority):
+        key = enqueue(cls, priority)
+        queued.release()
+        return key
+
+    def send(method):
+        scheduler.acquire(method, "/v1/orders/abc")
+        order.append(method)
+
+    scheduler._enqueue = tracked
+    threads = [threading.Thread(target=send, args=("GET",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        assert queued.acquire(timeout=5)
+    # All three reads are waiting for the next token when the cancel arrives.
+    threads.append(threading.Thread(target=send, args=("DELETE",)))
+    threads[-1].start()
+    for thread in threads:
+        thread.join()
+    assert order.index("DELETE") <= 1
+
+
+def test_client_feeds_429s_back_to_the_scheduler(exchange):
+    scheduler = RequestScheduler()
+    client = CoinlistApi(KEY, SECRET, scheduler=scheduler)
+    client.endpoint_url = exchange.url
+    exchange.fail_next(2, status=429, path="/quote")
+    with client:
+        assert client.get_quote("BTC-USD")["status"] == 429
+        assert client.get_quote("BTC-USD")["status"] == 429
+        assert scheduler.metrics()["rates"][MARKET] == 12.5
+        for _ in range(5):
+            assert "status" not in client.get_quote("BTC-USD")
+    metrics = scheduler.metrics()
+    assert metrics["throttled"] == {MARKET: 2}
+    assert metrics["rates"][MARKET] == 17.5
@@ -0,0 +1,45 @@
+import pytest
+
+from coinlist.reports import ReportDownloader, iter_lines, parse_csv, read_spill
+
+
+def test_fills_report_streams_in_fixed_batches(client, exchange):
+    downloader = ReportDownloader(client, batch_size=500, poll_interval=0.01)
+    batches = list(downloader.batches("fills"))
+    assert [len(batch) for batch in batches] == [500, 500, 200]
+    fill_ids = [fill_id for batch in batches for fill_id in batch.column("fill_id")]
+    assert fill_ids == [fill["fill_id"] for fill in exchange.listings["fills"].items]
+    price = batches[0].column("price")
+    assert price.typecode == "d"
+    assert price[0] == pytest.approx(float(exchange.listings["fills"].items[0]["price"]))
+    assert exchange.hits["GET /downloads"] == 1
+
+
+def test_waits_until_report_is_ready(client, exchange):
+    exchange.report_delay = 0.2
+    downloader = ReportDownloader(client, poll_interval=0.02, max_poll_interval=0.05)
+    report = downloader.wait(downloader.request("account"))
+    assert report["status"] == "complete"
+    assert downloader.polls > 1
+    rows = [row for batch in downloader.stream(report) for row in batch.to_dicts()]
+    assert len(rows) == len(exchange.listings["transactions"].items)
+
+
+def test_spill_rereads_without_downloading(client, exchange, tmp_path):
+    path = str(tmp_path / "fills.csv.gz")
+    downloader = ReportDownloader(client, batch_size=1000, poll_interval=0.01)
+    downloaded = [row for batch in downloader.batches(spill_path=path) for row in batch.to_dicts()]
+    reread = [row for batch in read_spill(path, 1000) for row in batch.to_dicts()]
+    assert reread == downloaded
+    assert exchange.hits["GET /downloads"] == 1
+    assert list(tmp_path.iterdir()) == [tmp_path / "fills.csv.gz"]
+
+
+def test_parse_handles_split_chunks_and_empty_cells():
+    data = 'fill_id,price,symbol\n1,"1.5",BTC-USD\n2,,ETH-USD\n3,2é,SOL-USD'.encode()
+    chunks = [data[i : i + 3] for i in range(0, len(data), 3)]
+    (batch,) = parse_csv(iter_lines(chunks), batch_size=10)
+    assert batch.column("fill_id") == ["1", "2", "3"]
+    price = batch.column("price")
+    assert price[0] == 1.5 and price[1] != price[1] and price[2] != price[2]
+    assert batch.column("symbol")[2] == "SOL-USD"
@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import AsyncCoinlistApi, CoinlistApi
+from coinlist.ratelimit import RequestScheduler
+from coinlist.retry import HedgePolicy, RetryPolicy
+
+
+def _client(exchange, **kwargs):
+    client = CoinlistApi(KEY, SECRET, scheduler=RequestScheduler.unlimited(), **kwargs)
+    client.endpoint_url = exchange.url
+    return client
+
+
+def test_policy_only_allows_idempotent_requests():
+    policy = RetryPolicy()
+    assert policy.allows("GET", "/v1/fills")
+    assert policy.allows("DELETE", "/v1/orders/x")
+    assert policy.allows("POST", "/v1/orders", {"symbol": "BTC-USD", "client_id": "c1"})
+    assert not policy.allows("POST", "/v1/orders", {"symbol": "BTC-USD"})
+    assert not policy.allows("POST", "/v1/orders/bulk", [{"client_id": "a"}, {}])
+    assert not policy.allows("POST", "/v1/transfers/to-wallet", {})
+    assert not RetryPolicy(max_attempts=1).allows("GET", "/v1/fills")
+
+
+def test_delay_is_bounded_and_honours_retry_after():
+    policy = RetryPolicy(backoff=0.1, max_backoff=1.0)
+    assert all(0 <= policy.delay(n) <= 1.0 for n in range(10))
+    assert policy.delay(0, {"Retry-After": "0.5"}) >= 0.5
+
+
+def test_get_is_retried_on_5xx(exchange):
+    client = _client(exchange, retry=RetryPolicy(backoff=0.001))
+    exchange.fail_next(2, status=502, path="/v1/balances")
+    assert "asset_balances" in client.get_list_balances()
+
+
+def test_retries_give_up_after_max_attempts(exchange):
+    client = _client(exchange, retry=RetryPolicy(max_attempts=2, backoff=0.001))
+    exchange.fail_next(3, status=503, path="/v1/balances")
+    assert client.get_list_balances()["status"] == 503
+
+
+def test_retried_order_is_not_duplicated(exchange):
+    client = _client(exchange, retry=RetryPolicy(backoff=0.001))
+    # The order is placed, but the response is lost.
+    exchange.fail_next(1, status=504, method="POST", path="/v1/orders$", after=True)
+    order_id = client.create_order(36000, "0.01", "BTC-USD", "buy")
+    # The retry was rejected as a duplicate and the first order looked up.
+    assert list(exchange.orders) == [order_id]
+    assert exchange.hits["GET /v1/orders"] == 1
+
+
+def test_retried_bulk_orders_are_recovered(exchange):
+    client = _client(exchange, retry=RetryPolicy(backoff=0.001))
+    exchange.fail_next(1, status=504, method="POST", path="/v1/orders/bulk", after=True)
+    orders = [
+        {"symbol": symbol, "side": "buy", "size": "1", "price": "10"}
+        for symbol in ("BTC-USD", "ETH-USD", "BTC-USD")
+    ]
+    results = client.create_orders(orders)
+    assert not any(r["error"] for r in results)
+    assert sorted(r["order_id"] for r in results) == sorted(exchange.orders)
+
+
+def test_reused_client_id_is_not_mistaken_for_a_retry(exchange):
+    client = _client(exchange, retry=RetryPolicy(backoff=0.001))
+    assert client.create_order(36000, "0.01", "BTC-USD", "buy", client_id="c1")
+    assert client.create_order(36000, "0.01", "BTC-USD", "buy", client_id="c1") is None
+    assert len(exchange.orders) == 1
+
+
+def test_create_order_returns_none_when_rejected(exchange):
+    client = _client(exchange)
+    assert client.create_order(36000, "0.01", "XXX-USD", "buy") is None
+
+
+def test_transfers_are_not_retried(exchange):
+    client = _client(exchange, retry=RetryPolicy(backoff=0.001))
+    exchange.fail_next(1, status=503, path="/v1/transfers/to-wallet")
+    assert client.transfer_to_wallet("BTC", 1)["status"] == 503
+
+
+def test_connection_errors_are_retried():
+    client = CoinlistApi(
+        KEY,
+        SECRET,
+        scheduler=RequestScheduler.unlimited(),
+        retry=RetryPolicy(max_attempts=2, backoff=0.001),
+    )
+    client.endpoint_url = "http://127.0.0.1:9"
+    events = []
+    client.add_hook(events.append)
+    with pytest.raises(Exception):
+        client.get_list_balances()
+    assert [e.retries for e in events] == [0, 1]
+
+
+def test_hedged_read_beats_slow_first_attempt(exchange):
+    hedge = HedgePolicy(initial_delay=0.02)
+    client = _client(exchange, hedge=hedge)
+    exchange.slow_next(1, 1.0, path="/quote")
+    start = time.perf_counter()
+    assert client.get_quote("BTC-USD")["quote"]["bid"]
+    assert time.perf_counter() - start < 0.5
+    assert hedge.hedged == 1
+    client.close()
+
+
+def test_hedge_delay_follows_observed_latency():
+    hedge = HedgePolicy(min_samples=10, min_delay=0.0)
+    for i in range(100):
+        hedge.observe("/v1/orders/x", i / 1000)
+    assert hedge.delay("/v1/orders/y") == pytest.approx(0.095)
+    assert not hedge.applies("GET", "/v1/fills")
+
+
+def test_async_retry_and_hedge(exchange):
+    hedge = HedgePolicy(initial_delay=0.02)
+
+    async def run():
+        async with AsyncCoinlistApi(
+            KEY,
+            SECRET,
+            scheduler=RequestScheduler.unlimited(),
+            retry=RetryPolicy(backoff=0.001),
+            hedge=hedge,
+        ) as client:
+            client.endpoint_url = exchange.url
+            exchange.fail_next(1, status=503, path="/v1/balances")
+            balances = await client.get_list_balances()
+            exchange.fail_next(1, 504, method="POST", path="/v1/orders$", after=True)
+            order_id = await client.create_order(2500, "0.1", "ETH-USD", "buy")
+            assert list(exchange.orders) == [order_id]
+            exchange.slow_next(1, 1.0, path="/quote")
+            start = time.perf_counter()
+            quote = await client.get_quote("ETH-USD")
+            return balances, quote, time.perf_counter() - start
+
+    balances, quote, elapsed = asyncio.run(run())
+    assert "asset_balances" in balances
+    assert quote["quote"]["bid"] and elapsed < 0.5
+    assert hedge.hedged == 1
@@ -0,0 +1,51 @@
+import base64
+import hashlib
+import hmac
+
+import pytest
+import requests
+
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist.signer import RequestSigner, encode_path
+
+TIMESTAMP = "1622505600"
+
+
+def _expected(message: bytes):
+    digest = hmac.new(base64.b64decode(SECRET), message, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def test_query_string_is_canonical_and_signed():
+    params = {"symbol": "BTC-USD", "start_time": "2021-06-01T00:00:00.000Z", "x": None}
+    path, headers, _ = RequestSigner(KEY, SECRET).build(
+        "GET", "/v1/orders", {}, params, TIMESTAMP
+    )
+    assert path == "/v1/orders?symbol=BTC-USD&start_time=2021-06-01T00%3A00%3A00.000Z"
+    assert headers["CL-ACCESS-SIG"] == _expected(f"{TIMESTAMP}GET{path}".encode())
+    assert headers["CL-ACCESS-KEY"] == KEY
+    assert headers["CL-ACCESS-TIMESTAMP"] == TIMESTAMP
+
+
+def test_body_is_serialized_once_and_signed():
+    data = {"symbol": "BTC-USD", "side": "buy", "size": "0.5", "price": "36000"}
+    path, headers, body = RequestSigner(KEY, SECRET).build(
+        "POST", "/v1/orders", data, None, TIMESTAMP
+    )
+    assert body == b'{"symbol":"BTC-USD","side":"buy","size":"0.5","price":"36000"}'
+    message = f"{TIMESTAMP}POST/v1/orders".encode() + body
+    assert headers["CL-ACCESS-SIG"] == _expected(message)
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/v1/symbols/BTC USD", None),
+        ("/v1/fills", {"count": 5, "ids": ["a", "b"], "symbol": None}),
+        ("/v1/fills", "a=1&b=2"),
+        ("/v1/transfers", {"start_time": "2021-06-01T00:00:00+00:00"}),
+    ],
+)
+def test_encode_path_matches_requests(path, params):
+    request = requests.Request("GET", "https://api.invalid" + path, params=params)
+    assert encode_path(path, params) == request.prepare().path_url
@@ -0,0 +1,56 @@
+import asyncio
+import math
+
+import pytest
+
+from benchmarks import payloads
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import AsyncCoinlistApi
+from coinlist.ratelimit import RequestScheduler
+
+SYMBOLS = ["BTC-USD", "ETH-USD", "SOL-USD"]
+
+
+def test_summary_snapshot_is_one_request(client, exchange):
+    snap = client.get_snapshot(SYMBOLS)
+    assert sum(exchange.hits.values()) == 1
+    assert snap.symbols == SYMBOLS
+    assert snap["last"].typecode == "d" and len(snap["last"]) == 3
+    assert snap["last"][1] == pytest.approx(payloads.SYMBOLS["ETH-USD"]["price"])
+    assert snap["volume"][0] == pytest.approx(1234.5)
+    assert all(s > 0 for s in snap.spread)
+    assert not snap.errors
+
+
+def test_quote_and_book_columns_align_by_symbol(client, exchange):
+    kinds = ("summary", "quote", "book")
+    snap = client.get_snapshot(SYMBOLS + ["NOPE-USD"], kinds=kinds, depth=5)
+    assert snap.row("SOL-USD")["bid_size"] == pytest.approx(0.75)
+    assert len(snap.books["BTC-USD"]["bids"]) == 5
+    assert snap["bid"][0] < snap["ask"][0]
+    assert snap["bid_depth"][0] == pytest.approx(sum(0.1 + i * 0.05 for i in range(5)))
+    # The unknown symbol has no summary entry; quote and book still answer.
+    assert "summary" in snap.errors["NOPE-USD"]
+    assert math.isnan(snap["volume"][3])
+
+
+def test_failed_requests_leave_nan(client, exchange):
+    exchange.fail_next(1, status=500, path="/ETH-USD/quote")
+    snap = client.get_snapshot(SYMBOLS, kinds=["quote"])
+    assert list(snap.errors) == ["ETH-USD"]
+    assert math.isnan(snap["bid_size"][1]) and snap["bid_size"][0] == pytest.approx(0.75)
+    with pytest.raises(ValueError):
+        client.get_snapshot(SYMBOLS, kinds=["trades"])
+
+
+def test_async_snapshot(exchange):
+    async def run():
+        async with AsyncCoinlistApi(
+            KEY, SECRET, scheduler=RequestScheduler.unlimited()
+        ) as client:
+            client.endpoint_url = exchange.url
+            return await client.get_snapshot(SYMBOLS, kinds=("summary", "book"), max_workers=2)
+
+    snap = asyncio.run(run())
+    assert set(snap.books) == set(SYMBOLS)
+    assert snap["last"][0] == pytest.approx(payloads.SYMBOLS["BTC-USD"]["price"])
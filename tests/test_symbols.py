@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from benchmarks.fake_exchange import KEY, SECRET
+from coinlist import ApiError, CoinlistApi, OrderValidationError, SymbolRegistry
+from coinlist.ratelimit import RequestScheduler
+from coinlist.symbols import SymbolInfo
+
+SYMBOL = "BTC-USD"
+
+
+def _info(**rules):
+    return SymbolInfo(dict({"symbol": "PEPE-USD"}, **rules))
+
+
+def test_prices_round_away_from_the_touch_and_sizes_down():
+    info = _info(minimum_price_increment="0.01", minimum_size_increment="0.001")
+    assert info.normalize(100.019, 1.2349, "buy") == ("100.01", "1.234")
+    assert info.normalize(100.011, 1.2349, "sell") == ("100.02", "1.234")
+    assert info.normalize(100.015, 1) == ("100.02", "1")
+    assert info.normalize(None, 2, "buy", "market") == (None, "2")
+
+
+def test_small_increments_are_not_formatted_as_exponents():
+    info = _info(minimum_price_increment="0.00000001", minimum_size_increment="1000")
+    price, size = info.normalize("0.000000123", 1234567, "buy")
+    assert (price, size) == ("0.00000012", "1234000")
+
+
+def test_orders_below_lot_or_notional_are_rejected():
+    info = _info(minimum_size_increment="0.01", minimum_notional="10")
+    with pytest.raises(OrderValidationError):
+        info.normalize(100, "0.004")
+    with pytest.raises(OrderValidationError):
+        info.normalize(100, "0.05")
+    assert info.normalize(100, "0.1") == ("100", "0.1")
+
+
+def test_registry_serves_symbol_lookups(exchange):
+    client = CoinlistApi(
+        KEY, SECRET, scheduler=RequestScheduler.unlimited(), symbols=SymbolRegistry()
+    )
+    client.endpoint_url = exchange.url
+    with client:
+        symbol = client.get_symbol(SYMBOL)["symbol"]
+        assert symbol["minimum_price_increment"] == "0.01"
+        assert client.get_specific_symbol("ETH-USD")["symbol"]["symbol"] == "ETH-USD"
+        assert len(client.get_symbols()["symbols"]) == len(client.symbols)
+        assert sum(exchange.hits.values()) == 1
+        assert client.get_symbol("NOPE-USD")["status"] == 404
+
+        order_id = client.create_order(36000.019, "0.12345", SYMBOL, "buy")
+    assert exchange.orders[order_id]["price"] == "36000.01"
+    assert exchange.orders[order_id]["size"] == "0.1234"
+
+
+def test_snapshot_skips_the_cold_start_request(client, exchange, tmp_path):
+    path = str(tmp_path / "symbols.json")
+    client.symbols = SymbolRegistry(snapshot_path=path)
+    client.get_symbol(SYMBOL)
+    client.symbols = SymbolRegistry(snapshot_path=path)
+    assert not client.symbols.stale and SYMBOL in client.symbols
+    assert [i.symbol for i in client.symbols.by_quote("USD")] == client.symbols.symbols
+    client.get_symbol(SYMBOL)
+    assert exchange.hits["GET /v1/symbols"] == 1
+
+
+def test_failed_symbol_load_is_not_cached(client, exchange, tmp_path):
+    path = str(tmp_path / "symbols.json")
+    client.symbols = SymbolRegistry(snapshot_path=path)
+    exchange.fail_next(status=503, path="/symbols$")
+    with pytest.raises(ApiError):
+        client.get_symbols()
+    assert client.symbols.stale and not os.path.exists(path)
+    assert len(client.get_symbols()["symbols"]) == len(client.symbols)
+
+    # A failed refresh keeps the old rules and tries again on the next call.
+    client.symbols.loaded_at -= client.symbols.ttl
+    exchange.fail_next(status=503, path="/symbols$")
+    order_id = client.create_order(36000.019, "0.12345", SYMBOL, "buy")
+    assert exchange.orders[order_id]["price"] == "36000.01"
+    assert client.symbols.stale
+    client.get_symbol(SYMBOL)
+    assert not client.symbols.stale
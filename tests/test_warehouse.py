@@ -0,0 +1,97 @@
+import pytest
+
+from coinlist import Warehouse
+
+SYMBOL = "BTC-USD"
+
+
+def _requests(exchange):
+    return sum(exchange.hits.values())
+
+
+def test_sync_then_query_locally(client, exchange):
+    with Warehouse(client=client) as warehouse:
+        written = warehouse.sync([SYMBOL, "ETH-USD"])
+        expected = [a for a in exchange.listings["auctions"].items if a["symbol"] == SYMBOL]
+        assert written == {"auctions": 600, "transfers": 1200, "ledger": 1200}
+        assert warehouse.auctions(SYMBOL) == expected
+
+        before = _requests(exchange)
+        window = warehouse.auctions(SYMBOL, start=expected[10]["logical_time"], limit=5)
+        assert window == expected[10:15]
+        newest = warehouse.ledger(asset="USD", descending=True, limit=1)
+        assert newest[0] == exchange.listings["transactions"].items[-1]
+        end = exchange.listings["transfers"].items[99]["created_at"]
+        assert len(warehouse.transfers(asset="BTC", end=end)) == 50
+        assert _requests(exchange) == before
+
+
+def test_sync_fetches_only_the_tail(client, exchange):
+    with Warehouse(client=client) as warehouse:
+        warehouse.sync_transfers()
+        first = exchange.hits.copy()
+        assert warehouse.sync_transfers() == 0
+        assert sum((exchange.hits - first).values()) == 1
+        latest = exchange.listings["transfers"].items[-1]
+        added = [
+            dict(latest, transfer_id=f"new-{i}", created_at=f"2021-12-0{i + 1}T00:00:00Z")
+            for i in range(3)
+        ]
+        for transfer in added:
+            exchange.listings["transfers"].add(transfer)
+        assert warehouse.sync_transfers() == 3
+        assert warehouse.count("transfers") == 1203
+        assert warehouse.watermark("transfers") == added[-1]["created_at"]
+        assert warehouse.transfers(descending=True, limit=3) == added[::-1]
+
+
+def test_interrupted_sync_resumes_from_committed_batch(client, exchange, monkeypatch):
+    transfers = exchange.listings["transfers"].items
+
+    def failing(start_time=None):
+        yield from transfers[:250]
+        raise ConnectionError("dropped")
+
+    with Warehouse(client=client, batch_size=100) as warehouse:
+        monkeypatch.setattr(client, "iter_transfers", failing)
+        with pytest.raises(ConnectionError):
+            warehouse.sync_transfers()
+        assert warehouse.count("transfers") == 200
+        assert warehouse.watermark("transfers") == transfers[199]["created_at"]
+        monkeypatch.undo()
+        warehouse.sync_transfers()
+        assert warehouse.transfers() == transfers
+
+
+def test_store_persists_and_caches_auction_results(client, exchange, tmp_path):
+    path = str(tmp_path / "history.db")
+    code = exchange.listings["auctions"].items[0]["auction_code"]
+    with Warehouse(path, client) as warehouse:
+        warehouse.sync_auctions(SYMBOL)
+        result = warehouse.auction_results(SYMBOL, code)
+    hits = _requests(exchange)
+    with Warehouse(path) as warehouse:
+        assert warehouse.auction_results(SYMBOL, code) == result
+        assert warehouse.count("auctions") == 300
+        assert warehouse.watermark(f"auctions:{SYMBOL}") is not None
+        with pytest.raises(ValueError):
+            warehouse.sync_ledger()
+    assert _requests(exchange) == hits
+
+
+def test_untimestamped_items_are_skipped(client, exchange, monkeypatch, caplog):
+    latest = exchange.listings["transfers"].items[-1]
+    transfers = [
+        dict(latest, transfer_id="half", created_at="2021-12-01T00:00:00.5Z"),
+        dict(latest, transfer_id="none", created_at=None),
+        dict(latest, transfer_id="bad", created_at="yesterday"),
+        dict(latest, transfer_id="seven", created_at="2021-12-01T00:00:01.1234567Z"),
+    ]
+    monkeypatch.setattr(client, "iter_transfers", lambda start_time=None: transfers)
+    with Warehouse(client=client) as warehouse:
+        assert warehouse.sync_transfers() == 2
+        assert [t["transfer_id"] for t in warehouse.transfers()] == ["half", "seven"]
+        assert warehouse.watermark("transfers") == transfers[-1]["created_at"]
+        end = "2021-12-01T00:00:00.75Z"
+        assert [t["transfer_id"] for t in warehouse.transfers(end=end)] == ["half"]
+    assert "Skipped 2 transfers item(s) without a valid created_at" in caplog.text